@@ -0,0 +1,107 @@
+"""
+Coût CPU de la diffusion d'une frame à N abonnés WebSocket : boucle gather(send_bytes) d'origine
+contre frame pré-encodée écrite directement sur chaque transport (core/ws_broadcast.py).
+
+Le serveur (uvicorn + FastAPI) tourne dans ce processus ; les N clients tournent dans un sous-processus
+pour que leur CPU ne soit pas compté. Le résultat est ramené en ms CPU par tick pour 1000 abonnés.
+
+Usage (depuis la racine du dépôt) :
+    python benchmarks/broadcast_fanout.py --subscribers 1000 --frame-size 2432 --ticks 300
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--frame-size", type=int, default=2432, help="octets par frame (2432 = 19 os en float64)")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--port", type=int, default=9899)
+    parser.add_argument("--client", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+async def run_clients(args):
+    """Sous-processus : ouvre N connexions et lit tout ce qui arrive"""
+    import websockets
+
+    async def reader():
+        async with websockets.connect(f"ws://127.0.0.1:{args.port}/ws", max_size=None, compression=None) as ws:
+            async for _ in ws:
+                pass
+
+    tasks = []
+    for _ in range(args.subscribers):
+        tasks.append(asyncio.create_task(reader()))
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_server(args):
+    import uvicorn
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+    from core.ws_broadcast import encode_binary_frame, raw_writer
+
+    app = FastAPI()
+    subscribers = set()
+
+    @app.websocket("/ws")
+    async def endpoint(websocket: WebSocket):
+        await websocket.accept()
+        subscribers.add(websocket)
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            subscribers.discard(websocket)
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    await asyncio.sleep(1.0)
+
+    clients = subprocess.Popen([sys.executable, __file__, "--client", "--port", str(args.port),
+                                "--subscribers", str(args.subscribers)])
+    while len(subscribers) < args.subscribers:
+        await asyncio.sleep(0.1)
+
+    payload = memoryview(os.urandom(args.frame_size))
+
+    async def gather_tick():
+        await asyncio.gather(*[ws.send_bytes(payload) for ws in subscribers], return_exceptions=True)
+
+    async def raw_tick():
+        frame = encode_binary_frame(payload)
+        for ws in subscribers:
+            raw_writer(ws).write(frame)
+
+    results = {}
+    for name, tick in (("gather send_bytes", gather_tick), ("pré-encodé + transport", raw_tick)):
+        cpu = 0.0
+        for _ in range(args.ticks):
+            start = time.process_time()
+            await tick()
+            cpu += time.process_time() - start
+            # Laisse la boucle vider les buffers d'envoi (hors mesure), comme entre deux ticks à 60 fps
+            await asyncio.sleep(1 / 60)
+        results[name] = cpu / args.ticks * 1000 * 1000 / args.subscribers
+
+    print(f"{args.subscribers} abonnés, frame de {args.frame_size} octets, {args.ticks} ticks")
+    for name, ms in results.items():
+        print(f"  {name:<24} : {ms:7.2f} ms CPU / tick / 1000 abonnés")
+
+    clients.terminate()
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    asyncio.run(run_clients(arguments) if arguments.client else run_server(arguments))
@@ -0,0 +1,125 @@
+"""
+Latence de queue (p50 / p99 / max) en fonction du nombre de sessions, par politique de placement CPU.
+
+Pour chaque nombre de sessions, lance N moteurs identiques, et mesure pour chaque frame reçue
+le délai entre sa publication par le moteur (horodatage du slot) et sa diffusion par le broadcaster,
+ainsi que l'écart de l'intervalle entre deux frames par rapport à la période cible.
+
+Usage (depuis la racine du dépôt) :
+    python benchmarks/placement_latency.py --policy none --sessions 1,4,8,16
+    python benchmarks/placement_latency.py --policy pinned --type CROWD --instances 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policy", default="none", choices=["none", "threads", "pinned"])
+    parser.add_argument("--cpus-per-session", type=int, default=1)
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="liste des nombres de sessions à tester")
+    parser.add_argument("--type", default="CROWD", choices=["FK", "CROWD"])
+    parser.add_argument("--instances", type=int, default=100, help="instances par session CROWD")
+    parser.add_argument("--file", default=os.path.join("assets", "animations", "CesiumMan.glb"))
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--duration", type=float, default=5.0, help="durée de mesure par palier (s)")
+    return parser.parse_args()
+
+
+class LatencyProbe:
+    """Faux client WebSocket : horodate chaque frame diffusée"""
+
+    def __init__(self, session):
+        self.session = session
+        self.latencies = []
+        self.arrivals = []
+        self.recording = False
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_bytes(self, data):
+        if not self.recording:
+            return
+        now = time.monotonic_ns()
+        ring = self.session.ring
+        for slot in range(ring.slot_count):
+            if ring.frame_id(slot) == self.session.frame_id:
+                self.latencies.append((now - ring.timestamp_ns(slot)) / 1e6)
+                break
+        self.arrivals.append(now)
+
+
+async def run_step(manager, args, count, animator_cls, parameters):
+    sessions, probes = [], []
+    for i in range(count):
+        session = manager.create_session(f"bench-{count}-{i}", animator_cls, args.file, parameters, shared=False)
+        await session.start()
+        await session.set_fps(args.fps)
+        probe = LatencyProbe(session)
+        await session.connect(probe)
+        sessions.append(session)
+        probes.append(probe)
+
+    # Chauffe (compilation numba, premiers pools de threads)
+    await asyncio.sleep(2.0)
+    for probe in probes:
+        probe.recording = True
+    await asyncio.sleep(args.duration)
+    for probe in probes:
+        probe.recording = False
+
+    latencies = np.concatenate([np.asarray(p.latencies) for p in probes])
+    jitter = np.concatenate(
+        [np.abs(np.diff(np.asarray(p.arrivals)) / 1e6 - 1000.0 / args.fps) for p in probes if len(p.arrivals) > 1]
+    )
+    delivered = sum(len(p.arrivals) for p in probes) / (count * args.duration)
+
+    for session in sessions:
+        for session_id in list(session.session_ids):
+            await manager.delete_session(session_id)
+
+    return latencies, jitter, delivered
+
+
+async def main():
+    args = parse_args()
+    os.environ["ENGINE_CPU_POLICY"] = args.policy
+    os.environ["ENGINE_CPUS_PER_SESSION"] = str(args.cpus_per_session)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+    from animators.crowd_animator import CrowdAnimator
+    from animators.fast_fk_animator import FastFKAnimator
+    from core.session_manager import SessionManager
+
+    manager = SessionManager()
+    if args.type == "CROWD":
+        animator_cls = CrowdAnimator
+        parameters = {"instances": [{"time_offset": i * 0.01} for i in range(args.instances)]}
+    else:
+        animator_cls, parameters = FastFKAnimator, {}
+
+    print(f"Politique: {args.policy} ({args.cpus_per_session} coeur(s)/session), type {args.type}, {args.fps} fps")
+    print(f"{'sessions':>8} | {'fps/session':>11} | {'lat p50':>8} | {'lat p99':>8} | {'lat max':>8} | {'jitter p99':>10}")
+
+    for count in [int(n) for n in args.sessions.split(",")]:
+        latencies, jitter, delivered = await run_step(manager, args, count, animator_cls, parameters)
+        print(
+            f"{count:>8} | {delivered:>11.1f} | {np.percentile(latencies, 50):>6.2f}ms | "
+            f"{np.percentile(latencies, 99):>6.2f}ms | {latencies.max():>6.2f}ms | {np.percentile(jitter, 99):>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
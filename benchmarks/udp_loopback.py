@@ -0,0 +1,133 @@
+"""
+Client de test du transport UDP (core/udp_transport.py) : frames reçues, frames incomplètes ou perdues, débit.
+
+Deux modes :
+  - contre un serveur lancé (python main.py) et une session existante :
+        python benchmarks/udp_loopback.py --session ma_session --seconds 10
+  - autonome : un UdpTransport local émet des frames synthétiques sur la boucle locale,
+    avec une perte de datagrammes simulée côté client (--loss) :
+        python benchmarks/udp_loopback.py --standalone --frame-size 24576 --fps 60 --loss 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from core.udp_transport import BYE_MAGIC, HELLO_MAGIC, FrameReassembler, UdpTransport
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="http://127.0.0.1:9810")
+    parser.add_argument("--session", help="session existante du serveur")
+    parser.add_argument("--standalone", action="store_true", help="transport et frames synthétiques locaux")
+    parser.add_argument("--frame-size", type=int, default=24576, help="mode autonome : octets par frame")
+    parser.add_argument("--fps", type=float, default=60.0, help="mode autonome : frames par seconde")
+    parser.add_argument("--loss", type=float, default=0.0, help="proportion de datagrammes jetés à la réception")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    return parser.parse_args()
+
+
+def register(server: str, session_id: str) -> dict:
+    request = urllib.request.Request(f"{server}/sessions/{session_id}/udp", method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def receive(sock: socket.socket, host: str, info: dict, seconds: float, loss: float) -> dict:
+    """Reçoit pendant 'seconds' en renvoyant le HELLO à mi-timeout ; retourne les compteurs"""
+    hello = HELLO_MAGIC + info["token"].encode("ascii")
+    server = (host, info["port"])
+    reassembler = FrameReassembler()
+    stats = {"datagrams": 0, "frames": 0, "first_id": None, "last_id": None}
+
+    sock.settimeout(0.1)
+    sock.sendto(hello, server)
+    last_hello = start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        if time.perf_counter() - last_hello > info["timeout"] / 2:
+            sock.sendto(hello, server)
+            last_hello = time.perf_counter()
+        try:
+            datagram = sock.recv(65536)
+        except socket.timeout:
+            continue
+        stats["datagrams"] += 1
+        if loss and random.random() < loss:
+            continue
+        frame = reassembler.feed(datagram)
+        if frame is not None:
+            frame_id, payload = frame
+            stats["frames"] += 1
+            stats["first_id"] = frame_id if stats["first_id"] is None else stats["first_id"]
+            stats["last_id"] = frame_id
+            stats["frame_size"] = len(payload)
+
+    sock.sendto(BYE_MAGIC + info["token"].encode("ascii"), server)
+    stats["incomplete"] = reassembler.incomplete
+    return stats
+
+
+async def run_standalone(args) -> dict:
+    transport = UdpTransport(0)
+    await transport.start()
+    peer = transport.register("loopback")
+    info = {"token": peer.token, "port": transport.sock.getsockname()[1], "timeout": transport.peer_timeout}
+
+    async def produce():
+        frame = bytearray(os.urandom(args.frame_size))
+        frame_id = 0
+        while True:
+            frame_id += 1
+            frame[:4] = frame_id.to_bytes(4, "little")
+            transport.send_frame({peer}, frame_id, memoryview(frame))
+            await asyncio.sleep(1.0 / args.fps)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    producer = asyncio.create_task(produce())
+    try:
+        stats = await asyncio.get_running_loop().run_in_executor(
+            None, receive, sock, "127.0.0.1", info, args.seconds, args.loss
+        )
+    finally:
+        producer.cancel()
+        transport.stop()
+        sock.close()
+    stats["sent_datagrams"] = peer.datagrams
+    stats["dropped_on_send"] = peer.dropped
+    return stats
+
+
+def main():
+    args = parse_args()
+    if args.standalone:
+        stats = asyncio.run(run_standalone(args))
+    else:
+        if not args.session:
+            sys.exit("--session requis (ou --standalone)")
+        info = register(args.server, args.session)
+        host = urllib.parse.urlparse(args.server).hostname
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        stats = receive(sock, host, info, args.seconds, args.loss)
+        sock.close()
+
+    expected = stats["last_id"] - stats["first_id"] + 1 if stats["frames"] else 0
+    print(f"datagrammes reçus : {stats['datagrams']}")
+    print(f"frames complètes  : {stats['frames']} / {expected} ({stats['frames'] / args.seconds:.1f} fps)")
+    print(f"frames incomplètes: {stats['incomplete']}")
+    if "sent_datagrams" in stats:
+        print(f"datagrammes émis  : {stats['sent_datagrams']} (frames perdues à l'émission : {stats['dropped_on_send']})")
+
+
+if __name__ == "__main__":
+    main()
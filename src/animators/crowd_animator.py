@@ -0,0 +1,138 @@
+import struct
+from typing import Dict, Any, List
+
+import numpy as np
+
+from animators.fast_fk_animator import FastFKAnimator
+from core.interfaces import AnimatorInterface, expose
+
+# En-tête d'une frame multi-personnages : Magic (4) + FrameID (4) + NumChars (4) + NumBones (4)
+# 16 octets (et non 12 comme l'ancien main.py) pour garder les matrices float64 alignées sur 8 octets.
+MAGIC_NUMBER = 0xBADDF00D
+FRAME_HEADER = struct.Struct("<IIII")
+
+
+class CrowdAnimator(AnimatorInterface):
+    """
+    Anime N instances d'un même squelette dans une seule session.
+
+    Chaque instance a son propre décalage temporel, sa vitesse et sa transformation racine.
+    Toutes les poses sont évaluées en un seul appel FK batché puis écrites
+    en un bloc [N, num_bones, 4, 4] derrière l'en-tête FRAME_HEADER.
+    """
+
+    def __init__(self, instances: List[Dict[str, Any]] = None):
+        self.anim_data = None
+        self.t = 0.0
+        self.frame_id = 0
+        self.instance_params = instances or [{}]
+        self.num_chars = len(self.instance_params)
+        self.num_bones = 50
+        self.bone_size_bytes = 4 * 4 * np.dtype(np.float64).itemsize
+        self.total_size = FRAME_HEADER.size + self.num_chars * self.num_bones * self.bone_size_bytes
+
+        self.time_offsets = np.zeros(self.num_chars, dtype=np.float64)
+        self.speeds = np.ones(self.num_chars, dtype=np.float64)
+        self.root_transforms = np.tile(np.eye(4), (self.num_chars, 1, 1))
+        self.root_bones = None
+
+    @property
+    def animator_fps(self):
+        if self.anim_data is not None:
+            return 1.0 / self.anim_data.frame_time
+        return 30.0
+
+    @property
+    def animator_frametime(self):
+        if self.anim_data is not None:
+            return self.anim_data.frame_time
+        return 1.0 / 30.0
+
+    def initialize(self, source_path: str):
+        self.anim_data = FastFKAnimator._load_clip(source_path)
+        self.num_bones = len(self.anim_data.bone_names)
+        self.total_size = FRAME_HEADER.size + self.num_chars * self.num_bones * self.bone_size_bytes
+
+        for index, params in enumerate(self.instance_params):
+            self.set_instance(index, **params)
+
+        parents = np.asarray(self.anim_data.get_skeleton_definition()["parents"])
+        self.root_bones = np.flatnonzero(parents < 0)
+
+        # Chauffe des noyaux FK (même signature que write_frame_to_buffer) avant init_success
+        warmup = np.empty((1, self.num_bones, 4, 4), dtype=np.float64)
+        if hasattr(self.anim_data, "get_poses_at_times"):
+            self.anim_data.get_poses_at_times(np.zeros(1), warmup, loop=True, local=True)
+        else:
+            self.anim_data.get_pose_at_time_numba(0.0, warmup[0], loop=True, local=True)
+
+    @property
+    def current_time(self) -> float:
+        return self.t
+
+    def seek(self, time_s: float):
+        self.t = float(time_s)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "time": self.t,
+            "frame_id": self.frame_id,
+            "time_offsets": self.time_offsets.tolist(),
+            "speeds": self.speeds.tolist(),
+            "root_transforms": self.root_transforms.tolist(),
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        self.seek(state.get("time", self.t))
+        self.frame_id = state.get("frame_id", self.frame_id)
+        if "time_offsets" in state:
+            self.time_offsets[:] = state["time_offsets"]
+            self.speeds[:] = state["speeds"]
+            self.root_transforms[:] = state["root_transforms"]
+
+    def get_skeleton(self) -> Dict[str, Any]:
+        skeleton = self.anim_data.get_skeleton_definition()
+        skeleton["num_chars"] = self.num_chars
+        skeleton["frame_header"] = {"format": "<IIII", "fields": ["magic", "frame_id", "num_chars", "num_bones"]}
+        return skeleton
+
+    def get_memory_size(self) -> int:
+        return self.total_size
+
+    def write_frame_to_buffer(self, buffer_view: memoryview, offset: int, dt: float, playback_speed: float = 1.0):
+        self.t += dt * playback_speed
+        self.frame_id = (self.frame_id + 1) & 0xFFFFFFFF
+
+        FRAME_HEADER.pack_into(buffer_view, offset, MAGIC_NUMBER, self.frame_id, self.num_chars, self.num_bones)
+
+        target_array = np.ndarray(
+            shape=(self.num_chars, self.num_bones, 4, 4),
+            dtype=np.float64,
+            buffer=buffer_view,
+            offset=offset + FRAME_HEADER.size,
+        )
+
+        # 1. FK batchée : toutes les instances en un seul appel
+        times = self.time_offsets + self.t * self.speeds
+        if hasattr(self.anim_data, "get_poses_at_times"):
+            self.anim_data.get_poses_at_times(times, target_array, loop=True, local=True)
+        else:
+            # Chargeur sans noyau batché (FastBVH) : une évaluation numba par instance
+            for i in range(self.num_chars):
+                self.anim_data.get_pose_at_time_numba(times[i], target_array[i], loop=True, local=True)
+
+        # 2. Placement des instances dans la scène (matrices locales : seules les racines bougent)
+        roots = target_array[:, self.root_bones]
+        target_array[:, self.root_bones] = self.root_transforms[:, None] @ roots
+
+    @expose
+    def set_instance(self, index: int, time_offset: float = 0.0, speed: float = 1.0, root_transform=None):
+        """Modifie une instance : décalage temporel (s), vitesse, et matrice racine 4x4 (translation en colonne 3)"""
+        if not 0 <= index < self.num_chars:
+            raise ValueError(f"Instance {index} inexistante (0..{self.num_chars - 1})")
+
+        self.time_offsets[index] = float(time_offset)
+        self.speeds[index] = float(speed)
+        if root_transform is not None:
+            self.root_transforms[index] = np.asarray(root_transform, dtype=np.float64).reshape(4, 4)
+        return {"index": index, "time_offset": time_offset, "speed": speed}
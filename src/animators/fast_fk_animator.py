@@ -1,12 +1,38 @@
+import logging
+import os
+import threading
+
 import numpy as np
 from typing import Dict, Any
 
+import MoMaFkSolver.core as fk_solver
 from MoMaFkSolver.core import FastBVH, FastFkSolver
 
-from core.interfaces import AnimatorInterface
+from core.interfaces import AnimatorInterface, expose
+from core.jit_cache import enable_caching
+from core.pose_math import blend_poses
+from loaders.fast_glb import FastGLB
+
+logging.basicConfig()
+logger = logging.getLogger("FastFKAnimator")
+logger.setLevel(logging.INFO)
+
+# Les noyaux du solveur sont servis depuis le cache disque (NUMBA_CACHE_DIR) plutôt que recompilés
+# dans chaque processus moteur
+enable_caching(fk_solver)
+
+# Chargeur choisi selon l'extension du fichier source.
+# Tous exposent la même API que FastBVH (bone_names, frame_time, get_pose_at_time_numba...)
+LOADERS = {
+    ".bvh": FastBVH,
+    ".glb": FastGLB,
+    ".gltf": FastGLB,
+}
 
 
 class FastFKAnimator(AnimatorInterface):
+    # Pose = fonction du temps du clip : les frames peuvent être calculées d'avance
+    deterministic = True
 
     def __init__(self):
         self.anim_data: FastFkSolver = None
@@ -16,6 +42,15 @@ class FastFKAnimator(AnimatorInterface):
         self.bone_size_bytes = 4 * 4 * np.dtype(np.float64).itemsize
         self.total_size = self.num_bones * self.bone_size_bytes
 
+        # --- Changement de clip à chaud ---
+        self.source_path = None
+        self._loader_thread: threading.Thread = None
+        self._pending_clip = None  # (source_path, anim_data, fade_duration, temps de départ) prêt à être joué
+        self._clip_error = None
+        # Clip sortant pendant un fondu : (anim_data, t, durée, temps écoulé)
+        self._fade_out = None
+        self._fade_buffer: np.ndarray = None
+
     @property
     def animator_fps(self):
         if self.anim_data is not None:
@@ -28,10 +63,53 @@ class FastFKAnimator(AnimatorInterface):
             return self.anim_data.frame_time
         return 1.0 / 30.0
 
+    @staticmethod
+    def _load_clip(source_path: str):
+        extension = os.path.splitext(source_path)[1].lower()
+        loader = LOADERS.get(extension)
+        if loader is None:
+            raise ValueError(
+                f"Format '{extension}' non supporté par FastFK (formats : {', '.join(LOADERS)}). "
+                "Convertir les FBX en .glb pour la lecture rapide."
+            )
+        return loader(source_path)
+
     def initialize(self, source_path: str):
-        self.anim_data = FastBVH(source_path)
+        self.anim_data = self._load_clip(source_path)
+        self.source_path = source_path
         self.num_bones = len(self.anim_data.bone_names)
         self.total_size = self.num_bones * self.bone_size_bytes
+        self._fade_buffer = np.empty((self.num_bones, 4, 4), dtype=np.float64)
+
+        # Chauffe : compilation (ou chargement depuis le cache) des noyaux avec la signature de
+        # write_frame_to_buffer, avant init_success, pour que la première frame diffusée soit déjà rapide
+        self.anim_data.get_pose_at_time_numba(0.0, self._fade_buffer, loop=True, local=True)
+
+    @property
+    def current_time(self) -> float:
+        return self.t
+
+    def seek(self, time_s: float):
+        self.t = float(time_s)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"time": self.t, "source_path": self.source_path}
+
+    def restore(self, state: Dict[str, Any]):
+        # Le clip a pu être changé à chaud depuis le démarrage de la session : chargé tout de suite (même
+        # squelette exigé), avant la première frame, pour que la lecture reprenne sur ce clip au temps restauré.
+        # Un chargement en arrière-plan laisserait jouer l'ancien clip puis ramènerait le temps en arrière.
+        source_path = state.get("source_path")
+        time_s = float(state.get("time", self.t))
+        if source_path and source_path != self.source_path:
+            try:
+                self._pending_clip = (source_path, self._load_compatible_clip(source_path), 0.0, time_s)
+                self._start_fade()
+                return
+            except Exception as e:
+                logger.error(f"Échec du chargement de {source_path}: {e}")
+                self._clip_error = str(e)
+        self.seek(time_s)
 
     def get_skeleton(self) -> Dict[str, Any]:
         return self.anim_data.get_skeleton_definition()
@@ -51,6 +129,10 @@ class FastFKAnimator(AnimatorInterface):
             offset=offset,
         )
 
+        # Un clip chargé en arrière-plan est prêt : le clip courant devient le clip sortant
+        if self._pending_clip is not None:
+            self._start_fade()
+
         matrices = self.anim_data.get_pose_at_time_numba(
             self.t, target_array, loop=True, local=True
         )
@@ -58,5 +140,97 @@ class FastFKAnimator(AnimatorInterface):
         if matrices is None:
             return b""
 
+        if self._fade_out is not None:
+            self._apply_fade(target_array, dt * playback_speed)
+
         # # Copy direct des matrices calculées dans la mémoire partagée
         # np.copyto(target_array, matrices)
+
+    def write_frames_to_buffer(self, buffer_view: memoryview, offset: int, count: int, dt: float, playback_speed: float = 1.0):
+        # Changement de clip ou fondu en cours : état qui évolue frame par frame
+        batched = hasattr(self.anim_data, "get_poses_at_times")
+        if self._pending_clip is not None or self._fade_out is not None or not batched:
+            return super().write_frames_to_buffer(buffer_view, offset, count, dt, playback_speed)
+
+        # Lot de poses calculé en un appel, directement dans les slots contigus du ring
+        times = self.t + dt * playback_speed * np.arange(1, count + 1)
+        target_array = np.ndarray(
+            shape=(count, self.num_bones, 4, 4),
+            dtype=np.float64,
+            buffer=buffer_view,
+            offset=offset,
+        )
+        self.anim_data.get_poses_at_times(times, target_array, loop=True, local=True)
+        self.t = float(times[-1])
+
+    # --- CHANGEMENT DE CLIP À CHAUD ---
+
+    def _load_in_background(self, source_path: str, fade_duration: float, start_time: float = 0.0):
+        if self._loader_thread is not None and self._loader_thread.is_alive():
+            raise RuntimeError("Un changement de clip est déjà en cours")
+
+        self._clip_error = None
+        self._loader_thread = threading.Thread(
+            target=self._background_load,
+            args=(source_path, fade_duration, start_time),
+            daemon=True,
+        )
+        self._loader_thread.start()
+
+    def _load_compatible_clip(self, source_path: str):
+        anim_data = self._load_clip(source_path)
+        if list(anim_data.bone_names) != list(self.anim_data.bone_names):
+            raise ValueError(
+                f"Squelette incompatible : {source_path} n'a pas les mêmes os que le clip courant"
+            )
+        return anim_data
+
+    def _background_load(self, source_path: str, fade_duration: float, start_time: float):
+        """Exécuté dans un thread du moteur : la boucle de rendu continue pendant le chargement"""
+        try:
+            anim_data = self._load_compatible_clip(source_path)
+            self._pending_clip = (source_path, anim_data, fade_duration, start_time)
+            logger.info(f"Clip {source_path} chargé, fondu de {fade_duration}s")
+        except Exception as e:
+            logger.error(f"Échec du chargement de {source_path}: {e}")
+            self._clip_error = str(e)
+
+    def _start_fade(self):
+        source_path, anim_data, fade_duration, start_time = self._pending_clip
+        self._pending_clip = None
+
+        if fade_duration > 0.0:
+            self._fade_out = (self.anim_data, self.t, fade_duration, 0.0)
+        self.anim_data = anim_data
+        self.source_path = source_path
+        self.t = start_time
+
+    def _apply_fade(self, target_array: np.ndarray, step: float):
+        """Fondu enchaîné : slerp vectorisé sur tous les os entre le clip sortant et le nouveau"""
+        old_data, old_t, duration, elapsed = self._fade_out
+        old_t += step
+        elapsed += abs(step)
+
+        old_data.get_pose_at_time_numba(old_t, self._fade_buffer, loop=True, local=True)
+        alpha = min(elapsed / duration, 1.0)
+        blend_poses(self._fade_buffer, target_array, alpha, target_array)
+
+        self._fade_out = None if alpha >= 1.0 else (old_data, old_t, duration, elapsed)
+
+    @expose
+    def swap_clip(self, source_path: str, fade_duration: float = 0.5):
+        """
+        Charge un autre clip (même squelette) en arrière-plan puis fond vers lui.
+        Retourne immédiatement : le moteur ne s'arrête pas et les clients restent connectés.
+        """
+        self._load_in_background(source_path, float(fade_duration))
+        return "loading"
+
+    @expose
+    def get_clip_status(self):
+        return {
+            "source": self.source_path,
+            "loading": self._loader_thread is not None and self._loader_thread.is_alive(),
+            "fading": self._fade_out is not None,
+            "error": self._clip_error,
+        }
@@ -0,0 +1,73 @@
+from typing import Dict, Any
+
+import numpy as np
+
+from core.capture import CaptureReader
+from core.interfaces import AnimatorInterface, expose
+
+
+class ReplayAnimator(AnimatorInterface):
+    """
+    Rejoue un fichier de capture (voir core/capture.py) sans aucun calcul d'animation.
+
+    Chaque frame est copiée telle quelle depuis le fichier mappé vers la SHM,
+    en suivant les instants de publication enregistrés : vitesse, seek et pause restent disponibles.
+    """
+
+    def __init__(self, loop: bool = True):
+        self.capture: CaptureReader = None
+        self.loop = loop
+        self.t = 0.0
+
+    @property
+    def animator_fps(self):
+        if self.capture is not None:
+            return 1.0 / self.capture.frame_time
+        return 60.0
+
+    @property
+    def animator_frametime(self):
+        if self.capture is not None:
+            return self.capture.frame_time
+        return 1.0 / 60.0
+
+    def initialize(self, source_path: str):
+        self.capture = CaptureReader(source_path)
+
+    @property
+    def current_time(self) -> float:
+        return self.t
+
+    def seek(self, time_s: float):
+        self.t = float(time_s)
+
+    def get_skeleton(self) -> Dict[str, Any]:
+        skeleton = dict(self.capture.metadata.get("skeleton") or {})
+        skeleton["replay"] = {
+            "frames": self.capture.frame_count,
+            "duration": self.capture.duration,
+            "source": self.capture.metadata.get("source_path"),
+        }
+        return skeleton
+
+    def get_memory_size(self) -> int:
+        return self.capture.frame_size
+
+    def write_frame_to_buffer(self, buffer_view: memoryview, offset: int, dt: float, playback_speed: float = 1.0):
+        self.t += dt * playback_speed
+
+        duration = self.capture.duration
+        if self.loop:
+            self.t %= duration
+        else:
+            self.t = min(max(self.t, 0.0), duration)
+
+        # Dernière frame publiée avant l'instant t
+        index = int(np.searchsorted(self.capture.times, self.t, side="right")) - 1
+        index = min(max(index, 0), self.capture.frame_count - 1)
+        buffer_view[offset : offset + self.capture.frame_size] = self.capture.frame(index)
+
+    @expose
+    def get_timeline(self):
+        """Commandes enregistrées pendant la capture (frame_id, instant, commande, arguments)"""
+        return self.capture.metadata.get("commands", [])
@@ -1,13 +1,22 @@
+import itertools
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 
 import numpy as np
 from skanym.structures.network.vae import VAE
 
-from core.env import VAE_DIR
+from core.env import (
+    VAE_DIR,
+    VAE_SIMULATION_FPS,
+    VAE_CACHE_LATENT_STEP,
+    VAE_CACHE_PHASE_BINS,
+    VAE_CACHE_CYCLE,
+    VAE_CACHE_PREFILL,
+)
 from core.interfaces import AnimatorInterface, expose
+from core.pose_cache import PoseCache, quantize_key
 import skanym as sk
 from skanym.utils.character import remove_fingers
 from skanym.animators.vaeAnimator import VaeAnimator as skVaeAnimator
@@ -23,6 +32,9 @@ logger.setLevel(logging.INFO)
 
 
 class VaeAnimator(AnimatorInterface):
+    # Le décodeur VAE tourne à 30 Hz quel que soit le fps des clients (poses interpolées au-delà)
+    simulation_fps = VAE_SIMULATION_FPS or None
+
     def __init__(self):
         self.anim_data: skVaeAnimator = None
         self.t = 0.0
@@ -31,6 +43,13 @@ class VaeAnimator(AnimatorInterface):
         self.bone_size_bytes = 4 * 4 * np.dtype(np.float64).itemsize
         self.total_size = self.num_bones * self.bone_size_bytes
 
+        # Cache de poses partagé (attaché par le moteur si VAE_CACHE_SIZE > 0)
+        self.pose_cache: Optional[PoseCache] = None
+        # Temps non transmis au VAE pendant les succès du cache, rattrapé à la prochaine inférence
+        self.pending_dt = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     @property
     def animator_fps(self):
         pass
@@ -66,26 +85,46 @@ class VaeAnimator(AnimatorInterface):
         self.skeleton = (
             current_skeleton  # Skeleton is loaded from the last animation in the dict
         )
+        self.animations = animations
+
+        self.anim_data = self._create_vae()
+
+        self.num_bones = self.skeleton.get_nb_joints()
+        self.total_size = self.num_bones * self.bone_size_bytes
 
-        self.anim_data = skVaeAnimator(
+    def _create_vae(self) -> skVaeAnimator:
+        vae = skVaeAnimator(
             (self.skeleton),
-            animations,
+            self.animations,
             3,
             int(30.0),
             model_path=VAE_DIR + "/model/cvae_b10.0_l3",
         )  # MAGIC NUMBERS
 
         # PATCH: Injection de l'attribut manquant 'rotation' pour les anciens modèles
-        if hasattr(self.anim_data, "model") and not hasattr(
-            self.anim_data.model, "rotation"
+        if hasattr(vae, "model") and not hasattr(
+            vae.model, "rotation"
         ):
             logger.warning(
                 "Modèle CVAE chargé sans attribut 'rotation'. Application de la valeur par défaut 'quaternion'."
             )
-            self.anim_data.model.rotation = "quaternion"
+            vae.model.rotation = "quaternion"
+        return vae
 
-        self.num_bones = self.skeleton.get_nb_joints()
-        self.total_size = self.num_bones * self.bone_size_bytes
+    @property
+    def current_time(self) -> float:
+        return self.t
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = {"time": self.t}
+        if getattr(self.anim_data, "vae_values", None) is not None:
+            state["vae_values"] = np.asarray(self.anim_data.vae_values).tolist()
+        return state
+
+    def restore(self, state: Dict[str, Any]):
+        self.t = float(state.get("time", self.t))
+        if "vae_values" in state:
+            self.anim_data.set_vae_values(np.asarray(state["vae_values"], dtype=np.float64))
 
     def get_skeleton(self) -> Dict[str, Any]:
         self.bone_names = [name for name in self.skeleton.as_joint_dict().values()]
@@ -117,10 +156,8 @@ class VaeAnimator(AnimatorInterface):
     def write_frame_to_buffer(
         self, buffer_view: memoryview, offset: int, dt: float, playback_speed: float
     ):
-        # Index 1 contains the local transformation matrices
-        # Index 2 contains the global transformation matrices
-        output_lst = self.anim_data.step(dt * playback_speed)
-        global_mat = output_lst[1]
+        step = dt * playback_speed
+        self.t += step
 
         target_array = np.ndarray(
             shape=(self.num_bones, 4, 4),
@@ -129,7 +166,80 @@ class VaeAnimator(AnimatorInterface):
             offset=offset,
         )
 
+        # Succès du cache : pas d'inférence keras, le VAE rattrapera ce temps à la prochaine
+        key = self._cache_key()
+        if key is not None and self.pose_cache.get(key, target_array):
+            self.pending_dt += step
+            self.cache_hits += 1
+            return
+
+        # Index 1 contains the local transformation matrices
+        # Index 2 contains the global transformation matrices
+        output_lst = self.anim_data.step(self.pending_dt + step)
+        self.pending_dt = 0.0
+        global_mat = output_lst[1]
+
         np.copyto(target_array, global_mat)
+        if key is not None:
+            self.cache_misses += 1
+            self.pose_cache.put(key, target_array)
+
+    # --- Cache de poses ---
+
+    def attach_pose_cache(self, cache: Optional[PoseCache]):
+        self.pose_cache = cache
+
+    def _cache_key(self, latent=None, t: Optional[float] = None):
+        if self.pose_cache is None:
+            return None
+        if latent is None:
+            latent = getattr(self.anim_data, "vae_values", None)
+            if latent is None:
+                return None
+        # Phase tirée du temps de l'animateur : elle avance aussi pendant les succès du cache
+        phase = ((self.t if t is None else t) / VAE_CACHE_CYCLE) % 1.0
+        return quantize_key(np.ravel(latent), phase, VAE_CACHE_LATENT_STEP, VAE_CACHE_PHASE_BINS)
+
+    @staticmethod
+    def wants_prefill() -> bool:
+        return bool(VAE_CACHE_PREFILL)
+
+    def prefill_pose_cache(self, on_progress=None) -> int:
+        """
+        Balaie la grille VAE_CACHE_PREFILL ("min:max:n" par dimension latente) sur un cycle complet
+        et remplit le cache. Le balayage tourne sur un VAE jetable : step() fait avancer le modèle
+        autorégressif, que restore() ne sait pas ramener en arrière ; la lecture en cours n'est pas touchée.
+        """
+        low, high, count = VAE_CACHE_PREFILL.split(":")
+        values = np.linspace(float(low), float(high), int(count))
+        latent_size = len(np.ravel(self.anim_data.vae_values)) if self.anim_data.vae_values is not None else 3
+        step = VAE_CACHE_CYCLE / VAE_CACHE_PHASE_BINS
+
+        vae = self._create_vae()
+        t = self.t
+        inserted = 0
+        for latent in itertools.product(values, repeat=latent_size):
+            latent = np.array(latent, dtype=np.float64)
+            vae.set_vae_values(latent)
+            for _ in range(VAE_CACHE_PHASE_BINS):
+                global_mat = vae.step(step)[1]
+                t += step
+                inserted += self.pose_cache.put(self._cache_key(latent, t), np.ascontiguousarray(global_mat))
+            if on_progress is not None:
+                on_progress()
+        logger.info(f"Cache de poses pré-rempli : {inserted} poses ({len(values)}^{latent_size} latents)")
+        return inserted
+
+    @expose
+    def get_pose_cache_stats(self):
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "enabled": self.pose_cache is not None,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else None,
+            "table": self.pose_cache.stats() if self.pose_cache is not None else None,
+        }
 
     @expose
     def set_vae_values(self, floats):
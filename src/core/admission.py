@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("Admission")
+logger.setLevel(logging.INFO)
+
+# Contrôle d'admission des sessions : chaque moteur est mesuré par le superviseur (/proc, sans dépendance),
+# un modèle de coût par type d'animateur en est déduit, et POST /sessions est refusé, mis en attente ou
+# redirigé quand le coût estimé d'un nouveau moteur dépasse la marge restante de la machine.
+#
+#   utilisé = serveur + moteurs mesurés ; réservé = moteurs admis pas encore mesurés (coût estimé)
+#   marge   = budget - utilisé - réservé
+
+ADMISSION_POLICIES = ("off", "reject", "queue", "redirect")
+
+# Ressources suivies : coeurs, RAM (PSS, octets), mémoire partagée (octets)
+RESOURCES = ("cpu", "memory", "shm")
+
+_MB = 1024 * 1024
+
+# Coût d'un moteur avant la première mesure de son type (coeurs, RAM, SHM)
+DEFAULT_COSTS: Dict[str, Tuple[float, int, int]] = {
+    "FastFKAnimator": (0.1, 200 * _MB, 1 * _MB),
+    "ReplayAnimator": (0.05, 150 * _MB, 1 * _MB),
+    "CrowdAnimator": (0.5, 250 * _MB, 8 * _MB),
+    "VaeAnimator": (1.0, 1500 * _MB, 1 * _MB),
+}
+FALLBACK_COST = (0.5, 500 * _MB, 4 * _MB)
+
+# Poids d'une nouvelle mesure dans le coût moyen d'un type d'animateur
+MODEL_ALPHA = 0.05
+
+# Mesures ignorées après le lancement d'un moteur : chargement du fichier, compilation JIT (s)
+WARMUP_S = 5.0
+
+# Délai conseillé aux clients refusés (en-tête Retry-After, s)
+RETRY_AFTER_S = 5
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    """Temps CPU cumulé (utilisateur + système) d'un processus, None s'il n'existe plus"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Le nom du processus (2e champ) peut contenir des espaces : on repart de la parenthèse fermante
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    # utime et stime : 14e et 15e champs de /proc/<pid>/stat
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+
+
+def memory_bytes(pid: int) -> Optional[int]:
+    """
+    Mémoire proportionnelle (PSS) d'un processus : les pages héritées du serveur par fork ne sont comptées
+    qu'au prorata de leurs processus. Repli sur la mémoire résidente sans smaps_rollup.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError):
+        return None
+
+
+def host_budget() -> Tuple[float, int, int]:
+    """Ressources de la machine (ou du conteneur) : coeurs utilisables, RAM, taille de /dev/shm"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    memory = 0
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    memory = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    # Limite du cgroup (conteneur), si plus basse
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            memory = min(memory, int(limit)) if memory else int(limit)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        stat = os.statvfs("/dev/shm")
+        shm = stat.f_blocks * stat.f_frsize
+    except OSError:
+        shm = 0
+    return float(cpus), memory, shm
+
+
+class EngineUsage:
+    """Consommation mesurée d'un processus (moteur ou serveur), relevée à chaque tour du superviseur"""
+
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.started_at = 0.0
+        self.sampled_at = 0.0
+        self.samples = 0
+        self._cpu_s = 0.0
+        self._write_seq = 0
+        # Dernières mesures
+        self.cores = 0.0
+        self.cpu_per_frame_us = 0.0
+        self.frames = 0
+        self.memory = 0
+        self.shm = 0
+
+    def update(self, pid: int, write_seq: int = 0, shm: int = 0, now: Optional[float] = None) -> bool:
+        """Nouvelle mesure ; False si le processus a disparu"""
+        now = time.monotonic() if now is None else now
+        cpu_s = cpu_seconds(pid)
+        if cpu_s is None:
+            return False
+
+        if pid != self.pid:
+            # Nouveau processus (lancement, redémarrage, migration) : nouvelle référence
+            self.pid = pid
+            self.started_at = now
+            self.samples = 0
+        else:
+            elapsed = now - self.sampled_at
+            if elapsed > 0:
+                self.cores = (cpu_s - self._cpu_s) / elapsed
+                self.frames = write_seq - self._write_seq
+                if self.frames > 0:
+                    # Coût CPU d'un tour de boucle du moteur (une frame publiée)
+                    self.cpu_per_frame_us = (cpu_s - self._cpu_s) * 1e6 / self.frames
+            self.samples += 1
+
+        self._cpu_s, self._write_seq, self.sampled_at = cpu_s, write_seq, now
+        self.memory = memory_bytes(pid) or self.memory
+        self.shm = shm
+        return True
+
+    @property
+    def warm(self) -> bool:
+        """Mesures représentatives : au moins un intervalle mesuré, après le chargement du moteur"""
+        return self.samples > 0 and self.sampled_at - self.started_at >= WARMUP_S
+
+    def cost(self) -> Tuple[float, int, int]:
+        return self.cores, self.memory, self.shm
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "warm": self.warm,
+            "cpu": self.cores,
+            "cpu_per_frame_us": self.cpu_per_frame_us,
+            "memory": self.memory,
+            "shm": self.shm,
+        }
+
+
+class CapacityModel:
+    """Coût moyen (moyenne exponentielle des mesures) d'un moteur, par type d'animateur"""
+
+    def __init__(self):
+        self.costs: Dict[str, Tuple[float, int, int]] = {}
+        self.samples: Dict[str, int] = {}
+
+    def estimate(self, animator: str) -> Tuple[float, int, int]:
+        cost = self.costs.get(animator)
+        if cost is None:
+            cost = DEFAULT_COSTS.get(animator, FALLBACK_COST)
+        return cost
+
+    def observe(self, animator: str, cost: Tuple[float, int, int]):
+        previous = self.costs.get(animator)
+        if previous is None:
+            # La première mesure remplace le coût par défaut
+            self.costs[animator] = cost
+        else:
+            self.costs[animator] = (
+                previous[0] + MODEL_ALPHA * (cost[0] - previous[0]),
+                int(previous[1] + MODEL_ALPHA * (cost[1] - previous[1])),
+                int(previous[2] + MODEL_ALPHA * (cost[2] - previous[2])),
+            )
+        self.samples[animator] = self.samples.get(animator, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            animator: {
+                **dict(zip(RESOURCES, self.estimate(animator))),
+                "samples": self.samples.get(animator, 0),
+            }
+            for animator in sorted(set(DEFAULT_COSTS) | set(self.costs))
+        }
+
+
+class CapacityError(RuntimeError):
+    """Plus assez de marge pour un nouveau moteur"""
+
+    def __init__(self, message: str, retry_after: int = RETRY_AFTER_S):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CapacityRedirect(CapacityError):
+    """Plus assez de marge : la création doit être rejouée sur un autre serveur"""
+
+    def __init__(self, message: str, url: str):
+        super().__init__(message)
+        self.url = url
+
+
+class AdmissionController:
+    """
+    Budget de la machine et réservations des moteurs admis.
+
+    Politiques :
+    - "off"      : tout est admis (comptabilité et marge publiées quand même)
+    - "reject"   : refus immédiat (503 + Retry-After)
+    - "queue"    : attente qu'une marge se libère (fin de session, mesure plus basse), 503 après 'queue_timeout'
+    - "redirect" : renvoi du client vers 'redirect_url' (autre serveur, répartiteur)
+    """
+
+    def __init__(
+        self,
+        policy: str = "off",
+        cpu_budget: float = 0.0,
+        memory_budget: int = 0,
+        shm_budget: int = 0,
+        queue_timeout: float = 30.0,
+        redirect_url: str = "",
+    ):
+        if policy not in ADMISSION_POLICIES:
+            raise ValueError(f"Politique d'admission inconnue: {policy} (attendu: {', '.join(ADMISSION_POLICIES)})")
+        if policy == "redirect" and not redirect_url:
+            raise ValueError("La politique d'admission 'redirect' demande ADMISSION_REDIRECT_URL")
+        self.policy = policy
+        self.queue_timeout = queue_timeout
+        self.redirect_url = redirect_url.rstrip("/")
+
+        # Budget non renseigné (0) : ressources de la machine
+        host = host_budget()
+        self.budget = (
+            cpu_budget or host[0],
+            memory_budget or host[1],
+            shm_budget or host[2],
+        )
+        self.model = CapacityModel()
+        # Consommation mesurée (serveur + moteurs chauds), mise à jour par le superviseur
+        self.used: Tuple[float, int, int] = (0.0, 0, 0)
+        # session_id -> (type d'animateur, coût estimé) : moteurs admis, pas encore mesurés
+        self.reservations: Dict[str, Tuple[str, Tuple[float, int, int]]] = {}
+        self.queued = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Créée à la première utilisation, dans la boucle asyncio du serveur
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def reserved(self) -> Tuple[float, int, int]:
+        costs = [cost for _, cost in self.reservations.values()]
+        return tuple(sum(cost[i] for cost in costs) for i in range(len(RESOURCES)))
+
+    def headroom(self) -> Tuple[float, int, int]:
+        reserved = self.reserved()
+        return tuple(self.budget[i] - self.used[i] - reserved[i] for i in range(len(RESOURCES)))
+
+    def fits(self, cost: Tuple[float, int, int]) -> bool:
+        return all(need <= free for need, free in zip(cost, self.headroom()))
+
+    def reserve(self, session_id: str, animator: str):
+        """Compte le coût estimé d'un moteur jusqu'à ce que ses propres mesures le remplacent"""
+        self.reservations[session_id] = (animator, self.model.estimate(animator))
+
+    def release(self, session_id: str) -> bool:
+        return self.reservations.pop(session_id, None) is not None
+
+    async def admit(self, session_id: str, animator: str):
+        """Réserve la place d'un nouveau moteur, ou lève CapacityError / CapacityRedirect selon la politique"""
+        cost = self.model.estimate(animator)
+        if self.policy == "off" or self.fits(cost):
+            self.reserve(session_id, animator)
+            return
+
+        message = f"Capacité du serveur atteinte pour un moteur {animator}"
+        if self.policy == "redirect":
+            raise CapacityRedirect(message, f"{self.redirect_url}/sessions")
+        if self.policy == "reject":
+            raise CapacityError(message)
+
+        logger.info(f"Session {session_id}: en attente de capacité ({animator})")
+        self.queued += 1
+        try:
+            async with self.condition:
+                await asyncio.wait_for(self.condition.wait_for(lambda: self.fits(cost)), self.queue_timeout)
+                self.reserve(session_id, animator)
+        except asyncio.TimeoutError:
+            raise CapacityError(f"{message} (attente de {self.queue_timeout:.0f}s écoulée)")
+        finally:
+            self.queued -= 1
+
+    async def changed(self):
+        """Marge modifiée (mesures, session supprimée) : réveille les créations en attente"""
+        if self.queued:
+            async with self.condition:
+                self.condition.notify_all()
+
+    def max_sessions(self) -> Dict[str, int]:
+        """Nombre de moteurs supplémentaires de chaque type que la marge actuelle permet d'admettre"""
+        headroom = self.headroom()
+        counts = {}
+        for animator in self.model.as_dict():
+            cost = self.model.estimate(animator)
+            counts[animator] = max(
+                0, int(min(free / need if need > 0 else float("inf") for need, free in zip(cost, headroom)))
+            )
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        max_sessions = self.max_sessions()
+        return {
+            "policy": self.policy,
+            "accepting": self.policy == "off" or any(max_sessions.values()),
+            "budget": dict(zip(RESOURCES, self.budget)),
+            "used": dict(zip(RESOURCES, self.used)),
+            "reserved": dict(zip(RESOURCES, self.reserved())),
+            "headroom": dict(zip(RESOURCES, self.headroom())),
+            "queued": self.queued,
+            "max_new_sessions": max_sessions,
+            "models": self.model.as_dict(),
+        }
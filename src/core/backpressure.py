@@ -0,0 +1,61 @@
+class AdaptiveRateController:
+    """
+    Régule le fps du moteur selon la pression exercée par le consommateur (broadcaster).
+
+    À chaque fenêtre de 'window' ticks, on mesure la proportion de ticks où le ring était plein :
+    - au-delà de 'saturation_ratio', on descend d'un palier (fps * step), sans passer sous min_fps ;
+    - après 'recovery_windows' fenêtres sans saturation, on remonte d'un palier vers le fps cible.
+    """
+
+    def __init__(
+        self,
+        target_fps: float,
+        min_fps: float,
+        window: int = 30,
+        saturation_ratio: float = 0.1,
+        recovery_windows: int = 3,
+        step: float = 0.75,
+    ):
+        self.window = window
+        self.saturation_ratio = saturation_ratio
+        self.recovery_windows = recovery_windows
+        self.step = step
+        self.min_fps = min_fps
+        self.set_target(target_fps)
+
+    def set_target(self, target_fps: float):
+        self.target_fps = target_fps
+        self.fps = target_fps
+        self.level = 0
+        self._ticks = 0
+        self._saturated = 0
+        self._calm_windows = 0
+
+    def update(self, saturated: bool) -> bool:
+        """Enregistre un tick ; retourne True si le fps (et le palier) a changé"""
+        self._ticks += 1
+        if saturated:
+            self._saturated += 1
+        if self._ticks < self.window:
+            return False
+
+        ratio = self._saturated / self._ticks
+        self._ticks = 0
+        self._saturated = 0
+
+        if ratio > self.saturation_ratio:
+            self._calm_windows = 0
+            if self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps * self.step)
+                self.level += 1
+                return True
+        elif ratio == 0.0:
+            self._calm_windows += 1
+            if self._calm_windows >= self.recovery_windows and self.level > 0:
+                self._calm_windows = 0
+                self.level -= 1
+                self.fps = self.target_fps if self.level == 0 else min(self.target_fps, self.fps / self.step)
+                return True
+        else:
+            self._calm_windows = 0
+        return False
@@ -0,0 +1,146 @@
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Format d'un fichier de capture (.cap), préalloué puis mappé en mémoire :
+#
+#   [ En-tête (64 o) | Index (capacity x 16 o) | Payloads (capacity x frame_size) ]
+#
+# En-tête : magic (8) + version (4) + frame_size (4) + capacity (8) + frame_count (8)
+# Index   : (frame_id, timestamp_ns) en uint64 pour chaque frame enregistrée
+# Les payloads sont les frames SHM telles que diffusées. Le squelette, les métadonnées de la session
+# et la timeline des commandes sont dans un fichier JSON voisin (même nom, extension .json).
+CAPTURE_MAGIC = b"MOMACAP1"
+CAPTURE_VERSION = 1
+CAPTURE_EXTENSION = ".cap"
+HEADER = struct.Struct("<8sIIQQ")
+HEADER_SIZE = 64
+INDEX_ENTRY_SIZE = 16
+
+
+def sidecar_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def _payload_offset(capacity: int) -> int:
+    offset = HEADER_SIZE + capacity * INDEX_ENTRY_SIZE
+    return offset + (-offset % 64)
+
+
+class CaptureWriter:
+    """
+    Enregistre les frames publiées d'une session dans un fichier de capture préalloué.
+    Aucune allocation par frame : chaque append() est une copie dans le fichier mappé.
+    """
+
+    def __init__(self, path: str, frame_size: int, capacity: int, metadata: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.frame_size = frame_size
+        self.capacity = capacity
+        self.metadata = metadata or {}
+        self.commands = []
+        self.frame_count = 0
+        self.payload_offset = _payload_offset(capacity)
+
+        size = self.payload_offset + capacity * frame_size
+        self.file = open(path, "w+b")
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+
+        HEADER.pack_into(self.mm, 0, CAPTURE_MAGIC, CAPTURE_VERSION, frame_size, capacity, 0)
+        self.index = np.ndarray((capacity, 2), dtype=np.uint64, buffer=self.mm, offset=HEADER_SIZE)
+        self.started_ns = time.monotonic_ns()
+
+    @property
+    def full(self) -> bool:
+        return self.frame_count >= self.capacity
+
+    def append(self, frame_id: int, timestamp_ns: int, payload) -> bool:
+        """Ajoute une frame ; retourne False si la capture est pleine"""
+        if self.full:
+            return False
+
+        offset = self.payload_offset + self.frame_count * self.frame_size
+        self.mm[offset : offset + self.frame_size] = payload
+        self.index[self.frame_count] = (frame_id, timestamp_ns)
+        self.frame_count += 1
+        # Compteur à jour dans le fichier : une capture interrompue reste lisible
+        struct.pack_into("<Q", self.mm, HEADER.size - 8, self.frame_count)
+        return True
+
+    def record_command(self, frame_id: int, cmd_name: str, args: Any):
+        """Ajoute une commande à la timeline, datée par la dernière frame diffusée"""
+        self.commands.append(
+            {
+                "frame_id": frame_id,
+                "time": (time.monotonic_ns() - self.started_ns) / 1e9,
+                "command": cmd_name,
+                "args": args,
+            }
+        )
+
+    def close(self) -> Dict[str, Any]:
+        with open(sidecar_path(self.path), "w") as f:
+            json.dump({**self.metadata, "frame_count": self.frame_count, "commands": self.commands}, f, default=str)
+
+        # Les vues NumPy doivent être libérées avant de fermer le mmap
+        self.index = None
+        self.mm.flush()
+        self.mm.close()
+        # Les payloads sont en fin de fichier : on rend la place non utilisée
+        self.file.truncate(self.payload_offset + self.frame_count * self.frame_size)
+        self.file.close()
+        return {"path": self.path, "frames": self.frame_count}
+
+
+class CaptureReader:
+    """Lecture zero-copy d'un fichier de capture mappé en mémoire (lecture seule)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.frame_size, self.capacity, self.frame_count = HEADER.unpack_from(self.mm, 0)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            self.close()
+            raise ValueError(f"{path} n'est pas un fichier de capture valide")
+        if self.frame_count == 0:
+            self.close()
+            raise ValueError(f"{path} ne contient aucune frame")
+
+        self.payload_offset = _payload_offset(self.capacity)
+        index = np.frombuffer(self.mm, dtype=np.uint64, count=self.frame_count * 2, offset=HEADER_SIZE)
+        index = index.reshape(self.frame_count, 2)
+        self.frame_ids = index[:, 0].copy()
+        # Temps de publication relatifs à la première frame (s)
+        self.times = (index[:, 1] - index[0, 1]).astype(np.float64) / 1e9
+        del index
+
+        self.metadata: Dict[str, Any] = {}
+        if os.path.exists(sidecar_path(path)):
+            with open(sidecar_path(path)) as f:
+                self.metadata = json.load(f)
+
+    @property
+    def frame_time(self) -> float:
+        if self.frame_count < 2:
+            return 1.0 / 60.0
+        return float(np.median(np.diff(self.times)))
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1]) + self.frame_time
+
+    def frame(self, index: int) -> memoryview:
+        offset = self.payload_offset + index * self.frame_size
+        return memoryview(self.mm)[offset : offset + self.frame_size]
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("Cluster")
+logger.setLevel(logging.INFO)
+
+# Mode cluster : chaque serveur MoMa (noeud) publie périodiquement sa capacité (GET /capacity) et ses sessions
+# auprès d'une passerelle légère (gateway.py), qui place les nouvelles sessions sur le noeud le moins chargé
+# puis relaie (ou redirige) les routes de contrôle et les WebSockets vers le noeud propriétaire.
+#
+#   client ──> passerelle ──> noeud A (moteurs, SHM)
+#                        └──> noeud B ...
+
+# Type de session (POST /sessions) -> animateur, pour lire le coût estimé publié par chaque noeud
+SESSION_TYPES = {
+    "FK": "FastFKAnimator",
+    "VAE": "VaeAnimator",
+    "CROWD": "CrowdAnimator",
+    "REPLAY": "ReplayAnimator",
+}
+
+# Attente max d'une requête relayée (POST /sessions?wait=1 attend le démarrage du moteur) (s)
+PROXY_TIMEOUT = 75.0
+
+# En-têtes relayés tels quels entre le client et le noeud
+FORWARDED_HEADERS = (
+    "content-type",
+    "content-disposition",
+    "location",
+    "retry-after",
+    "etag",
+    "if-none-match",
+    "cache-control",
+    "x-frame-id",
+    "x-timestamp-ns",
+)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Une redirection d'un noeud (admission "redirect") est rendue au client, pas suivie par la passerelle
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def http_request(
+    url: str,
+    method: str = "GET",
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10.0,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Requête HTTP bloquante (urllib, dans l'executor) ; les statuts d'erreur sont retournés, pas levés"""
+    request = urllib.request.Request(url, data=body, headers=headers or {}, method=method)
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            return response.status, {k.lower(): v for k, v in response.headers.items()}, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, {k.lower(): v for k, v in e.headers.items()}, e.read()
+
+
+async def http_json(url: str, method: str = "GET", payload: Any = None, timeout: float = 10.0) -> Tuple[int, Any]:
+    body = json.dumps(payload).encode() if payload is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    loop = asyncio.get_running_loop()
+    status, _, content = await loop.run_in_executor(None, http_request, url, method, body, headers, timeout)
+    try:
+        return status, json.loads(content) if content else None
+    except ValueError:
+        return status, content.decode(errors="replace")
+
+
+# --- CÔTÉ NOEUD ---
+
+
+class ClusterAgent:
+    """
+    Inscription d'un noeud auprès de la passerelle : PUT /nodes/{node_id} toutes les 'interval' s
+    avec son URL, sa capacité et ses sessions (la passerelle reconstruit ainsi sa table après un redémarrage).
+    """
+
+    def __init__(self, gateway_url: str, node_url: str, node_id: str, interval: float, report: Callable[[], Dict]):
+        self.gateway_url = gateway_url.rstrip("/")
+        self.node_url = node_url.rstrip("/")
+        self.node_id = node_id or self.node_url
+        self.interval = interval
+        self.report = report
+        self.task: Optional[asyncio.Task] = None
+        # Un seul avertissement par coupure
+        self.warned = False
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.heartbeat_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        # Départ annoncé : la passerelle cesse de placer des sessions ici
+        try:
+            await http_json(f"{self.gateway_url}/nodes/{self.node_id}", "DELETE", timeout=2.0)
+        except OSError:
+            pass
+
+    async def heartbeat_loop(self):
+        logger.info(f"Noeud {self.node_id}: inscription auprès de {self.gateway_url}")
+        while True:
+            try:
+                status, _ = await http_json(
+                    f"{self.gateway_url}/nodes/{self.node_id}", "PUT", {"url": self.node_url, **self.report()}
+                )
+                if status != 200:
+                    raise OSError(f"statut {status}")
+                self.warned = False
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if not self.warned:
+                    logger.warning(f"Noeud {self.node_id}: passerelle injoignable ({e})")
+                self.warned = True
+            try:
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+
+
+# --- CÔTÉ PASSERELLE ---
+
+
+class ClusterNode:
+    def __init__(self, node_id: str, url: str):
+        self.node_id = node_id
+        self.url = url.rstrip("/")
+        self.capacity: Dict[str, Any] = {}
+        self.last_seen = 0.0
+        # Sessions placées depuis le dernier relevé de capacité (pas encore comptées par le noeud)
+        self.pending = 0
+
+    @property
+    def ws_url(self) -> str:
+        return "ws" + self.url[len("http"):] if self.url.startswith("http") else self.url
+
+    def alive(self, timeout: float) -> bool:
+        return time.monotonic() - self.last_seen <= timeout
+
+    def room(self, animator: Optional[str]) -> float:
+        """Sessions de ce type que le noeud peut encore accueillir (à défaut : fraction de CPU libre)"""
+        capacity = self.capacity
+        if not capacity.get("accepting", True):
+            return 0.0
+        counts = capacity.get("max_new_sessions", {})
+        if capacity.get("policy") != "off" and animator in counts:
+            return float(counts[animator] - self.pending)
+        budget = capacity.get("budget", {}).get("cpu") or 1.0
+        headroom = capacity.get("headroom", {}).get("cpu", budget)
+        return headroom / budget - 0.01 * self.pending
+
+    def as_dict(self, timeout: float) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "alive": self.alive(timeout),
+            "last_seen_s": time.monotonic() - self.last_seen,
+            "accepting": self.capacity.get("accepting"),
+            "headroom": self.capacity.get("headroom"),
+            "max_new_sessions": self.capacity.get("max_new_sessions"),
+            "sessions": len(self.capacity.get("sessions", {})),
+        }
+
+
+class NodeRegistry:
+    """Noeuds inscrits et table session -> noeud propriétaire"""
+
+    def __init__(self, node_timeout: float = 6.0):
+        self.node_timeout = node_timeout
+        self.nodes: Dict[str, ClusterNode] = {}
+        self.owners: Dict[str, str] = {}
+        # Instant de placement : une session toute récente peut manquer au relevé en vol de son noeud
+        self.placed_at: Dict[str, float] = {}
+
+    def heartbeat(self, node_id: str, url: str, capacity: Dict[str, Any], session_ids: List[str]):
+        node = self.nodes.get(node_id)
+        if node is None or node.url != url.rstrip("/"):
+            node = self.nodes[node_id] = ClusterNode(node_id, url)
+            logger.info(f"Noeud {node_id} inscrit ({url})")
+        node.capacity = capacity
+        node.last_seen = time.monotonic()
+        node.pending = 0
+
+        # Le noeud fait foi pour ses sessions : créées avant un redémarrage de la passerelle, ou supprimées
+        now = time.monotonic()
+        for session_id, owner in list(self.owners.items()):
+            if owner == node_id and session_id not in session_ids:
+                if now - self.placed_at.get(session_id, 0.0) > self.node_timeout:
+                    self.forget(session_id)
+        for session_id in session_ids:
+            self.owners[session_id] = node_id
+
+    def remove(self, node_id: str):
+        if self.nodes.pop(node_id, None) is None:
+            raise ValueError("Noeud introuvable")
+        for session_id, owner in list(self.owners.items()):
+            if owner == node_id:
+                self.forget(session_id)
+        logger.info(f"Noeud {node_id} retiré")
+
+    def alive(self) -> List[ClusterNode]:
+        return [node for node in self.nodes.values() if node.alive(self.node_timeout)]
+
+    def owner(self, session_id: str) -> Optional[ClusterNode]:
+        node_id = self.owners.get(session_id)
+        return self.nodes.get(node_id) if node_id is not None else None
+
+    def candidates(self, session_type: str) -> List[ClusterNode]:
+        """Noeuds vivants, du moins chargé au plus chargé pour ce type de session"""
+        animator = SESSION_TYPES.get(session_type)
+        nodes = [node for node in self.alive() if node.room(animator) > 0]
+        return sorted(nodes, key=lambda node: node.room(animator), reverse=True)
+
+    def place(self, session_id: str, node: ClusterNode):
+        self.owners[session_id] = node.node_id
+        self.placed_at[session_id] = time.monotonic()
+        node.pending += 1
+
+    def forget(self, session_id: str):
+        self.owners.pop(session_id, None)
+        self.placed_at.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        alive = self.alive()
+        totals: Dict[str, Dict[str, float]] = {}
+        for node in alive:
+            for key in ("budget", "used", "headroom"):
+                for resource, value in node.capacity.get(key, {}).items():
+                    totals.setdefault(key, {}).setdefault(resource, 0)
+                    totals[key][resource] += value
+        return {
+            "nodes": {node_id: node.as_dict(self.node_timeout) for node_id, node in self.nodes.items()},
+            "alive": len(alive),
+            "sessions": len(self.owners),
+            "accepting": any(node.capacity.get("accepting", True) for node in alive),
+            **totals,
+        }
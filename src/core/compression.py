@@ -0,0 +1,93 @@
+import logging
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("Compression")
+logger.setLevel(logging.INFO)
+
+# Dictionnaire zlib : 32 Ko max (taille de la fenêtre deflate), les octets les plus récents étant les plus utiles
+MAX_DICTIONARY_SIZE = 32 * 1024
+DICTIONARY_SAMPLES = 16
+# Une frame sur N est aussi compressée sans dictionnaire, pour chiffrer le gain du dictionnaire
+BASELINE_EVERY = 60
+
+
+def train_dictionary(animator, frame_size: int, samples: int = DICTIONARY_SAMPLES) -> Optional[bytes]:
+    """
+    Construit un dictionnaire de compression à partir de frames échantillonnées sur le clip.
+
+    Les frames sont calculées dans un buffer privé, puis l'animateur est ramené au temps initial
+    (snapshot / restore) : rien n'est publié. Cela n'est valable que pour un animateur 'deterministic',
+    dont la pose ne dépend que du temps ; un animateur à état interne (modèle autorégressif du VAE)
+    serait avancé par l'échantillonnage sans pouvoir revenir en arrière : pas de dictionnaire (None).
+    Les matrices d'un même squelette partagent la structure (lignes [0, 0, 0, 1], échelles,
+    ordres de grandeur) que le dictionnaire fournit à deflate.
+    """
+    if not getattr(animator, "deterministic", False):
+        return None
+
+    state = animator.snapshot()
+    frametime = animator.animator_frametime or 1.0 / 30.0
+    # Échantillons répartis sur tout le clip si sa durée est connue, sinon toutes les 10 frames
+    duration = getattr(getattr(animator, "anim_data", None), "duration", None)
+    step = duration / samples if isinstance(duration, (int, float)) and duration > 0 else 10 * frametime
+
+    scratch = bytearray(frame_size)
+    frames = []
+    for _ in range(samples):
+        animator.write_frame_to_buffer(memoryview(scratch), 0, step, 1.0)
+        frames.append(bytes(scratch))
+    animator.restore(state)
+
+    return b"".join(frames)[-MAX_DICTIONARY_SIZE:]
+
+
+class FrameCompressor:
+    """
+    Compression zlib des frames avec le dictionnaire de la session.
+    Le compresseur amorcé avec le dictionnaire est copié à chaque frame (moins coûteux que de le ré-amorcer) :
+    chaque message est un flux zlib indépendant, décodable avec le seul dictionnaire.
+    """
+
+    def __init__(self, dictionary: bytes, level: int = 1, asset: str = ""):
+        self.dictionary = dictionary
+        self.level = level
+        self.asset = asset
+        self._primed = zlib.compressobj(level, zdict=dictionary)
+
+        self.frames = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.encode_ns = 0
+        self.baseline_raw = 0
+        self.baseline_bytes = 0
+
+    def compress(self, payload) -> bytes:
+        start = time.perf_counter_ns()
+        compressor = self._primed.copy()
+        data = compressor.compress(payload) + compressor.flush()
+        self.encode_ns += time.perf_counter_ns() - start
+
+        size = memoryview(payload).nbytes
+        self.frames += 1
+        self.raw_bytes += size
+        self.compressed_bytes += len(data)
+        if self.frames % BASELINE_EVERY == 1:
+            self.baseline_raw += size
+            self.baseline_bytes += len(zlib.compress(payload, self.level))
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "asset": self.asset,
+            "level": self.level,
+            "dictionary_size": len(self.dictionary),
+            "frames": self.frames,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "ratio": self.compressed_bytes / self.raw_bytes if self.raw_bytes else None,
+            # Même niveau zlib sans dictionnaire, sur un échantillon des frames
+            "ratio_without_dictionary": self.baseline_bytes / self.baseline_raw if self.baseline_raw else None,
+            "encode_us": self.encode_ns / self.frames / 1000 if self.frames else None,
+        }
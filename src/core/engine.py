@@ -1,20 +1,43 @@
 import multiprocessing
+import multiprocessing.connection
 import time
 import logging
 import traceback
+from collections import deque
 from multiprocessing.shared_memory import SharedMemory
 
 import numpy as np
 
 from animators.vae_animator import VaeAnimator
+from .backpressure import AdaptiveRateController
+from .compression import train_dictionary
+from .frame_ring import FrameRing
 from .interfaces import AnimatorInterface
+from .placement import CpuPlacement
+from .profiler import EngineProfiler, code_key
+from . import pose_cache, tick_clock
 
 logging.basicConfig()
 logger = logging.getLogger("AnimationEngine")
 logger.setLevel(logging.INFO)
 
 # Commandes gérées par le moteur lui-même (infrastructure)
-SYSTEM_COMMANDS = {"seek", "set_fps", "get_info", "set_speed"}
+SYSTEM_COMMANDS = {
+    "seek", "set_fps", "get_info", "set_speed",
+    # Migration / reprise d'état
+    "snapshot", "restore", "handoff", "activate",
+    # Table de poses partagée (animateurs qui l'acceptent)
+    "set_pose_cache",
+    # Départ synchronisé sur un tick de l'horloge du serveur (groupes de sessions)
+    "sync_start",
+    # Profilage à la demande (sans effet sur la lecture)
+    "profile", "get_profile",
+}
+
+# Commandes qui changent les poses à venir : les frames calculées d'avance (lookahead) sont abandonnées.
+# S'y ajoutent les méthodes exposées de l'animateur hors get_* (swap_clip, set_instance...).
+# Lecture d'état, fps, snapshot (temps de la frame présentée) et profilage les laissent en place.
+INVALIDATING_COMMANDS = {"seek", "set_speed", "restore", "handoff", "sync_start"}
 
 # noinspection D
 class AnimationEngine(multiprocessing.Process):
@@ -27,26 +50,84 @@ class AnimationEngine(multiprocessing.Process):
         pause_event: multiprocessing.Event,
         buffer_count: int = 3,
         fps: int = 60,
+        animator_params: dict = None,
+        standby: bool = False,
+        min_fps: float = 15.0,
+        placement: CpuPlacement = None,
+        pose_cache_lock=None,
+        lookahead: int = 0,
+        clock_address=None,
     ):
         super().__init__()
         self.animator = None
         self.animator_class = animator_class
+        # Paramètres passés au constructeur de l'animateur (ex: instances d'une foule)
+        self.animator_params = animator_params or {}
         self.source_path = source_path
         self.frame_queue = frame_queue
         self.command_conn = command_conn
 
         # Note : On ne connaît pas encore le nom de la SHM ni la taille frame
+        # Zone du ring : (segment, offset, taille) dans l'arène SHM du serveur
         self.shm_name = None
+        self.shm_offset = 0
+        self.shm_size = 0
         self.frame_size = 0
 
         self.buffer_count = buffer_count
         self.engine_fps = fps
         self.engine_target_frame_time = 1.0 / self.engine_fps
+        # Plafond de l'animateur (simulation_fps) : au-delà, les frames diffusées sont interpolées
+        self.simulation_fps = None
+        # Fps effectif abaissé (jusqu'à min_fps) quand le broadcaster ne suit plus
+        self.rate_controller = AdaptiveRateController(fps, min(min_fps, fps))
         self.running = multiprocessing.Event()
         self.playback_speed_value = 1.0
 
         self.pause_event = pause_event
 
+        # Moteur de remplacement (migration) : attaché à la SHM mais n'écrit rien avant "activate"
+        self.standby = standby
+
+        # Coeurs autorisés et plafonds de threads (numba, TF, BLAS) ; None = réglages par défaut
+        self.placement = placement
+
+        # Table de poses partagée entre moteurs (verrou des écritures hérité à la création du processus)
+        self.pose_cache_lock = pose_cache_lock
+        self.pose_cache_shm = None
+        self.pose_cache_prefill = False
+
+        # Frames calculées d'avance (animateurs déterministes uniquement, décidé après initialize) :
+        # le ring compte alors buffer_count + lookahead slots
+        self.lookahead = lookahead
+        self.slot_count = buffer_count
+        self.ring = None
+        # Époque des frames publiées (incrémentée à chaque invalidation des frames d'avance)
+        self.epoch = 0
+        # Frames d'avance publiées : (frame_id, temps de l'animateur avant la frame, instant de présentation)
+        self.speculative = deque()
+        self.next_presentation_ns = 0
+
+        # Horloge de tick du serveur : frames calées sur ses frontières, pas de temps = ticks écoulés
+        # (identique pour tous les moteurs, donc des sessions démarrées au même tick restent cohérentes)
+        self.clock_address = clock_address
+        self.clock_shm = None
+        self.clock = None
+        self.last_tick = None
+        # Tick de départ d'un groupe synchronisé, en attente
+        self.sync_tick = None
+
+        # Profilage à la demande : inactif (aucun hook installé) hors des fenêtres demandées
+        self.profiler = EngineProfiler(code_key(AnimationEngine.run.__code__))
+
+    def start(self):
+        if self.placement is None:
+            return super().start()
+        # Les variables de threads doivent précéder les imports lourds du processus enfant
+        with self.placement.spawn_environment():
+            super().start()
+        self.placement.apply_affinity(self.pid)
+
     def _wait_for_shm_config(self):
         """
         Bloque jusqu'à recevoir le nom de la mémoire partagée depuis le processus parent.
@@ -58,7 +139,7 @@ class AnimationEngine(multiprocessing.Process):
                 cmd_name, args, _ = msg
 
                 if cmd_name == "set_shm":
-                    self.shm_name = args
+                    self.shm_name, self.shm_offset, self.shm_size = args
                     return True
                 elif cmd_name == "stop":
                     return False
@@ -88,12 +169,18 @@ class AnimationEngine(multiprocessing.Process):
                 result = None
                 error = None
 
+                # Une commande qui modifie la lecture rend fausses les frames calculées d'avance
+                if self.lookahead and (
+                    cmd_name in INVALIDATING_COMMANDS
+                    or (cmd_name not in SYSTEM_COMMANDS and not cmd_name.startswith("get_"))
+                ):
+                    self._invalidate()
+
                 try:
                     # 1. Commandes Système (Prioritaires)
                     if cmd_name in SYSTEM_COMMANDS:
                         if cmd_name == "set_fps":
-                            self.engine_fps = float(args)
-                            self.engine_target_frame_time = 1.0 / self.engine_fps
+                            self._set_target_fps(float(args))
                             result = self.engine_fps
 
                         elif cmd_name == "seek":
@@ -110,13 +197,61 @@ class AnimationEngine(multiprocessing.Process):
                         elif cmd_name == "get_info":
                             result = {
                                 "source": self.source_path,
-                                "fps": self.fps,
+                                "fps": self.engine_fps,
+                                "target_fps": self.rate_controller.target_fps,
+                                "simulation_fps": self.simulation_fps,
+                                "quality_level": self.rate_controller.level,
                                 "shm": self.shm_name,
-                                "frame_size": self.frame_size
+                                "shm_offset": self.shm_offset,
+                                "frame_size": self.frame_size,
+                                "slot_count": self.slot_count,
+                                "lookahead": self.lookahead,
+                                "tick_aligned": self.clock is not None,
+                                "profiling": self.profiler.active,
+                                "placement": self.placement.as_dict() if self.placement else None,
                             }
                             # On ajoute l'info de l'animateur s'il a une propriété current_time
                             if hasattr(animator, "current_time"):
-                                result["time"] = animator.current_time
+                                result["time"] = self._playback_time()
+
+                        elif cmd_name == "snapshot":
+                            result = self._snapshot(animator)
+
+                        elif cmd_name == "restore":
+                            self._restore(animator, args)
+                            result = "ok"
+
+                        elif cmd_name == "handoff":
+                            # Migration : on rend l'état et on s'arrête à cette frontière de frame,
+                            # sans publier de nouvelle frame
+                            result = self._snapshot(animator)
+                            self.running.clear()
+                            logging.info("Moteur: Passage de relais, arrêt de la production")
+
+                        elif cmd_name == "activate":
+                            self.standby = False
+                            # L'ancien moteur a pu invalider ses frames d'avance depuis notre rattachement
+                            self.epoch = self.ring.epoch
+                            logging.info("Moteur: Activation, reprise du ring")
+                            result = "ok"
+
+                        elif cmd_name == "set_pose_cache":
+                            self.pose_cache_shm, cache = pose_cache.attach(args, self.pose_cache_lock)
+                            animator.attach_pose_cache(cache)
+                            # Un seul moteur balaie la grille de pré-remplissage, avant sa première frame
+                            self.pose_cache_prefill = animator.wants_prefill() and cache.claim_prefill()
+                            result = "ok"
+
+                        elif cmd_name == "sync_start":
+                            self._sync_start(animator, args)
+                            result = "ok"
+
+                        elif cmd_name == "profile":
+                            result = self.profiler.start(**(args or {}))
+
+                        elif cmd_name == "get_profile":
+                            # Sans argument : état de la fenêtre ; sinon le rapport au format demandé
+                            result = self.profiler.status() if args is None else self.profiler.report(**args)
 
                     # 2. Commandes Animateur (Dynamique)
                     elif hasattr(animator, cmd_name):
@@ -158,13 +293,184 @@ class AnimationEngine(multiprocessing.Process):
                 if expect_response:
                     self.command_conn.send((result, error))
 
+                # Après un passage de relais, le Pipe appartient déjà au nouveau moteur
+                if not self.running.is_set() and cmd_name == "handoff":
+                    break
+
             except Exception as e:
                 logging.error(f"Erreur critique traitement Pipe: {e}")
                 break
 
 
+    def _snapshot(self, animator) -> dict:
+        state = animator.snapshot()
+        if self.speculative and "time" in state:
+            # L'animateur est en avance de lookahead frames : temps de la frame en cours de présentation
+            state["time"] = self._playback_time()
+        return {
+            "animator": state,
+            "speed": self.playback_speed_value,
+            "fps": self.rate_controller.target_fps,
+        }
+
+    def _restore(self, animator, state: dict):
+        self.playback_speed_value = float(state.get("speed", self.playback_speed_value))
+        if "fps" in state:
+            self._set_target_fps(float(state["fps"]))
+        animator.restore(state.get("animator", {}))
+
+    def _sync_start(self, animator, args: dict):
+        """Groupe synchronisé : temps 'time' (et vitesse) au tick 'tick', commun à toutes les sessions du groupe"""
+        if self.clock is None:
+            raise RuntimeError("Horloge de tick désactivée (TICK_FPS=0)")
+        if hasattr(animator, "seek"):
+            animator.seek(float(args["time"]))
+        if args.get("speed") is not None:
+            self.playback_speed_value = float(args["speed"])
+        if self.lookahead:
+            self.next_presentation_ns = self.clock.tick_time(int(args["tick"]))
+        else:
+            self.sync_tick = int(args["tick"])
+
+    def _clock_dt(self) -> float:
+        """Mode horloge : pas de temps = ticks écoulés depuis la frame précédente"""
+        # Marge d'un huitième de tick : un réveil un peu en avance compte pour le tick visé
+        tick = self.clock.tick_at(time.monotonic_ns() + self.clock.period_ns // 8)
+        if self.last_tick is None:
+            self.last_tick = tick - self.clock.ticks_per_frame(self.engine_fps)
+        dt = (tick - self.last_tick) * self.clock.period_ns / 1e9
+        self.last_tick = tick
+        return dt
+
+    def _sleep_to_tick(self):
+        """Dort jusqu'à la frontière du tick de la frame suivante (la prochaine, en cas de retard)"""
+        now = time.monotonic_ns()
+        tick = self.last_tick if self.last_tick is not None else self.clock.tick_at(now)
+        wake = self.clock.tick_time(tick + self.clock.ticks_per_frame(self.engine_fps))
+        if wake <= now:
+            wake = self.clock.tick_time(self.clock.next_tick(now))
+        time.sleep((wake - now) / 1e9)
+
+    def _waiting_sync(self) -> bool:
+        """True tant que le tick de départ du groupe n'est pas atteint (le moteur n'écrit rien)"""
+        if self.sync_tick is None:
+            return False
+        now = time.monotonic_ns()
+        if self.clock.tick_at(now + self.clock.period_ns // 8) < self.sync_tick:
+            time.sleep(min((self.clock.tick_time(self.sync_tick) - now) / 1e9, self.engine_target_frame_time))
+            return True
+        # Première frame au tick de départ : pas de temps nul, l'animateur montre exactement 'time'
+        self.last_tick = self.sync_tick
+        self.sync_tick = None
+        return False
+
+    def _set_target_fps(self, fps: float):
+        if self.simulation_fps:
+            fps = min(fps, self.simulation_fps)
+        self.rate_controller.set_target(fps)
+        self.rate_controller.min_fps = min(self.rate_controller.min_fps, fps)
+        self.engine_fps = fps
+        self.engine_target_frame_time = 1.0 / fps
+
+    def _regulate(self, ring: FrameRing) -> bool:
+        """
+        Contre-pression : retourne True si le ring est plein (le broadcaster n'a pas encore
+        libéré le slot à réécrire), et ajuste le fps effectif selon la saturation observée.
+        """
+        saturated = ring.lag >= self.slot_count
+        if self.rate_controller.update(saturated):
+            self.engine_fps = self.rate_controller.fps
+            self.engine_target_frame_time = 1.0 / self.engine_fps
+            ring.set_quality(self.rate_controller.level, self.engine_fps)
+            logger.info(
+                f"Moteur: Palier qualité {self.rate_controller.level}, fps effectif {self.engine_fps:.1f}"
+            )
+        return saturated
+
+    def _playback_time(self) -> float:
+        """Temps de la frame en cours de présentation (l'animateur est en avance de lookahead frames)"""
+        if self.speculative:
+            return self.speculative[0][1]
+        return getattr(self.animator, "current_time", 0.0)
+
+    def _invalidate(self):
+        """
+        Abandonne les frames d'avance pas encore présentées : l'animateur revient au temps de la première
+        d'entre elles et l'époque du ring change (le broadcaster jette les frames de l'époque précédente).
+        """
+        read_seq = self.ring.read_seq
+        pending = next((frame for frame in self.speculative if frame[0] > read_seq), None)
+        self.speculative.clear()
+        if pending is None:
+            return
+        _, playback_time, presentation_ns = pending
+        self.animator.seek(playback_time)
+        self.epoch += 1
+        self.ring.set_epoch(self.epoch)
+        self.next_presentation_ns = presentation_ns
+
+    def _compute_ahead(self, ring: FrameRing, region: memoryview, buffer_index: int) -> int:
+        """
+        Un tour de boucle en mode lookahead : quand il reste moins de lookahead / 2 frames d'avance,
+        calcule d'un coup (slots contigus) les frames jusqu'à lookahead intervalles de l'instant présent.
+        Chaque frame porte son instant de présentation, auquel le broadcaster la retient.
+        Retourne le prochain slot à écrire.
+        """
+        start_time = time.perf_counter()
+        read_seq = ring.read_seq
+        while self.speculative and self.speculative[0][0] <= read_seq:
+            self.speculative.popleft()
+
+        if self.clock is not None:
+            # Instants de présentation sur les frontières de tick
+            frame_ns = self.clock.ticks_per_frame(self.engine_fps) * self.clock.period_ns
+        else:
+            frame_ns = int(self.engine_target_frame_time * 1e9)
+        now = time.monotonic_ns()
+        if self.next_presentation_ns < now:
+            # En retard (ring plein, moteur désordonnancé) : le temps écoulé est sauté, pas rattrapé frame par frame
+            resume_ns = self.clock.tick_time(self.clock.next_tick(now)) if self.clock is not None else now
+            if self.next_presentation_ns:
+                late = (resume_ns - self.next_presentation_ns) / 1e9
+                self.animator.seek(self.animator.current_time + late * self.playback_speed_value)
+            self.next_presentation_ns = resume_ns
+
+        saturated = self._regulate(ring)
+        horizon = now + self.lookahead * frame_ns
+        if not saturated and self.next_presentation_ns - now <= self.lookahead * frame_ns // 2:
+            count = min(
+                max(1, (horizon - self.next_presentation_ns) // frame_ns),
+                self.slot_count - ring.lag,
+                self.slot_count - buffer_index,  # Lot vectorisé : slots contigus jusqu'à la fin du ring
+            )
+            dt = frame_ns / 1e9
+            speed = self.playback_speed_value
+            playback_time = self.animator.current_time
+            compute_ns = time.monotonic_ns()
+            ring.claim(buffer_index, count)
+            self.animator.write_frames_to_buffer(region, ring.slot_offset(buffer_index), count, dt, speed)
+
+            for i in range(count):
+                frame_id = ring.publish(buffer_index, self.next_presentation_ns, self.epoch, compute_ns)
+                self.frame_queue.put(buffer_index)
+                self.speculative.append((frame_id, playback_time + i * dt * speed, self.next_presentation_ns))
+                buffer_index = (buffer_index + 1) % self.slot_count
+                self.next_presentation_ns += frame_ns
+
+        # Réveil au prochain seuil de recharge, au plus tard une frame plus tard (commandes)
+        wake_ns = self.next_presentation_ns - self.lookahead * frame_ns // 2 - time.monotonic_ns()
+        sleep_time = min(wake_ns / 1e9, self.engine_target_frame_time - (time.perf_counter() - start_time))
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+        return buffer_index
+
     def run(self):
         try:
+            # 0. Placement CPU, avant tout calcul numba / TF
+            if self.placement is not None:
+                self.placement.apply_affinity()
+                self.placement.apply_frameworks()
+
             import importlib
             import keras
 
@@ -184,19 +490,40 @@ class AnimationEngine(multiprocessing.Process):
             # --- PHASE 1 : CHARGEMENT LOURD ---
             logger.info(f"Moteur: Chargement de {self.source_path}...")
 
-            self.animator = self.animator_class()
+            self.animator = self.animator_class(**self.animator_params)
             self.animator.initialize(self.source_path)
 
             # Récupération des métadonnées
             skeleton = self.animator.get_skeleton()
             self.frame_size = self.animator.get_memory_size()
 
+            # Animateur à fréquence fixe : le moteur simule à ce rythme, même si les clients en demandent plus
+            self.simulation_fps = getattr(self.animator, "simulation_fps", None)
+            if self.simulation_fps:
+                self._set_target_fps(self.engine_fps)
+
+            # Frames d'avance : seulement si l'animateur sait revenir au temps d'une frame abandonnée
+            if not (getattr(self.animator, "deterministic", False) and hasattr(self.animator, "seek")):
+                self.lookahead = 0
+            self.slot_count = self.buffer_count + self.lookahead
+
+            # Dictionnaire de compression du squelette (flux compressé optionnel côté clients, animateurs déterministes)
+            try:
+                dictionary = train_dictionary(self.animator, self.frame_size)
+            except Exception as e:
+                logger.warning(f"Moteur: dictionnaire de compression non construit: {e}")
+                dictionary = None
+
             # Envoi du succès au parent via le Pipe
             # On envoie : (status, data, error)
             logger.info("Moteur: Chargement terminé. Envoi des métadonnées.")
             self.command_conn.send(("init_success", {
                 "skeleton": skeleton,
-                "frame_size": self.frame_size
+                "frame_size": self.frame_size,
+                "dictionary": dictionary,
+                "simulation_fps": self.simulation_fps,
+                "pose_cache": hasattr(self.animator, "attach_pose_cache"),
+                "slot_count": self.slot_count,
             }, None))
 
         except Exception as e:
@@ -212,11 +539,26 @@ class AnimationEngine(multiprocessing.Process):
 
         # --- PHASE 3 : BOUCLE PRINCIPALE ---
         shm = None
+        region = None
+        ring = None
         try:
-            logger.info(f"Moteur: Attachement à SHM {self.shm_name}")
+            logger.info(f"Moteur: Attachement à SHM {self.shm_name} (offset {self.shm_offset})")
             shm = SharedMemory(name=self.shm_name)
+            # Vue sur la zone de cette session uniquement (l'arène est partagée par toutes les sessions)
+            region = shm.buf[self.shm_offset : self.shm_offset + self.shm_size]
+            ring = FrameRing(region, self.frame_size, self.slot_count)
+            ring.set_quality(self.rate_controller.level, self.engine_fps)
+            # Après un redémarrage ou une migration, l'époque du ring est celle de l'ancien moteur
+            self.epoch = ring.epoch
+            self.ring = ring
+            if self.clock_address is not None:
+                self.clock_shm, self.clock = tick_clock.attach(self.clock_address)
             self.running.set()
-            buffer_index = 0
+            # Déterminé à la première frame : après un redémarrage ou une migration,
+            # on reprend là où l'ancien moteur s'était arrêté dans le ring
+            buffer_index = None
+            # Temps non simulé pendant les ticks sautés, rattrapé à la frame suivante
+            pending_dt = 0.0
 
             while self.running.is_set():
                 start_time = time.perf_counter()
@@ -224,30 +566,88 @@ class AnimationEngine(multiprocessing.Process):
                 # 1. Commandes via Pipe
                 self._process_commands(self.animator)
 
+                if not self.running.is_set():
+                    break  # Passage de relais : plus aucune écriture dans le ring
+
+                if self.profiler.active:
+                    self.profiler.poll()
+
+                if self.standby:
+                    time.sleep(0.001)
+                    continue
+
+                # 2. Heartbeat + état de lecture, lus par le superviseur du SessionManager
+                ring.beat(
+                    self._playback_time(),
+                    self.playback_speed_value,
+                    self.engine_fps,
+                )
+
+                if self.pose_cache_prefill:
+                    # Heartbeat pendant le balayage : le superviseur ne doit pas croire le moteur bloqué
+                    self.pose_cache_prefill = False
+                    self.animator.prefill_pose_cache(
+                        lambda: ring.beat(self.animator.current_time, self.playback_speed_value, self.engine_fps)
+                    )
+
                 if self.pause_event.is_set():
+                    if self.lookahead:
+                        self._invalidate()
+                        self.next_presentation_ns = 0  # Reprise : pas de retard à sauter
+                    self.last_tick = None
                     time.sleep(0.1)
                     continue
 
+                if buffer_index is None:
+                    buffer_index = ring.write_seq % self.slot_count
+
+                if self.lookahead:
+                    buffer_index = self._compute_ahead(ring, region, buffer_index)
+                    continue
+
+                if self.clock is not None and self._waiting_sync():
+                    continue
+
+                # 3. Contre-pression : ring plein -> on ne calcule pas une frame qui ne serait pas envoyée
+                if self._regulate(ring):
+                    if self.clock is not None:
+                        self._sleep_to_tick()  # Les ticks sautés sont comptés dans le pas de la frame suivante
+                    else:
+                        pending_dt += self.engine_target_frame_time
+                        time.sleep(self.engine_target_frame_time)
+                    continue
+
                 # Calcul de l'offset dans le grand bloc mémoire
-                offset = buffer_index * self.frame_size
+                offset = ring.slot_offset(buffer_index)
 
-                # 3. Écriture DIRECTE (Zero-Copy)
+                # 4. Écriture DIRECTE (Zero-Copy)
                 # L'animateur écrit ses floats directement dans la RAM partagée
+                if self.clock is not None:
+                    dt = self._clock_dt()
+                else:
+                    dt = self.engine_target_frame_time + pending_dt
+                pending_dt = 0.0
+                compute_ns = time.monotonic_ns()
+                ring.claim(buffer_index)
                 self.animator.write_frame_to_buffer(
-                    shm.buf,
-                    dt=self.engine_target_frame_time,
+                    region,
+                    dt=dt,
                     offset=offset,
                     playback_speed=self.playback_speed_value,
                 )
 
-                # 4. Notification
+                # 5. Notification
                 # On envoie juste l'index (un simple int), c'est instantané.
                 if not self.frame_queue.full():
+                    ring.publish(buffer_index, time.monotonic_ns(), self.epoch, compute_ns)
                     self.frame_queue.put(buffer_index)
                     # Avancer l'index (0 -> 1 -> 2 -> 0 ...)
-                    buffer_index = (buffer_index + 1) % self.buffer_count
+                    buffer_index = (buffer_index + 1) % self.slot_count
 
-                # 5. Timing
+                # 6. Timing
+                if self.clock is not None:
+                    self._sleep_to_tick()
+                    continue
                 elapsed = time.perf_counter() - start_time
                 sleep_time = self.engine_target_frame_time - elapsed
                 if sleep_time > 0:
@@ -257,8 +657,20 @@ class AnimationEngine(multiprocessing.Process):
             logger.error(f"Erreur Moteur: {e}")
             logger.error(traceback.format_exc())
         finally:
+            # Les vues NumPy du ring doivent être libérées avant de fermer la SHM
+            ring = None
+            self.ring = None
+            if region is not None:
+                region.release()
             if shm:
                 shm.close()  # Détacher, mais ne pas unlink (le manager le fera)
+            if self.animator is not None and hasattr(self.animator, "attach_pose_cache"):
+                self.animator.attach_pose_cache(None)  # Libère les vues NumPy de la table
+            if self.pose_cache_shm is not None:
+                self.pose_cache_shm.close()
+            if self.clock_shm is not None:
+                self.clock = None  # Libère la vue NumPy de l'horloge
+                self.clock_shm.close()
             logger.info("Arrêt moteur.")
 
     def stop(self):
@@ -3,3 +3,80 @@ import os
 ANIMATION_DIR = os.getenv("ANIMATION_DIR")
 
 VAE_DIR = os.getenv("VAE_DIR")
+
+# Fréquence de simulation du VAE (Hz) ; les clients plus rapides reçoivent des poses interpolées (0 = désactivé)
+VAE_SIMULATION_FPS = float(os.getenv("VAE_SIMULATION_FPS", "30"))
+
+# Partage d'un moteur entre sessions identiques (type d'animateur, fichier, paramètres)
+SESSION_DEDUP = os.getenv("SESSION_DEDUP", "0").lower() in ("1", "true", "yes")
+
+# Supervision : délai sans heartbeat avant de considérer un moteur bloqué (s), et nombre max de relances
+ENGINE_HEARTBEAT_TIMEOUT = float(os.getenv("ENGINE_HEARTBEAT_TIMEOUT", "5"))
+ENGINE_MAX_RESTARTS = int(os.getenv("ENGINE_MAX_RESTARTS", "5"))
+
+# Contre-pression : fps plancher du moteur quand le broadcaster ne suit plus
+ENGINE_MIN_FPS = float(os.getenv("ENGINE_MIN_FPS", "15"))
+
+# Frames calculées d'avance par lots pour les animateurs déterministes (FastFK), invalidées au seek (0 = désactivé)
+LOOKAHEAD_FRAMES = int(os.getenv("LOOKAHEAD_FRAMES", "0"))
+
+# Horloge de tick commune (Hz) : moteurs calés sur ses frontières, un seul réveil de diffusion par tick
+# pour toutes les sessions, groupes de lecture synchronisée (0 = désactivé, chaque session à son rythme)
+TICK_FPS = float(os.getenv("TICK_FPS", "0"))
+
+# Contrôle d'admission des sessions : "off" (tout admettre), "reject" (503), "queue" (attente) ou "redirect" (307)
+# Budgets de la machine (0 = coeurs utilisables / RAM totale / taille de /dev/shm), attente max (s) en mode "queue",
+# serveur de repli (URL de base) en mode "redirect"
+ADMISSION_POLICY = os.getenv("ADMISSION_POLICY", "off")
+ADMISSION_CPU_BUDGET = float(os.getenv("ADMISSION_CPU_BUDGET", "0"))
+ADMISSION_MEMORY_BUDGET = int(os.getenv("ADMISSION_MEMORY_BUDGET", "0"))
+ADMISSION_SHM_BUDGET = int(os.getenv("ADMISSION_SHM_BUDGET", "0"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+ADMISSION_REDIRECT_URL = os.getenv("ADMISSION_REDIRECT_URL", "")
+
+# Mode cluster, côté noeud : passerelle où s'inscrire ("" = serveur autonome), URL du noeud vue par la passerelle
+# et les clients, identifiant (défaut : l'URL), période des relevés de capacité (s)
+CLUSTER_GATEWAY_URL = os.getenv("CLUSTER_GATEWAY_URL", "")
+CLUSTER_NODE_URL = os.getenv("CLUSTER_NODE_URL", "http://localhost:9810")
+CLUSTER_NODE_ID = os.getenv("CLUSTER_NODE_ID", "")
+CLUSTER_HEARTBEAT = float(os.getenv("CLUSTER_HEARTBEAT", "2"))
+
+# Passerelle (gateway.py) : "proxy" (relais des routes de contrôle) ou "redirect" (307 vers le noeud propriétaire),
+# délai sans relevé avant d'écarter un noeud (s), port d'écoute
+GATEWAY_MODE = os.getenv("GATEWAY_MODE", "proxy")
+GATEWAY_NODE_TIMEOUT = float(os.getenv("GATEWAY_NODE_TIMEOUT", "6"))
+GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", "9830"))
+
+# Fichiers de capture (enregistrement / rejeu des sessions)
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures")
+
+# Placement CPU des moteurs : "none", "threads" (plafonds de threads) ou "pinned" (plafonds + affinité)
+ENGINE_CPU_POLICY = os.getenv("ENGINE_CPU_POLICY", "none")
+ENGINE_CPUS_PER_SESSION = int(os.getenv("ENGINE_CPUS_PER_SESSION", "1"))
+
+# Cache disque des noyaux numba (un sous-dossier par commit ou sources du solveur FK, version numba / Python)
+JIT_CACHE_DIR = os.getenv("JIT_CACHE_DIR", "~/.cache/moma/numba")
+
+# Arène de mémoire partagée commune à toutes les sessions (octets, 0 = un segment par session)
+# Rester sous la taille de /dev/shm (64 Mo par défaut dans Docker)
+SHM_ARENA_SIZE = int(os.getenv("SHM_ARENA_SIZE", str(32 * 1024 * 1024)))
+
+# Diffusion : frame WebSocket encodée une fois et écrite directement sur le transport de chaque client
+WS_FAST_BROADCAST = os.getenv("WS_FAST_BROADCAST", "1").lower() in ("1", "true", "yes")
+
+# Niveau zlib du flux compressé (?compress=1) : 1 = le plus rapide
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "1"))
+
+# Transport UDP non fiable pour les clients temps réel du LAN (0 = désactivé, ex: 9811 pour l'activer)
+# Taille des datagrammes : MTU Ethernet (1500) - en-têtes IP (20) et UDP (8)
+UDP_PORT = int(os.getenv("UDP_PORT", "0"))
+UDP_DATAGRAM_SIZE = int(os.getenv("UDP_DATAGRAM_SIZE", "1472"))
+
+# Cache des poses du VAE, partagé entre moteurs : nombre d'entrées (0 = désactivé)
+# Clé = latent arrondi à VAE_CACHE_LATENT_STEP + case de phase (VAE_CACHE_PHASE_BINS cases par cycle de VAE_CACHE_CYCLE s)
+# VAE_CACHE_PREFILL = "min:max:n" : grille de n valeurs par dimension latente balayée au démarrage ("" = aucune)
+VAE_CACHE_SIZE = int(os.getenv("VAE_CACHE_SIZE", "0"))
+VAE_CACHE_LATENT_STEP = float(os.getenv("VAE_CACHE_LATENT_STEP", "0.05"))
+VAE_CACHE_PHASE_BINS = int(os.getenv("VAE_CACHE_PHASE_BINS", "60"))
+VAE_CACHE_CYCLE = float(os.getenv("VAE_CACHE_CYCLE", "1.0"))
+VAE_CACHE_PREFILL = os.getenv("VAE_CACHE_PREFILL", "")
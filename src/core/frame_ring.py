@@ -0,0 +1,179 @@
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Disposition du segment de mémoire partagée d'une session :
+#
+#   [ Bloc de contrôle (64 o) | En-têtes de slots (slot_count x 64 o) | Payloads (slot_count x frame_size) ]
+#
+# Le bloc de contrôle et les en-têtes sont de simples tableaux de mots de 64 bits, écrits par le moteur
+# et lus sans verrou par le processus principal. Seuls les payloads sont envoyés aux clients.
+
+CONTROL_SIZE = 64
+SLOT_HEADER_SIZE = 64
+
+# --- Bloc de contrôle (uint64 / float64) ---
+HEARTBEAT = 0  # uint64 : incrémenté à chaque tour de boucle du moteur
+WRITE_SEQ = 1  # uint64 : nombre de frames publiées (= frame_id de la dernière)
+PLAYBACK_TIME = 2  # float64 : temps courant de l'animateur (s)
+PLAYBACK_SPEED = 3  # float64
+ENGINE_FPS = 4  # float64 : fps effectif (peut être abaissé sous pression)
+READ_SEQ = 5  # uint64 : dernier frame_id consommé par le broadcaster
+QUALITY_LEVEL = 6  # uint64 : 0 = nominal, +1 par palier de dégradation
+EPOCH = 7  # uint64 : incrémenté quand les frames calculées d'avance (lookahead) sont invalidées
+
+# --- En-tête de slot (uint64) ---
+SLOT_FRAME_ID = 0
+SLOT_TIMESTAMP_NS = 1  # time.monotonic_ns() de présentation (= publication, sauf frames calculées d'avance)
+SLOT_EPOCH = 2  # EPOCH au calcul de la frame : périmée s'il a changé depuis
+SLOT_COMPUTE_NS = 3  # time.monotonic_ns() au début du calcul (traçage des étapes, voir tracing.py)
+SLOT_PUBLISH_NS = 4  # time.monotonic_ns() à la publication effective
+
+
+class FrameRing:
+    """
+    Vue structurée (NumPy, zero-copy) sur le ring buffer d'une session en mémoire partagée.
+    Utilisée des deux côtés : le moteur publie, le processus principal lit.
+    """
+
+    def __init__(self, buffer: memoryview, frame_size: int, slot_count: int):
+        self.buffer = buffer
+        self.frame_size = frame_size
+        self.slot_count = slot_count
+
+        self.control = np.ndarray((CONTROL_SIZE // 8,), dtype=np.uint64, buffer=buffer, offset=0)
+        self.control_f = np.ndarray((CONTROL_SIZE // 8,), dtype=np.float64, buffer=buffer, offset=0)
+        self.slot_meta = np.ndarray(
+            (slot_count, SLOT_HEADER_SIZE // 8), dtype=np.uint64, buffer=buffer, offset=CONTROL_SIZE
+        )
+        self.payload_offset = CONTROL_SIZE + slot_count * SLOT_HEADER_SIZE
+
+    @staticmethod
+    def required_size(frame_size: int, slot_count: int) -> int:
+        return CONTROL_SIZE + slot_count * (SLOT_HEADER_SIZE + frame_size)
+
+    def slot_offset(self, slot_index: int) -> int:
+        """Offset (dans le buffer) du payload du slot"""
+        return self.payload_offset + slot_index * self.frame_size
+
+    def slot_view(self, slot_index: int) -> memoryview:
+        offset = self.slot_offset(slot_index)
+        return self.buffer[offset : offset + self.frame_size]
+
+    # --- Côté moteur ---
+
+    def claim(self, slot_index: int, count: int = 1):
+        """
+        Annonce la réécriture de slots contigus avant d'y écrire les payloads : leur frame_id repasse à 0
+        jusqu'à publish(), ce qui permet à une lecture sans verrou (copy_slot) de détecter une copie déchirée.
+        """
+        self.slot_meta[slot_index : slot_index + count, SLOT_FRAME_ID] = 0
+
+    def publish(self, slot_index: int, timestamp_ns: int, epoch: int = 0, compute_ns: int = 0) -> int:
+        """Marque le slot comme la nouvelle frame publiée ; retourne son frame_id"""
+        frame_id = int(self.control[WRITE_SEQ]) + 1
+        self.slot_meta[slot_index, SLOT_FRAME_ID] = frame_id
+        self.slot_meta[slot_index, SLOT_TIMESTAMP_NS] = timestamp_ns
+        self.slot_meta[slot_index, SLOT_EPOCH] = epoch
+        self.slot_meta[slot_index, SLOT_COMPUTE_NS] = compute_ns
+        self.slot_meta[slot_index, SLOT_PUBLISH_NS] = time.monotonic_ns()
+        self.control[WRITE_SEQ] = frame_id
+        return frame_id
+
+    def set_epoch(self, epoch: int):
+        self.control[EPOCH] = epoch
+
+    def beat(self, playback_time: float, playback_speed: float, fps: float):
+        """Heartbeat + instantané de l'état de lecture (relu par le superviseur après un crash)"""
+        self.control[HEARTBEAT] += np.uint64(1)
+        self.control_f[PLAYBACK_TIME] = playback_time
+        self.control_f[PLAYBACK_SPEED] = playback_speed
+        self.control_f[ENGINE_FPS] = fps
+
+    def set_quality(self, level: int, fps: float):
+        self.control_f[ENGINE_FPS] = fps
+        self.control[QUALITY_LEVEL] = level
+
+    @property
+    def lag(self) -> int:
+        """Frames publiées mais pas encore consommées par le broadcaster"""
+        return int(self.control[WRITE_SEQ]) - int(self.control[READ_SEQ])
+
+    # --- Côté processus principal ---
+
+    def consume(self, frame_id: int):
+        """Le broadcaster a fini avec cette frame : son slot peut être réécrit"""
+        self.control[READ_SEQ] = frame_id
+
+    @property
+    def quality_level(self) -> int:
+        return int(self.control[QUALITY_LEVEL])
+
+    @property
+    def heartbeat(self) -> int:
+        return int(self.control[HEARTBEAT])
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.control[WRITE_SEQ])
+
+    @property
+    def read_seq(self) -> int:
+        return int(self.control[READ_SEQ])
+
+    @property
+    def epoch(self) -> int:
+        return int(self.control[EPOCH])
+
+    def stale(self, slot_index: int) -> bool:
+        """Frame calculée d'avance puis invalidée (seek, changement de vitesse...)"""
+        return int(self.slot_meta[slot_index, SLOT_EPOCH]) != int(self.control[EPOCH])
+
+    def frame_id(self, slot_index: int) -> int:
+        return int(self.slot_meta[slot_index, SLOT_FRAME_ID])
+
+    def timestamp_ns(self, slot_index: int) -> int:
+        return int(self.slot_meta[slot_index, SLOT_TIMESTAMP_NS])
+
+    def compute_ns(self, slot_index: int) -> int:
+        return int(self.slot_meta[slot_index, SLOT_COMPUTE_NS])
+
+    def publish_ns(self, slot_index: int) -> int:
+        return int(self.slot_meta[slot_index, SLOT_PUBLISH_NS])
+
+    def latest(self, now_ns: int) -> Optional[Tuple[int, int]]:
+        """
+        (slot, frame_id) de la frame la plus récente déjà présentée : les frames d'avance (instant de présentation
+        futur) et les frames invalidées que le broadcaster n'a pas diffusées sont ignorées. None si aucune.
+        """
+        write_seq = self.write_seq
+        read_seq = self.read_seq
+        epoch = self.epoch
+        for frame_id in range(write_seq, max(write_seq - self.slot_count, 0), -1):
+            slot_index = (frame_id - 1) % self.slot_count
+            meta = self.slot_meta[slot_index]
+            if int(meta[SLOT_FRAME_ID]) != frame_id:
+                return None  # Slots en cours de réécriture : les frames plus anciennes le sont aussi
+            if int(meta[SLOT_TIMESTAMP_NS]) > now_ns:
+                continue
+            if int(meta[SLOT_EPOCH]) != epoch and frame_id > read_seq:
+                continue
+            return slot_index, frame_id
+        return None
+
+    def copy_slot(self, slot_index: int, frame_id: int) -> Optional[bytes]:
+        """
+        Copie du payload sans verrou (ni effet sur READ_SEQ) : None si le moteur a réclamé le slot pendant la copie.
+        """
+        payload = bytes(self.slot_view(slot_index))
+        if int(self.slot_meta[slot_index, SLOT_FRAME_ID]) != frame_id:
+            return None
+        return payload
+
+    def playback_snapshot(self) -> dict:
+        return {
+            "time": float(self.control_f[PLAYBACK_TIME]),
+            "speed": float(self.control_f[PLAYBACK_SPEED]),
+            "fps": float(self.control_f[ENGINE_FPS]),
+        }
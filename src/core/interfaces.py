@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 
 def expose(func: Callable):
@@ -12,6 +12,14 @@ def expose(func: Callable):
 
 
 class AnimatorInterface(ABC):
+    # Fréquence de simulation fixe (Hz) pour les animateurs coûteux : le moteur ne calcule pas plus
+    # de poses que cela, le broadcaster interpole pour les clients plus rapides.
+    # None = une pose calculée par frame diffusée.
+    simulation_fps: Optional[float] = None
+    # Pose entièrement déterminée par 'current_time' (et rétablie par seek) : le moteur peut alors
+    # calculer des frames d'avance (LOOKAHEAD_FRAMES) et revenir en arrière si elles sont invalidées.
+    deterministic: bool = False
+
     @property
     @abstractmethod
     def animator_fps(self):
@@ -39,6 +47,20 @@ class AnimatorInterface(ABC):
         """
         pass
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        État minimal (picklable) permettant à un autre moteur de reprendre la lecture.
+        Par défaut : le temps courant, si l'animateur l'expose via 'current_time'.
+        """
+        if hasattr(self, "current_time"):
+            return {"time": self.current_time}
+        return {}
+
+    def restore(self, state: Dict[str, Any]):
+        """Applique un état produit par snapshot() (appelé après initialize)"""
+        if "time" in state and hasattr(self, "seek"):
+            self.seek(state["time"])
+
     @abstractmethod
     def write_frame_to_buffer(
         self, buffer_view: memoryview, offset: int, dt: float, playback_speed: float
@@ -49,3 +71,14 @@ class AnimatorInterface(ABC):
         'offset' est l'endroit où commencer à écrire.
         """
         pass
+
+    def write_frames_to_buffer(
+        self, buffer_view: memoryview, offset: int, count: int, dt: float, playback_speed: float
+    ):
+        """
+        Écrit 'count' frames consécutives (pas de 'dt' chacune) dans des slots contigus à partir de 'offset'.
+        Par défaut une frame à la fois ; les animateurs déterministes peuvent vectoriser le lot.
+        """
+        frame_size = self.get_memory_size()
+        for i in range(count):
+            self.write_frame_to_buffer(buffer_view, offset=offset + i * frame_size, dt=dt, playback_speed=playback_speed)
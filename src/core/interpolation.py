@@ -0,0 +1,83 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .pose_math import compose, decompose, slerp
+
+
+class PoseInterpolator:
+    """
+    Garde une copie des deux dernières poses publiées (les slots du ring sont réécrits par le moteur)
+    et produit des poses intermédiaires à n'importe quel instant, pour les clients plus rapides que le moteur.
+
+    La sortie est retardée d'un intervalle de publication : l'instant demandé tombe ainsi entre les deux
+    poses connues (slerp des rotations, lerp des translations et échelles). Pas d'extrapolation :
+    au-delà de la dernière pose (pause, moteur en retard), celle-ci est maintenue.
+    """
+
+    def __init__(self, frame_size: int, header_size: int = 0):
+        self.frame_size = frame_size
+        self.header_size = header_size
+        # [précédente, dernière] : payload brut (en-tête éventuel + matrices float64)
+        self.frames = [bytearray(frame_size), bytearray(frame_size)]
+        self.poses = [
+            np.ndarray(((frame_size - header_size) // 128, 4, 4), dtype=np.float64, buffer=frame, offset=header_size)
+            for frame in self.frames
+        ]
+        # (translations, quaternions, échelles) de chaque pose, décomposées une fois à la publication
+        self.components = [None, None]
+        self.timestamps_ns = [0, 0]
+        self.frame_id = 0
+        self.count = 0
+
+        self.output = bytearray(frame_size)
+        self.output_pose = np.ndarray(self.poses[0].shape, dtype=np.float64, buffer=self.output, offset=header_size)
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= 2
+
+    def push(self, frame_view: memoryview, timestamp_ns: int, frame_id: int):
+        """Nouvelle pose publiée : elle remplace la plus ancienne des deux"""
+        self.frames.reverse()
+        self.poses.reverse()
+        self.components.reverse()
+        self.timestamps_ns.reverse()
+        self.frames[1][:] = frame_view
+        self.components[1] = decompose(self.poses[1])
+        self.timestamps_ns[1] = timestamp_ns
+        self.frame_id = frame_id
+        self.count += 1
+
+    def sample(self, now_ns: int) -> Tuple[bytes, float]:
+        """Pose à l'instant 'now_ns' (time.monotonic_ns, même horloge que le moteur) ; retourne (payload, alpha)"""
+        previous_ns, latest_ns = self.timestamps_ns
+        interval = latest_ns - previous_ns
+        if interval <= 0:
+            return bytes(self.frames[1]), 1.0
+
+        alpha = min(max((now_ns - interval - previous_ns) / interval, 0.0), 1.0)
+        if alpha >= 1.0:
+            return bytes(self.frames[1]), 1.0
+
+        # L'en-tête binaire (ex: foule) est celui de la dernière frame
+        self.output[: self.header_size] = self.frames[1][: self.header_size]
+        (t_a, q_a, s_a), (t_b, q_b, s_b) = self.components
+        compose(t_a + (t_b - t_a) * alpha, slerp(q_a, q_b, alpha), s_a + (s_b - s_a) * alpha, self.output_pose)
+        return bytes(self.output), alpha
+
+    def reset(self):
+        """Oublie l'historique (ex: redémarrage du moteur) : pas d'interpolation à travers une discontinuité"""
+        self.count = 0
+
+
+def interpolation_rate(requested: Optional[float], stream_fps: float, simulation_fps: Optional[float]) -> Optional[float]:
+    """
+    Fréquence d'envoi interpolée d'un client, ou None s'il suit directement les frames du moteur :
+    un fps explicite (?fps=), sinon le fps de la session quand le moteur simule plus lentement.
+    """
+    if requested:
+        return requested
+    if simulation_fps and simulation_fps < stream_fps:
+        return stream_fps
+    return None
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from importlib import metadata
+from types import ModuleType
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger("JitCache")
+logger.setLevel(logging.INFO)
+
+# Ce module ne doit pas importer numba : NUMBA_CACHE_DIR n'est lu qu'une fois, à l'import de numba.
+
+SOLVER_DISTRIBUTION = "momafksolverproject"
+
+
+def _version(distribution: str) -> str:
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return "dev"
+
+
+def _source_fingerprint(distribution: str) -> str:
+    """
+    Identifie le code installé d'une distribution, et pas seulement sa version (inchangée d'un commit à l'autre) :
+    commit git pour une installation depuis le dépôt, sinon empreinte des sources .py installées
+    (ou du dossier source pour une installation éditable).
+    """
+    try:
+        dist = metadata.distribution(distribution)
+    except metadata.PackageNotFoundError:
+        return "dev"
+
+    direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+    commit = direct_url.get("vcs_info", {}).get("commit_id")
+    if commit:
+        return f"{dist.version}-{commit[:12]}"
+
+    if direct_url.get("dir_info", {}).get("editable"):
+        root = unquote(urlparse(direct_url["url"]).path)
+        sources = []
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = [d for d in subdirs if not d.startswith(".")]
+            sources += [os.path.join(directory, f) for f in files if f.endswith(".py")]
+    else:
+        sources = [str(f.locate()) for f in dist.files or () if f.suffix == ".py"]
+
+    digest = hashlib.sha256()
+    for path in sorted(sources):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return f"{dist.version}-{digest.hexdigest()[:12]}"
+
+
+def configure_cache(base_dir: str) -> str:
+    """
+    Place le cache disque des noyaux numba dans un dossier versionné (code du solveur FK, numba, Python).
+    Doit être appelé avant le premier import de numba ; les moteurs ('spawn') héritent de la variable.
+    Une mise à jour du solveur ou de numba repart ainsi d'un cache vide au lieu de relire des noyaux périmés.
+    Un NUMBA_CACHE_DIR déjà défini remplace base_dir mais est versionné de la même façon.
+    """
+    version = (
+        f"fk{_source_fingerprint(SOLVER_DISTRIBUTION)}"
+        f"-numba{_version('numba')}"
+        f"-py{sys.version_info.major}{sys.version_info.minor}"
+    )
+    base_dir = os.path.expanduser(os.environ.get("NUMBA_CACHE_DIR", base_dir))
+    # Les moteurs réimportent main : le dossier hérité est déjà versionné
+    if os.path.basename(os.path.normpath(base_dir)) == version:
+        cache_dir = base_dir
+    else:
+        cache_dir = os.path.join(base_dir, version)
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ["NUMBA_CACHE_DIR"] = cache_dir
+    return cache_dir
+
+
+def enable_caching(*modules: ModuleType) -> int:
+    """
+    Recompile avec cache=True les noyaux @njit des modules donnés qui ne l'ont pas déjà : un nouveau
+    dispatcher (même fonction, mêmes options) remplace l'ancien dans le module, avant toute compilation.
+    Retourne le nombre de noyaux concernés.
+    """
+    import numba
+    from numba.core.dispatcher import Dispatcher
+
+    count = 0
+    for module in modules:
+        for name, obj in list(vars(module).items()):
+            if not isinstance(obj, Dispatcher) or obj.stats.cache_path is not None or obj.signatures:
+                continue
+            # Les appels entre noyaux résolvent les globales du module à la compilation : ils verront le remplaçant
+            cached = numba.jit(cache=True, locals=obj.locals, **obj.targetoptions)(obj.py_func)
+            setattr(module, name, cached)
+            count += 1
+    return count
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import math
+import struct
+from typing import Dict, Set, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("Multiplex")
+logger.setLevel(logging.INFO)
+
+# Format d'un message multiplexé (little-endian) :
+#   En-tête  : magic (4) + nombre d'entrées (4)
+#   Entrée   : frame_id (4) + taille payload (4) + taille session_id (2) + padding (2)
+#              + session_id (utf-8) + zéros de padding + payload
+# Le padding garantit que chaque payload commence sur 8 octets (lecture Float64Array côté client).
+MUX_MAGIC = 0x4D4F4D58  # "MOMX"
+MESSAGE_HEADER = struct.Struct("<II")
+ENTRY_HEADER = struct.Struct("<IIHH")
+
+
+def pack_frames(frames: Dict[str, Tuple[int, bytes]]) -> bytes:
+    """Assemble les frames {session_id: (frame_id, payload)} en un seul message binaire"""
+    parts = [MESSAGE_HEADER.pack(MUX_MAGIC, len(frames))]
+    position = MESSAGE_HEADER.size
+
+    for session_id, (frame_id, payload) in frames.items():
+        sid = session_id.encode("utf-8")
+        position += ENTRY_HEADER.size + len(sid)
+        padding = -position % 8
+        parts.append(ENTRY_HEADER.pack(frame_id & 0xFFFFFFFF, len(payload), len(sid), padding))
+        parts.append(sid)
+        parts.append(b"\x00" * padding)
+        parts.append(payload)
+        position += padding + len(payload)
+
+    return b"".join(parts)
+
+
+class MultiplexClient:
+    """
+    Connexion WebSocket unique abonnée à un ensemble de sessions.
+
+    Les sessions déposent leur dernière frame via push() ; une tâche cadencée à 'fps'
+    envoie à chaque tick toutes les frames en attente dans un seul message.
+    """
+
+    def __init__(self, websocket: WebSocket, fps: float = 60.0):
+        if not 0 < fps < math.inf:
+            raise ValueError("Le fps demandé doit être positif.")
+        self.websocket = websocket
+        self.interval = 1.0 / fps
+        self.subscriptions: Set[str] = set()
+        # Seule la frame la plus récente de chaque session est conservée
+        self.pending: Dict[str, Tuple[int, bytes]] = {}
+        self.flush_task = None
+
+    def push(self, session_id: str, frame_id: int, payload: bytes):
+        self.pending[session_id] = (frame_id, payload)
+
+    def start(self):
+        self.flush_task = asyncio.create_task(self.flush_loop())
+
+    async def stop(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+
+    async def flush_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+
+        while True:
+            try:
+                next_tick += self.interval
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+                if not self.pending:
+                    continue
+
+                frames, self.pending = self.pending, {}
+                await self.websocket.send_bytes(pack_frames(frames))
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erreur envoi multiplexé: {e}")
+                break
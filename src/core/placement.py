@@ -0,0 +1,154 @@
+import logging
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("CpuPlacement")
+logger.setLevel(logging.INFO)
+
+# Variables lues par les bibliothèques au chargement (avant leur import dans le processus moteur)
+BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+
+
+class CpuPlacement:
+    """
+    Placement CPU d'un processus moteur : coeurs autorisés et taille des pools de threads
+    (numba, TensorFlow intra-op / inter-op, OpenMP / BLAS).
+
+    Sans plafond, chaque bibliothèque dimensionne son pool sur tous les coeurs de la machine :
+    16 moteurs sur 16 coeurs lancent alors des centaines de threads qui se disputent le CPU.
+    """
+
+    def __init__(
+        self,
+        cpus: Optional[List[int]] = None,
+        numba_threads: Optional[int] = None,
+        tf_intra_op: Optional[int] = None,
+        tf_inter_op: Optional[int] = None,
+        blas_threads: Optional[int] = None,
+        slot: Optional[int] = None,
+    ):
+        self.cpus = sorted(cpus) if cpus else None
+        self.numba_threads = numba_threads
+        self.tf_intra_op = tf_intra_op
+        self.tf_inter_op = tf_inter_op
+        self.blas_threads = blas_threads
+        # Groupe de coeurs attribué par la PlacementPolicy (pour la libération)
+        self.slot = slot
+
+    def environment(self) -> Dict[str, str]:
+        env = {}
+        if self.blas_threads:
+            env.update({name: str(self.blas_threads) for name in BLAS_THREAD_VARIABLES})
+        if self.numba_threads:
+            env["NUMBA_NUM_THREADS"] = str(self.numba_threads)
+        if self.tf_intra_op:
+            env["TF_NUM_INTRAOP_THREADS"] = str(self.tf_intra_op)
+        if self.tf_inter_op:
+            env["TF_NUM_INTEROP_THREADS"] = str(self.tf_inter_op)
+        return env
+
+    @contextmanager
+    def spawn_environment(self):
+        """
+        Environnement hérité par le processus lancé dans ce bloc.
+        Avec 'spawn', numba / TF / BLAS sont importés lors du dépickling du moteur, avant run() :
+        leurs variables doivent donc être en place au lancement du processus.
+        """
+        env = self.environment()
+        previous = {name: os.environ.get(name) for name in env}
+        os.environ.update(env)
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    def apply_affinity(self, pid: int = 0):
+        if self.cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, self.cpus)
+
+    def apply_frameworks(self):
+        """Plafonds appliqués dans le moteur, avant le premier calcul numba / TF"""
+        if self.numba_threads:
+            import numba
+
+            numba.set_num_threads(min(self.numba_threads, numba.config.NUMBA_NUM_THREADS))
+
+        if self.tf_intra_op or self.tf_inter_op:
+            try:
+                import tensorflow as tf
+
+                if self.tf_intra_op:
+                    tf.config.threading.set_intra_op_parallelism_threads(self.tf_intra_op)
+                if self.tf_inter_op:
+                    tf.config.threading.set_inter_op_parallelism_threads(self.tf_inter_op)
+            except ImportError:
+                pass
+            except RuntimeError as e:
+                # Runtime TF déjà initialisé : les variables TF_NUM_*_THREADS ont pris le relais
+                logger.warning(f"Plafonds TensorFlow non appliqués: {e}")
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "cpus": self.cpus,
+            "numba_threads": self.numba_threads,
+            "tf_intra_op": self.tf_intra_op,
+            "tf_inter_op": self.tf_inter_op,
+            "blas_threads": self.blas_threads,
+        }
+
+
+class PlacementPolicy:
+    """
+    Attribue un CpuPlacement à chaque moteur créé par le SessionManager.
+
+    Modes :
+    - "none"    : aucun réglage (comportement historique)
+    - "threads" : plafonds de threads à 'cpus_per_engine', sans affinité
+    - "pinned"  : plafonds + affinité ; les coeurs sont découpés en groupes de 'cpus_per_engine'
+                  et chaque moteur reçoit le groupe le moins chargé
+    """
+
+    MODES = ("none", "threads", "pinned")
+
+    def __init__(self, mode: str = "none", cpus_per_engine: int = 1, cpus: Optional[List[int]] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Politique de placement inconnue: {mode} (attendu: {', '.join(self.MODES)})")
+        self.mode = mode
+        self.cpus_per_engine = max(1, cpus_per_engine)
+
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        self.groups = [
+            cpus[i : i + self.cpus_per_engine] for i in range(0, len(cpus) - self.cpus_per_engine + 1, self.cpus_per_engine)
+        ] or [cpus]
+        # Nombre de moteurs par groupe de coeurs
+        self.load = [0] * len(self.groups)
+
+    def acquire(self) -> Optional[CpuPlacement]:
+        if self.mode == "none":
+            return None
+
+        threads = self.cpus_per_engine
+        if self.mode == "threads":
+            return CpuPlacement(None, threads, threads, 1, threads)
+
+        slot = min(range(len(self.groups)), key=self.load.__getitem__)
+        self.load[slot] += 1
+        cpus = self.groups[slot]
+        return CpuPlacement(cpus, len(cpus), len(cpus), 1, len(cpus), slot=slot)
+
+    def release(self, placement: Optional[CpuPlacement]):
+        if placement is not None and placement.slot is not None:
+            self.load[placement.slot] = max(0, self.load[placement.slot] - 1)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "cpus_per_engine": self.cpus_per_engine,
+            "groups": [{"cpus": cpus, "engines": load} for cpus, load in zip(self.groups, self.load)],
+        }
@@ -0,0 +1,200 @@
+import logging
+import multiprocessing
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .shm_arena import ShmRegion, segment_name
+
+logger = logging.getLogger("PoseCache")
+logger.setLevel(logging.INFO)
+
+# Disposition d'une table de poses en mémoire partagée (une par taille de pose, commune aux moteurs) :
+#
+#   [ En-tête (64 o) | En-têtes d'entrées (capacity x 64 o) | Poses (capacity x pose_size) ]
+#
+# Table associative par ensembles de WAYS entrées : une clé n'est cherchée que dans son ensemble,
+# et l'entrée la moins récemment utilisée de l'ensemble est évincée (LRU par ensemble).
+# Lectures sans verrou, validées par le compteur de séquence de l'entrée (seqlock : impair = écriture en cours) ;
+# écritures sous un verrou inter-processus pris sans attente (une insertion concurrente est abandonnée).
+
+HEADER_SIZE = 64
+ENTRY_HEADER_SIZE = 64
+WAYS = 8
+
+# --- En-tête de table (int64) ---
+TABLE_POSE_SIZE = 0
+TABLE_CAPACITY = 1
+TABLE_PREFILLED = 2  # 1 dès qu'un moteur a pris en charge le pré-remplissage
+TABLE_INSERTS = 3
+TABLE_EVICTIONS = 4
+
+# --- En-tête d'entrée (int64) ---
+ENTRY_SEQ = 0
+ENTRY_LAST_USED = 1  # time.monotonic_ns() du dernier accès
+ENTRY_USED = 2
+ENTRY_KEY = 3  # KEY_WORDS mots : latent quantifié puis phase
+KEY_WORDS = 5
+
+
+def quantize_key(latent: Sequence[float], phase: float, latent_step: float, phase_bins: int) -> Optional[Tuple[int, ...]]:
+    """
+    Clé de cache : latent arrondi au pas 'latent_step' + case de phase ([0, 1) découpé en phase_bins).
+    Cases centrées sur les multiples de 1 / phase_bins : un pas de simulation multiple de la case
+    ne bascule pas d'une case à l'autre au gré des erreurs d'arrondi.
+    """
+    if len(latent) >= KEY_WORDS:
+        return None
+    return tuple(int(round(float(v) / latent_step)) for v in latent) + (int(round(phase * phase_bins)) % phase_bins,)
+
+
+class PoseCache:
+    """Vue (NumPy, zero-copy) sur une table de poses en mémoire partagée, utilisée par les moteurs"""
+
+    def __init__(self, buffer: memoryview, lock=None):
+        self.buffer = buffer
+        self.lock = lock
+        self.header = np.ndarray((HEADER_SIZE // 8,), dtype=np.int64, buffer=buffer, offset=0)
+        self.pose_size = int(self.header[TABLE_POSE_SIZE])
+        self.capacity = int(self.header[TABLE_CAPACITY])
+        self.sets = self.capacity // WAYS
+        self.entries = np.ndarray(
+            (self.capacity, ENTRY_HEADER_SIZE // 8), dtype=np.int64, buffer=buffer, offset=HEADER_SIZE
+        )
+        self.keys = self.entries[:, ENTRY_KEY : ENTRY_KEY + KEY_WORDS]
+        self.poses = np.ndarray(
+            (self.capacity, self.pose_size // 8),
+            dtype=np.float64,
+            buffer=buffer,
+            offset=HEADER_SIZE + self.capacity * ENTRY_HEADER_SIZE,
+        )
+
+    @staticmethod
+    def required_size(pose_size: int, capacity: int) -> int:
+        return HEADER_SIZE + capacity * (ENTRY_HEADER_SIZE + pose_size)
+
+    @staticmethod
+    def format(buffer: memoryview, pose_size: int, capacity: int):
+        header = np.ndarray((HEADER_SIZE // 8,), dtype=np.int64, buffer=buffer, offset=0)
+        header[TABLE_POSE_SIZE] = pose_size
+        header[TABLE_CAPACITY] = capacity
+
+    def _ways(self, key: Tuple[int, ...]) -> Tuple[int, np.ndarray]:
+        """Premier index de l'ensemble de la clé, et clé complétée à KEY_WORDS mots"""
+        padded = np.zeros(KEY_WORDS, dtype=np.int64)
+        padded[: len(key)] = key
+        return (hash(key) % self.sets) * WAYS, padded
+
+    def _find(self, start: int, padded: np.ndarray) -> int:
+        ways = slice(start, start + WAYS)
+        matches = np.flatnonzero((self.keys[ways] == padded).all(axis=1) & (self.entries[ways, ENTRY_USED] == 1))
+        return start + int(matches[0]) if len(matches) else -1
+
+    def get(self, key: Tuple[int, ...], out: np.ndarray) -> bool:
+        """Copie la pose de 'key' dans 'out' ; False si absente (ou en cours de réécriture)"""
+        start, padded = self._ways(key)
+        index = self._find(start, padded)
+        if index < 0:
+            return False
+        entry = self.entries[index]
+        seq = int(entry[ENTRY_SEQ])
+        if seq & 1:
+            return False
+        out.reshape(-1)[:] = self.poses[index]
+        # L'entrée a pu être évincée et réécrite pendant la copie
+        if int(entry[ENTRY_SEQ]) != seq or not (self.keys[index] == padded).all():
+            return False
+        entry[ENTRY_LAST_USED] = time.monotonic_ns()
+        return True
+
+    def put(self, key: Tuple[int, ...], pose: np.ndarray) -> bool:
+        """Insère (ou remplace) la pose de 'key' ; False si un autre moteur écrit déjà dans la table"""
+        if self.lock is not None and not self.lock.acquire(block=False):
+            return False
+        try:
+            start, padded = self._ways(key)
+            index = self._find(start, padded)
+            if index < 0:
+                ways = self.entries[start : start + WAYS]
+                free = np.flatnonzero(ways[:, ENTRY_USED] == 0)
+                if len(free):
+                    index = start + int(free[0])
+                else:
+                    index = start + int(np.argmin(ways[:, ENTRY_LAST_USED]))
+                    self.header[TABLE_EVICTIONS] += 1
+                self.header[TABLE_INSERTS] += 1
+
+            entry = self.entries[index]
+            entry[ENTRY_SEQ] += 1  # Impair : les lecteurs ignorent l'entrée
+            self.keys[index] = padded
+            self.poses[index] = pose.reshape(-1)
+            entry[ENTRY_LAST_USED] = time.monotonic_ns()
+            entry[ENTRY_USED] = 1
+            entry[ENTRY_SEQ] += 1
+            return True
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+
+    def claim_prefill(self) -> bool:
+        """True pour le seul moteur chargé de pré-remplir la table"""
+        if self.lock is not None:
+            self.lock.acquire()
+        try:
+            if self.header[TABLE_PREFILLED]:
+                return False
+            self.header[TABLE_PREFILLED] = 1
+            return True
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "entries": int(self.entries[:, ENTRY_USED].sum()),
+            "inserts": int(self.header[TABLE_INSERTS]),
+            "evictions": int(self.header[TABLE_EVICTIONS]),
+            "prefilled": bool(self.header[TABLE_PREFILLED]),
+        }
+
+
+class PoseCacheRegistry:
+    """
+    Côté processus principal : une table par taille de pose, créée au premier moteur qui la demande
+    (segment "moma_<pid>_<boot>_posecache_<taille>", supprimé au démarrage suivant s'il est orphelin).
+    Le verrou des écritures est transmis aux moteurs à leur création.
+    """
+
+    def __init__(self, capacity: int):
+        # Arrondi à un nombre entier d'ensembles
+        self.capacity = max(WAYS, capacity // WAYS * WAYS)
+        self.lock = multiprocessing.Lock()
+        self.regions: Dict[int, ShmRegion] = {}
+
+    def address(self, pose_size: int) -> Tuple[str, int, int]:
+        region = self.regions.get(pose_size)
+        if region is None:
+            size = PoseCache.required_size(pose_size, self.capacity)
+            region = ShmRegion.dedicated(size, segment_name(f"posecache_{pose_size}"))
+            PoseCache.format(region.buf, pose_size, self.capacity)
+            self.regions[pose_size] = region
+            logger.info(f"Cache de poses : table de {self.capacity} entrées pour des poses de {pose_size} octets")
+        return region.address
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        return {pose_size: PoseCache(region.buf).stats() for pose_size, region in self.regions.items()}
+
+    def close(self):
+        for region in self.regions.values():
+            region.release()
+        self.regions.clear()
+
+
+def attach(address: Tuple[str, int, int], lock=None) -> Tuple[SharedMemory, PoseCache]:
+    """Côté moteur : rattachement à une table créée par le processus principal"""
+    name, offset, size = address
+    shm = SharedMemory(name=name)
+    return shm, PoseCache(shm.buf[offset : offset + size], lock)
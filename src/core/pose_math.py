@@ -0,0 +1,98 @@
+import numpy as np
+
+# Opérations vectorisées sur des poses [..., num_bones, 4, 4] (translation en colonne 3).
+# Quaternions au format xyzw, comme dans les définitions de squelette envoyées aux clients.
+
+
+def decompose(mats: np.ndarray):
+    """
+    Décompose des matrices affines [..., 4, 4] en (translations [..., 3], quaternions [..., 4], échelles [..., 3]).
+    """
+    translations = mats[..., :3, 3]
+    scales = np.linalg.norm(mats[..., :3, :3], axis=-2)
+    rot = mats[..., :3, :3] / np.where(scales > 0.0, scales, 1.0)[..., None, :]
+
+    m00, m01, m02 = rot[..., 0, 0], rot[..., 0, 1], rot[..., 0, 2]
+    m10, m11, m12 = rot[..., 1, 0], rot[..., 1, 1], rot[..., 1, 2]
+    m20, m21, m22 = rot[..., 2, 0], rot[..., 2, 1], rot[..., 2, 2]
+
+    # Méthode de Shepperd sans branche : on calcule les 4 candidats
+    # et on garde, pour chaque os, celui de plus grande magnitude (stable numériquement)
+    candidates = np.stack(
+        [
+            np.stack([m21 - m12, m02 - m20, m10 - m01, 1.0 + m00 + m11 + m22], axis=-1),
+            np.stack([1.0 + m00 - m11 - m22, m01 + m10, m02 + m20, m21 - m12], axis=-1),
+            np.stack([m01 + m10, 1.0 - m00 + m11 - m22, m12 + m21, m02 - m20], axis=-1),
+            np.stack([m02 + m20, m12 + m21, 1.0 - m00 - m11 + m22, m10 - m01], axis=-1),
+        ],
+        axis=-2,
+    )
+    trace = m00 + m11 + m22
+    diag = np.stack([1.0 + trace, 1.0 + 2.0 * m00 - trace, 1.0 + 2.0 * m11 - trace, 1.0 + 2.0 * m22 - trace], axis=-1)
+    best = np.argmax(diag, axis=-1)[..., None, None]
+    quats = np.take_along_axis(candidates, best, axis=-2)[..., 0, :]
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+    return translations, quats, scales
+
+
+def compose(translations: np.ndarray, quats: np.ndarray, scales: np.ndarray, out: np.ndarray):
+    """Reconstruit des matrices [..., 4, 4] dans 'out' à partir de T, R (xyzw) et S"""
+    x, y, z, w = quats[..., 0], quats[..., 1], quats[..., 2], quats[..., 3]
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+
+    out[..., 0, 0] = 1.0 - 2.0 * (yy + zz)
+    out[..., 0, 1] = 2.0 * (xy - wz)
+    out[..., 0, 2] = 2.0 * (xz + wy)
+    out[..., 1, 0] = 2.0 * (xy + wz)
+    out[..., 1, 1] = 1.0 - 2.0 * (xx + zz)
+    out[..., 1, 2] = 2.0 * (yz - wx)
+    out[..., 2, 0] = 2.0 * (xz - wy)
+    out[..., 2, 1] = 2.0 * (yz + wx)
+    out[..., 2, 2] = 1.0 - 2.0 * (xx + yy)
+    out[..., :3, :3] *= scales[..., None, :]
+    out[..., :3, 3] = translations
+    out[..., 3, :3] = 0.0
+    out[..., 3, 3] = 1.0
+    return out
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, alpha) -> np.ndarray:
+    """
+    Slerp vectorisé entre deux tableaux de quaternions [..., 4].
+    'alpha' est un scalaire ou un tableau broadcastable sur [...].
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+
+    # Plus court chemin : q et -q représentent la même rotation
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.abs(dot)
+
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    # Quaternions quasi colinéaires : on retombe sur un lerp pour éviter la division par ~0
+    near = sin_theta < 1e-6
+    safe_sin = np.where(near, 1.0, sin_theta)
+    w0 = np.where(near, 1.0 - alpha, np.sin((1.0 - alpha) * theta) / safe_sin)
+    w1 = np.where(near, alpha, np.sin(alpha * theta) / safe_sin)
+
+    result = w0 * q0 + w1 * q1
+    result /= np.linalg.norm(result, axis=-1, keepdims=True)
+    return result
+
+
+def blend_poses(pose_a: np.ndarray, pose_b: np.ndarray, alpha, out: np.ndarray) -> np.ndarray:
+    """
+    Mélange deux poses [..., num_bones, 4, 4] : lerp des translations et échelles,
+    slerp des rotations, sur tous les os en une seule passe. 'out' peut être pose_a ou pose_b.
+    """
+    t_a, q_a, s_a = decompose(pose_a)
+    t_b, q_b, s_b = decompose(pose_b)
+    weight = np.asarray(alpha, dtype=np.float64)[..., None]
+
+    translations = t_a + (t_b - t_a) * weight
+    scales = s_a + (s_b - s_a) * weight
+    quats = slerp(q_a, q_b, alpha)
+    return compose(translations, quats, scales, out)
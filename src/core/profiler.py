@@ -0,0 +1,185 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+# Durée maximale d'une fenêtre de profilage (s)
+MAX_PROFILE_DURATION = 300.0
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_OUTPUTS = ("collapsed", "pstats", "text")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def code_key(code) -> Tuple[str, int]:
+    """Identifiant picklable d'une fonction (un code object ne passe pas au processus spawn du moteur)"""
+    return code.co_filename, code.co_firstlineno
+
+
+class StackSampler:
+    """
+    Échantillonneur : un thread relève la pile du thread principal du moteur toutes les 'interval' s
+    et compte les piles identiques (format "collapsed" des flamegraphs : "a;b;c <nombre>").
+    Le code natif (numba, TF, time.sleep) apparaît sous la ligne Python qui l'appelle.
+    Les piles commencent à 'root' (code_key de la boucle du moteur) : un processus forké hérite de la pile du serveur.
+    """
+
+    def __init__(self, thread_id: int, interval: float, root: Optional[Tuple[str, int]] = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if code_key(frame.f_code) == self.root:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+            self.counts[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class EngineProfiler:
+    """
+    Profilage à la demande d'un moteur en cours d'exécution, pendant 'duration' secondes :
+    - "sample" : échantillonnage de pile (coût proportionnel à la fréquence, sortie "collapsed") ;
+    - "cprofile" : profilage déterministe du thread principal (sortie pstats).
+    Hors fenêtre, rien n'est installé : le moteur ne teste que 'active' à chaque tour de boucle.
+    """
+
+    def __init__(self, root: Optional[Tuple[str, int]] = None):
+        self.root = root
+        self.active = False
+        self.mode: Optional[str] = None
+        self.deadline = 0.0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        # Résultat de la dernière fenêtre terminée
+        self.result: Optional[Dict[str, Any]] = None
+
+    def start(self, mode: str = "sample", duration: float = 5.0, interval: float = 0.005) -> Dict[str, Any]:
+        """Appelé depuis le thread principal du moteur (cProfile ne profile que le thread qui l'active)"""
+        if self.active:
+            raise RuntimeError("Un profilage est déjà en cours")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Mode inconnu '{mode}' (modes : {', '.join(PROFILE_MODES)})")
+        duration = float(duration)
+        if not 0.0 < duration <= MAX_PROFILE_DURATION:
+            raise ValueError(f"Durée hors limites (0, {MAX_PROFILE_DURATION}] s")
+
+        self.mode = mode
+        self.duration = duration
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + duration
+        self.result = None
+        if mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), max(float(interval), 0.001), self.root)
+            self._sampler.start()
+        self.active = True
+        return self.status()
+
+    def poll(self):
+        """Tour de boucle du moteur : clôt la fenêtre à échéance"""
+        if time.monotonic() >= self.deadline:
+            self.stop()
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        elapsed = time.monotonic() - self.started_at
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.create_stats()
+            self.result = {"mode": "cprofile", "elapsed": elapsed, "stats": self._profile.stats}
+            self._profile = None
+        else:
+            self._sampler.stop()
+            self.result = {
+                "mode": "sample",
+                "elapsed": elapsed,
+                "samples": self._sampler.samples,
+                "collapsed": self._sampler.collapsed(),
+            }
+            self._sampler = None
+
+    def status(self) -> Dict[str, Any]:
+        status = {"active": self.active, "mode": self.mode, "duration": self.duration}
+        if self.active:
+            status["remaining"] = max(0.0, self.deadline - time.monotonic())
+        elif self.result is not None:
+            status["elapsed"] = self.result["elapsed"]
+            if self.result["mode"] == "sample":
+                status["samples"] = self.result["samples"]
+        return status
+
+    def report(self, output: str = "text", limit: int = 40) -> Any:
+        """
+        Résultat de la dernière fenêtre : "collapsed" (mode sample), "pstats" (fichier binaire lisible par
+        pstats / snakeviz) ou "text" (tableau pstats trié par temps cumulé, ou piles les plus fréquentes).
+        """
+        if output not in PROFILE_OUTPUTS:
+            raise ValueError(f"Sortie inconnue '{output}' (sorties : {', '.join(PROFILE_OUTPUTS)})")
+        if self.active:
+            raise RuntimeError("Profilage en cours")
+        if self.result is None:
+            raise RuntimeError("Aucun profil disponible")
+
+        if self.result["mode"] == "sample":
+            if output == "pstats":
+                raise ValueError("Sortie pstats indisponible en mode sample (utiliser 'collapsed')")
+            if output == "text":
+                lines = self.result["collapsed"].splitlines()[:limit]
+                return "\n".join(lines) + "\n"
+            return self.result["collapsed"]
+
+        if output == "collapsed":
+            raise ValueError("Sortie collapsed indisponible en mode cprofile (utiliser 'pstats' ou 'text')")
+        if output == "pstats":
+            # Format de pstats.Stats.dump_stats
+            return marshal.dumps(self.result["stats"])
+
+        class _Loaded:
+            # pstats.Stats accepte tout objet exposant create_stats() / stats
+            def __init__(self, stats):
+                self.stats = stats
+
+            def create_stats(self):
+                pass
+
+        stream = io.StringIO()
+        pstats.Stats(_Loaded(self.result["stats"]), stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
@@ -1,17 +1,103 @@
 import asyncio
+import json
 import multiprocessing
+import multiprocessing.connection
 import logging
-from typing import Dict, Set, Optional, Any
-from multiprocessing.shared_memory import SharedMemory
+import os
+import queue
+import struct
+import time
+from collections import deque
+from typing import Dict, List, Set, Optional, Any
+import numpy as np
 from fastapi import WebSocket
 
 from animators.vae_animator import VaeAnimator
-from .engine import AnimationEngine
+from .admission import AdmissionController, CapacityError, CapacityRedirect, EngineUsage
+from .capture import CaptureWriter, CAPTURE_EXTENSION
+from .compression import FrameCompressor
+from .engine import AnimationEngine, SYSTEM_COMMANDS
+from .env import (
+    SESSION_DEDUP,
+    ENGINE_HEARTBEAT_TIMEOUT,
+    ENGINE_MAX_RESTARTS,
+    ENGINE_MIN_FPS,
+    LOOKAHEAD_FRAMES,
+    CAPTURE_DIR,
+    ENGINE_CPU_POLICY,
+    ENGINE_CPUS_PER_SESSION,
+    SHM_ARENA_SIZE,
+    WS_FAST_BROADCAST,
+    COMPRESSION_LEVEL,
+    UDP_PORT,
+    UDP_DATAGRAM_SIZE,
+    VAE_CACHE_SIZE,
+    TICK_FPS,
+    ADMISSION_POLICY,
+    ADMISSION_CPU_BUDGET,
+    ADMISSION_MEMORY_BUDGET,
+    ADMISSION_SHM_BUDGET,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_REDIRECT_URL,
+)
+from .frame_ring import FrameRing
 from .interfaces import AnimatorInterface
+from .interpolation import PoseInterpolator, interpolation_rate
+from .multiplex import MultiplexClient
+from .placement import CpuPlacement, PlacementPolicy
+from .pose_cache import PoseCacheRegistry
+from .shm_arena import ShmArena, ShmRegion
+from .tick_clock import ServerClock
+from .tracing import FrameTracer
+from .udp_transport import UdpPeer, UdpTransport
+from .ws_broadcast import encode_binary_frame, raw_writer
 
 logger = logging.getLogger("SessionManager")
 logger.setLevel(logging.DEBUG)
 
+# Commandes qui ne modifient pas l'état du moteur
+# (pas de promotion d'une vue partagée, pas de rejeu après un redémarrage)
+READ_ONLY_COMMANDS = {"get_info", "get_clip_status", "get_timeline", "get_pose_cache_stats", "profile", "get_profile"}
+
+# Commandes internes (migration, promotion) absentes de la timeline d'une capture
+INTERNAL_COMMANDS = {"snapshot", "restore", "handoff", "activate"}
+
+# Période de surveillance des moteurs (s)
+SUPERVISOR_INTERVAL = 0.5
+
+# Marge entre la demande de départ d'un groupe synchronisé et son tick de départ (s)
+SYNC_START_DELAY = 0.2
+
+# Attente max de l'initialisation d'un moteur (chargement de l'asset, compilation JIT) (s)
+ENGINE_INIT_TIMEOUT = 60.0
+# Attente max de la fin d'un processus moteur à l'arrêt, avant terminate() (s)
+ENGINE_STOP_TIMEOUT = 2.0
+
+# Relectures d'une frame dont le slot a été réclamé par le moteur pendant la copie (GET /sessions/{id}/frame),
+# espacées de LATEST_FRAME_RETRY_DELAY s (un lot de frames d'avance s'écrit en quelques millisecondes)
+LATEST_FRAME_ATTEMPTS = 4
+LATEST_FRAME_RETRY_DELAY = 0.002
+
+
+async def wait_readable(fd, timeout: float) -> bool:
+    """
+    Attend qu'un descripteur (Pipe, sentinel d'un processus) soit lisible, dans la boucle asyncio :
+    sans thread de l'executor, des centaines de démarrages ou d'arrêts peuvent attendre en même temps.
+    """
+    loop = asyncio.get_running_loop()
+    if not isinstance(fd, int):
+        fd = fd.fileno()
+    ready = loop.create_future()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(True))
+    try:
+        return await asyncio.wait_for(ready, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        loop.remove_reader(fd)
+        # uvloop (libuv) passe le descripteur en non bloquant : recv() d'un long message lèverait EAGAIN
+        os.set_blocking(fd, True)
+
 
 class AnimationSession:
     """
@@ -22,17 +108,55 @@ class AnimationSession:
     """
 
     def __init__(
-        self, session_id: str, animator_class: type[AnimatorInterface], source_path: str
+        self,
+        session_id: str,
+        animator_class: type[AnimatorInterface],
+        source_path: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        placement: Optional[CpuPlacement] = None,
+        arena: Optional[ShmArena] = None,
+        udp: Optional[UdpTransport] = None,
+        pose_caches: Optional[PoseCacheRegistry] = None,
+        clock: Optional[ServerClock] = None,
     ):
         self.session_id = session_id
+        # Identifiants de session servis par ce moteur (plusieurs si le moteur est partagé)
+        self.session_ids: Set[str] = {session_id}
         self.connections: Set[WebSocket] = set()
+        # Connexions par identifiant de session (pour détacher une vue lors d'une promotion)
+        self.views: Dict[str, Set[WebSocket]] = {}
+        # Clients multiplexés (/ws) abonnés à cette session parmi d'autres
+        self.mux_clients: Set[MultiplexClient] = set()
+        # Connexions "?adaptive=1" : reçoivent les événements QUALITY et des frames float32 en mode dégradé
+        self.adaptive: Set[WebSocket] = set()
+        self.quality_level = 0
+        # Connexions "?compress=1" : frames compressées (zlib + dictionnaire du squelette), une fois par tick
+        self.compressed: Set[WebSocket] = set()
+        self.compressor: Optional[FrameCompressor] = None
+        # Clients UDP (datagrammes fragmentés, sans retransmission) envoyés par le transport du serveur
+        self.udp = udp
+        self.udp_peers: Set[UdpPeer] = set()
+        # Connexions "?fps=N" : poses interpolées à leur propre fréquence entre les deux dernières frames
+        # publiées ; sans fps explicite, au fps de la session si le moteur simule plus lentement (simulation_fps)
+        self.stream_rates: Dict[WebSocket, float] = {}
+        self.stream_fps = 60.0
+        # Fps demandé par set_fps (le ring ne publie que le fps effectif, abaissé sous pression)
+        self.target_fps: Optional[float] = None
+        self.simulation_fps: Optional[float] = None
+        self.interpolator: Optional[PoseInterpolator] = None
+        self.stream_task = None
+        self.frame_id = 0
+        # Dernière frame copiée par GET /sessions/{id}/frame (servie si le moteur réclame tous les slots)
+        self.last_frame: Optional[tuple[Dict[str, str], bytes]] = None
 
         # --- Préparation Infrastructure ---
         # 2. Configuration Mémoire Partagée (Shared Memory)
         # Triple buffering (3 frames d'avance max) pour lisser les pics
         self.buffer_count = 3
-        self.queue = multiprocessing.Queue(maxsize=self.buffer_count)
-        self.parent_conn, child_conn = multiprocessing.Pipe(duplex=True)
+        # + LOOKAHEAD_FRAMES slots si l'animateur calcule des frames d'avance (connu au démarrage du moteur)
+        self.slot_count = self.buffer_count
+        self.queue = multiprocessing.Queue(maxsize=self.buffer_count + LOOKAHEAD_FRAMES)
+        self.parent_conn = None
 
         # VERROU (Lock) : Indispensable pour protéger le Pipe non-thread-safe
         # lors d'accès concurrents depuis FastAPI
@@ -40,23 +164,101 @@ class AnimationSession:
 
         self.pause_event = multiprocessing.Event()
 
+        # Plusieurs vues peuvent attendre le démarrage d'un même moteur partagé
+        self.start_lock = asyncio.Lock()
+        self.started = False
+        # Cycle de vie, suivi par GET /sessions/{id}/status (création asynchrone) :
+        # "created" -> ["queued" ->] "starting" -> "running" | "failed" -> "stopped"
+        self.status = "created"
+        self.error: Optional[str] = None
+        # Levé quand le démarrage se termine (succès, échec ou arrêt)
+        self.ready = asyncio.Event()
+
         # Variables qui seront remplies après le démarrage du moteur
-        self.shm = None
+        # Zone du ring : bloc de l'arène SHM du serveur (ou segment dédié sans arène)
+        self.arena = arena
+        self.region: Optional[ShmRegion] = None
+        self.ring: Optional[FrameRing] = None
         self.skeleton_structure = None
         self.frame_size = 0
+        # En-tête binaire en tête de payload (ex: foule), conservé tel quel lors de la réduction float32
+        self.frame_header_size = 0
+
+        # --- Supervision ---
+        # Dernière valeur de chaque commande animateur, rejouée après un redémarrage du moteur
+        self.command_log: Dict[str, tuple] = {}
+        self.restart_count = 0
+        self.failed = False
+        # Pendant une migration, le superviseur ignore la session (l'ancien moteur s'arrête volontairement)
+        self.migrating = False
+        # Consommation mesurée du moteur (CPU, RAM, SHM), relevée par le superviseur pour l'admission
+        self.usage = EngineUsage()
+
+        # --- Enregistrement (capture des frames diffusées + timeline des commandes) ---
+        self.recorder: Optional[CaptureWriter] = None
+
+        # --- Traçage des étapes de chaque frame (calcul -> envoi), désactivé par défaut ---
+        self.tracer: Optional[FrameTracer] = None
 
         # 4. Préparation du Moteur (Processus enfant)
         self.animator_class = animator_class
-        self.engine = AnimationEngine(
-            animator_class,
-            source_path,
+        self.source_path = source_path
+        self.parameters = parameters or {}
+        # Conservé par les moteurs relancés ou migrés de cette session
+        self.placement = placement
+        # Tables de poses partagées entre moteurs (animateurs qui les acceptent, ex: VAE)
+        self.pose_caches = pose_caches
+        # Horloge de tick du serveur : pas de boucle de broadcast propre, le manager appelle flush() à chaque tick
+        self.clock = clock
+        # Slots reçus de la Queue, pas encore diffusés (frames d'avance retenues jusqu'à leur tick)
+        self.ready_slots = deque()
+        self.engine, self.parent_conn = self._create_engine()
+
+        self.broadcaster_task = None
+
+    def _create_engine(self, standby: bool = False, placement: Optional[CpuPlacement] = None):
+        """
+        Prépare un processus moteur et son Pipe (démarrage, redémarrage ou migration).
+        'placement' remplace celui de la session (migration vers d'autres coeurs).
+        """
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=True)
+        engine = AnimationEngine(
+            self.animator_class,
+            self.source_path,
             self.queue,
             child_conn,
             self.pause_event,
             self.buffer_count,
+            animator_params=self.parameters,
+            standby=standby,
+            min_fps=ENGINE_MIN_FPS,
+            lookahead=LOOKAHEAD_FRAMES,
+            clock_address=self.clock.address if self.clock is not None else None,
+            placement=self.placement if placement is None else placement,
+            pose_cache_lock=self.pose_caches.lock if self.pose_caches is not None else None,
         )
+        return engine, parent_conn
+
+    def _attach_engine(self, conn, data: Dict[str, Any]):
+        """Rattache un moteur initialisé à la zone SHM de la session, et à la table de poses s'il l'accepte"""
+        conn.send(("set_shm", self.region.address, False))
+        if data.get("pose_cache") and self.pose_caches is not None:
+            conn.send(("set_pose_cache", self.pose_caches.address(self.frame_size), False))
+
+    def _record_command(self, cmd_name: str, args: Any):
+        """Mémorise les commandes animateur qui modifient son état (ex: set_vae_values)"""
+        self._record_timeline(cmd_name, args)
+        if cmd_name in SYSTEM_COMMANDS or cmd_name in READ_ONLY_COMMANDS:
+            return
+        key = cmd_name
+        if isinstance(args, dict) and "index" in args:
+            key = f"{cmd_name}:{args['index']}"
+        self.command_log[key] = (cmd_name, args)
 
-        self.broadcaster_task = None
+    def _record_timeline(self, cmd_name: str, args: Any = None):
+        if self.recorder is None or cmd_name in READ_ONLY_COMMANDS or cmd_name in INTERNAL_COMMANDS:
+            return
+        self.recorder.record_command(self.frame_id, cmd_name, args)
 
     async def execute_command(
         self,
@@ -69,15 +271,17 @@ class AnimationSession:
         Point d'entrée unique pour TOUTES les commandes.
         Envoie la commande au moteur via le Pipe et attend la réponse.
         """
-        if not self.engine.is_alive():
-            raise RuntimeError("Le moteur d'animation est arrêté.")
-
         async with self.pipe_lock:
+            # Vérifié sous le verrou : un redémarrage en cours détient aussi ce verrou
+            if not self.engine.is_alive():
+                raise RuntimeError("Le moteur d'animation est arrêté.")
+
             try :
                 # Envoi (Request)
                 self.parent_conn.send((cmd_name, args, wait_for_response))
 
                 if not wait_for_response:
+                    self._record_command(cmd_name, args)
                     return None
 
                 # Réception (Reply) avec timeout
@@ -92,6 +296,7 @@ class AnimationSession:
 
                 if error:
                     raise RuntimeError(f"Erreur Moteur ({cmd_name}): {error}")
+                self._record_command(cmd_name, args)
                 return result
 
             except BrokenPipeError:
@@ -101,19 +306,23 @@ class AnimationSession:
 
     # --- WRAPPERS ---
     async def get_info(self):
-        return await self.execute_command("get_info", wait_for_response=True)
+        info = await self.execute_command("get_info", wait_for_response=True)
+        info["stream_fps"] = self.stream_fps
+        return info
 
     # --- MÉTHODES DE CONTRÔLE ---
     def pause(self):
         """Met l'animation en pause"""
         if not self.pause_event.is_set():
             self.pause_event.set()
+            self._record_timeline("pause")
             logger.info(f"Session {self.session_id} en pause.")
 
     def play(self):
         """Reprend l'animation"""
         if self.pause_event.is_set():
             self.pause_event.clear()
+            self._record_timeline("play")
             logger.info(f"Session {self.session_id} a repris.")
 
     async def set_speed(self, speed: float):
@@ -126,6 +335,9 @@ class AnimationSession:
         """Change la vitesse de lecture en temps réel"""
         # Modification atomique (process-safe)
         await self.execute_command("set_fps", fps, wait_for_response=False)
+        # Le moteur plafonne à simulation_fps ; le reste est interpolé pour les clients
+        self.stream_fps = fps
+        self.target_fps = fps
         logger.info(f"Session {self.session_id} fps réglé à {fps} fps")
 
     async def set_vae_values(self, vae_values: list[float]):
@@ -141,68 +353,344 @@ class AnimationSession:
 
     # ----------------------------
 
+    # --- ENREGISTREMENT ---
+    def start_recording(self, name: Optional[str] = None, max_frames: int = 36000) -> str:
+        """Commence à enregistrer les frames publiées dans un fichier de capture préalloué"""
+        if not self.started:
+            raise RuntimeError("La session n'est pas démarrée.")
+        if self.recorder is not None:
+            raise RuntimeError("Un enregistrement est déjà en cours.")
+
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        name = os.path.basename(name or f"{self.session_id}_{time.strftime('%Y%m%d_%H%M%S')}")
+        path = os.path.join(CAPTURE_DIR, os.path.splitext(name)[0] + CAPTURE_EXTENSION)
+
+        self.recorder = CaptureWriter(
+            path,
+            self.frame_size,
+            max_frames,
+            {
+                "session_id": self.session_id,
+                "animator": self.animator_class.__name__,
+                "source_path": self.source_path,
+                "parameters": self.parameters,
+                "skeleton": self.skeleton_structure,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+        )
+        logger.info(f"Session {self.session_id}: enregistrement vers {path} ({max_frames} frames max)")
+        return path
+
+    def stop_recording(self) -> Dict[str, Any]:
+        if self.recorder is None:
+            raise RuntimeError("Aucun enregistrement en cours.")
+        recorder, self.recorder = self.recorder, None
+        info = recorder.close()
+        logger.info(f"Session {self.session_id}: enregistrement terminé ({info['frames']} frames)")
+        return info
+
+    # --- TRAÇAGE ---
+    def start_tracing(self, capacity: int = 4096):
+        """Relève les instants de chaque étape des 'capacity' dernières frames diffusées"""
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        self.tracer = FrameTracer(capacity)
+
+    def stop_tracing(self) -> Dict[str, Any]:
+        if self.tracer is None:
+            raise RuntimeError("Aucun traçage en cours")
+        summary = self.tracer.summary()
+        self.tracer = None
+        return summary
+
+    def trace(self) -> Dict[str, Any]:
+        """Trace Chrome / Perfetto des frames relevées"""
+        if self.tracer is None:
+            raise RuntimeError("Aucun traçage en cours")
+        return self.tracer.chrome_trace(self.session_id, self.engine.pid)
+
+    def _record_frame(self, slot_index: int):
+        if not self.recorder.append(self.frame_id, self.ring.timestamp_ns(slot_index), self.ring.slot_view(slot_index)):
+            logger.warning(f"Session {self.session_id}: capture pleine, arrêt de l'enregistrement")
+            self.stop_recording()
+
+    async def latest_frame(self, if_none_match: Optional[str] = None) -> Optional[tuple[Dict[str, str], Optional[bytes]]]:
+        """
+        Dernière frame présentée, copiée du SHM sans verrou ni effet sur le curseur de lecture :
+        ni le moteur ni le broadcaster n'attendent. Retourne (en-têtes, payload) ;
+        payload None si l'ETag du client (If-None-Match) désigne encore cette frame.
+        Pendant qu'un lot de frames d'avance réclame tous les slots, la dernière frame lue reste servie.
+        None si aucune frame n'a encore été présentée.
+        """
+        ring = self.ring
+        if ring is None:
+            raise RuntimeError("Le moteur d'animation est arrêté.")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")} if if_none_match else set()
+
+        for attempt in range(LATEST_FRAME_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(LATEST_FRAME_RETRY_DELAY)
+            frame = self._read_latest_frame(ring, tags)
+            if frame is not None:
+                return frame
+
+        if self.last_frame is None:
+            return None
+        headers, payload = self.last_frame
+        return (headers, None) if headers["ETag"] in tags or "*" in tags else (headers, payload)
+
+    def _read_latest_frame(self, ring: FrameRing, tags: Set[str]) -> Optional[tuple[Dict[str, str], Optional[bytes]]]:
+        """Une tentative de lecture ; None si le moteur réécrit les slots concernés"""
+        latest = ring.latest(time.monotonic_ns())
+        if latest is None:
+            return None
+        slot_index, frame_id = latest
+        # frame_id + instant de publication : unique même si la session est recréée sous le même identifiant
+        etag = f'"{frame_id}-{ring.publish_ns(slot_index)}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "X-Frame-Id": str(frame_id),
+            "X-Timestamp-Ns": str(ring.timestamp_ns(slot_index)),
+        }
+        if etag in tags or "*" in tags:
+            return (headers, None) if ring.frame_id(slot_index) == frame_id else None
+        payload = ring.copy_slot(slot_index, frame_id)
+        if payload is None:
+            return None
+        self.last_frame = (headers, payload)
+        return headers, payload
+
+    @property
+    def shared(self) -> bool:
+        return len(self.session_ids) > 1
+
     async def start(self):
         """
         Démarre le moteur, attend son initialisation, configure la mémoire partagée.
+        Sans effet si le moteur (partagé) est déjà démarré.
         """
-        logger.info(f"Session {self.session_id}: Démarrage du moteur...")
-        self.engine.start()
-
-        # --- HANDSHAKE D'INITIALISATION ---
-        loop = asyncio.get_running_loop()
+        async with self.start_lock:
+            if self.started:
+                return
+            self.status = "starting"
+            try:
+                await self._start_engine()
+            except asyncio.CancelledError:
+                # Démarrage abandonné (session supprimée) : le processus est arrêté, un moteur neuf
+                # (jamais lancé) le remplace pour qu'un start() ultérieur ne relance pas le même Process
+                self.engine, self.parent_conn = self._create_engine()
+                self.status = "created"
+                raise
+            except Exception as e:
+                self.status, self.error = "failed", str(e)
+                self.ready.set()
+                raise
+            self.started = True
+            self.status = "running"
+            self.ready.set()
+
+    async def wait_ready(self, timeout: float = ENGINE_INIT_TIMEOUT):
+        """Attend la fin du démarrage du moteur ; RuntimeError s'il a échoué, s'est arrêté ou tarde trop"""
         try:
-            # 1. Attendre que le moteur charge le fichier et renvoie les infos
-            # C'est bloquant pour le Pipe, donc on le met dans un thread
-            def wait_for_init():
-                if self.parent_conn.poll(timeout=60):  # Attendre max 10s
-                    return self.parent_conn.recv()
-                raise TimeoutError("Le moteur n'a pas répondu à l'initialisation.")
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Session {self.session_id} en cours de démarrage ({self.status})")
+        if self.status == "failed":
+            raise RuntimeError(f"Échec du démarrage de la session : {self.error}")
+        if self.status == "stopped":
+            raise RuntimeError("La session est arrêtée.")
+
+    async def _handshake(self, engine: AnimationEngine, conn) -> Dict[str, Any]:
+        """Lance un processus moteur et attend ses métadonnées (init_success)"""
+        engine.start()
 
-            msg_type, data, error = await loop.run_in_executor(None, wait_for_init)
+        # --- HANDSHAKE D'INITIALISATION ---
+        # 1. Attendre que le moteur charge le fichier et renvoie les infos
+        # Attente sur le descripteur du Pipe : pas de thread bloqué par moteur en cours de chargement
+        if not await wait_readable(conn, ENGINE_INIT_TIMEOUT):
+            raise TimeoutError("Le moteur n'a pas répondu à l'initialisation.")
+        msg_type, data, error = conn.recv()
+
+        if msg_type == "init_error":
+            raise RuntimeError(
+                f"Le moteur a échoué à charger l'animation : {error}"
+            )
 
-            if msg_type == "init_error":
-                raise RuntimeError(
-                    f"Le moteur a échoué à charger l'animation : {error}"
-                )
+        if msg_type != "init_success":
+            raise RuntimeError(f"Réponse moteur invalide : {msg_type}")
+        return data
 
-            if msg_type != "init_success":
-                raise RuntimeError(f"Réponse moteur invalide : {msg_type}")
+    async def _start_engine(self):
+        logger.info(f"Session {self.session_id}: Démarrage du moteur...")
+        try:
+            data = await self._handshake(self.engine, self.parent_conn)
 
             # 2. Récupération des données
             self.skeleton_structure = data["skeleton"]
             self.frame_size = data["frame_size"]
+            if data.get("dictionary"):
+                self.compressor = FrameCompressor(data["dictionary"], COMPRESSION_LEVEL, self.source_path)
+            frame_header = self.skeleton_structure.get("frame_header")
+            self.frame_header_size = struct.calcsize(frame_header["format"]) if frame_header else 0
+            self.simulation_fps = data.get("simulation_fps")
+            self.interpolator = PoseInterpolator(self.frame_size, self.frame_header_size)
             logger.info(
                 f"Session {self.session_id}: Animation chargée. Taille frame: {self.frame_size} bytes"
             )
 
-            # 3. Création de la Shared Memory
-            total_mem_size = self.frame_size * self.buffer_count
-            self.shm = SharedMemory(create=True, size=total_mem_size)
-            logger.info(f"Session {self.session_id}: SHM créée ({self.shm.name})")
-
-            # 4. Envoi du nom SHM au moteur pour qu'il puisse démarrer la boucle
-            self.parent_conn.send(("set_shm", self.shm.name, False))
-
-        except Exception as e:
-            logger.error(f"Échec démarrage session: {e}")
+            # 3. Réservation de la Shared Memory (en-têtes du ring + triple buffer + frames d'avance)
+            self.slot_count = data.get("slot_count", self.buffer_count)
+            total_mem_size = FrameRing.required_size(self.frame_size, self.slot_count)
+            if self.arena is not None:
+                self.region = self.arena.allocate(total_mem_size)
+            else:
+                self.region = ShmRegion.dedicated(total_mem_size)
+            self.ring = FrameRing(self.region.buf, self.frame_size, self.slot_count)
+            logger.info(f"Session {self.session_id}: SHM réservée ({self.region.name} @ {self.region.offset})")
+
+            # 4. Envoi de la zone SHM au moteur pour qu'il puisse démarrer la boucle
+            self._attach_engine(self.parent_conn, data)
+
+        except BaseException as e:
+            # Échec ou annulation : pas de processus moteur orphelin
+            logger.error(f"Échec démarrage session: {e!r}")
             self.engine.terminate()  # Tuer le processus s'il est bloqué
-            raise e
+            self.engine.join(timeout=1)
+            raise
 
         # --- DÉMARRAGE BROADCAST ---
-        self.broadcaster_task = asyncio.create_task(self.broadcast_loop())
+        if self.clock is None:
+            self.broadcaster_task = asyncio.create_task(self.broadcast_loop())
+        self.stream_task = asyncio.create_task(self.stream_loop())
         logger.info(f"Session {self.session_id} entièrement opérationnelle.")
 
+    async def restart(self):
+        """
+        Relance un moteur mort ou bloqué sans toucher à la SHM ni aux clients.
+        Le nouveau moteur se rattache au ring existant puis restaure, depuis le dernier instantané,
+        le temps et la vitesse, puis le fps demandé et les paramètres de l'animateur.
+        """
+        snapshot = self.ring.playback_snapshot() if self.ring.heartbeat > 0 else None
+        loop = asyncio.get_running_loop()
+
+        # Le verrou du Pipe bloque les commandes pendant le remplacement du moteur
+        async with self.pipe_lock:
+            old_engine = self.engine
+            if old_engine.is_alive():
+                old_engine.terminate()
+            await loop.run_in_executor(None, old_engine.join, 2)
+
+            # Un moteur tué pendant un put() peut laisser la Queue incohérente : on en crée une neuve
+            self.queue = multiprocessing.Queue(maxsize=self.buffer_count + LOOKAHEAD_FRAMES)
+            # Les frames de l'ancienne Queue ne seront jamais lues : on libère leurs slots
+            self.ring.consume(self.ring.write_seq)
+            self.ready_slots.clear()
+            self.interpolator.reset()
+            self.engine, self.parent_conn = self._create_engine()
+            data = await self._handshake(self.engine, self.parent_conn)
+
+            if data["frame_size"] != self.frame_size:
+                self.engine.terminate()
+                raise RuntimeError("Le moteur relancé n'a pas la même taille de frame.")
+
+            # Rattachement à la SHM existante (le ring reprend à son WRITE_SEQ)
+            self._attach_engine(self.parent_conn, data)
+
+            # Restauration : traitée par le moteur avant sa première frame
+            if snapshot is not None:
+                self.parent_conn.send(("seek", snapshot["time"], False))
+                self.parent_conn.send(("set_speed", snapshot["speed"], False))
+            # Fps cible et non fps effectif : le nouveau moteur repart sans contre-pression
+            if self.target_fps is not None:
+                self.parent_conn.send(("set_fps", self.target_fps, False))
+            for cmd_name, args in self.command_log.values():
+                self.parent_conn.send((cmd_name, args, False))
+
+        logger.info(f"Session {self.session_id}: moteur relancé (état restauré : {snapshot})")
+
+    async def snapshot(self) -> Dict[str, Any]:
+        return await self.execute_command("snapshot")
+
+    async def restore(self, state: Dict[str, Any]):
+        return await self.execute_command("restore", state)
+
+    async def migrate(self, placement: Optional[CpuPlacement] = None) -> Optional[CpuPlacement]:
+        """
+        Migration à chaud vers un nouveau processus moteur, sur les coeurs de 'placement' s'il est donné.
+        1. Le nouveau moteur charge l'asset en parallèle et s'attache à la SHM en standby.
+        2. L'ancien moteur rend son état et s'arrête à une frontière de frame ("handoff").
+        3. Le nouveau restaure cet état et reprend le ring au frame_id suivant.
+        Les clients ne voient ni reconnexion ni trou dans les frame_id.
+        Retourne le placement de l'ancien moteur (à libérer par l'appelant).
+        """
+        loop = asyncio.get_running_loop()
+        engine, conn = self._create_engine(standby=True, placement=placement)
+
+        # Préchauffage hors verrou : l'ancien moteur continue de produire et de répondre
+        try:
+            data = await self._handshake(engine, conn)
+            if data["frame_size"] != self.frame_size:
+                raise RuntimeError("Le nouveau moteur n'a pas la même taille de frame.")
+            self._attach_engine(conn, data)
+        except Exception:
+            if engine.is_alive():
+                engine.terminate()
+            raise
+
+        self.migrating = True
+        try:
+            async with self.pipe_lock:
+                def _handoff():
+                    self.parent_conn.send(("handoff", None, True))
+                    if self.parent_conn.poll(5.0):
+                        return self.parent_conn.recv()
+                    raise TimeoutError("L'ancien moteur n'a pas rendu son état.")
+
+                state, error = await loop.run_in_executor(None, _handoff)
+                if error:
+                    raise RuntimeError(f"Erreur Moteur (handoff): {error}")
+
+                conn.send(("restore", state, False))
+                conn.send(("activate", None, False))
+
+                old_engine, old_placement = self.engine, self.placement
+                self.engine, self.parent_conn = engine, conn
+                if placement is not None:
+                    self.placement = placement
+
+            await loop.run_in_executor(None, old_engine.join, 2)
+            if old_engine.is_alive():
+                old_engine.terminate()
+        except Exception:
+            if engine.is_alive() and engine is not self.engine:
+                engine.terminate()
+            raise
+        finally:
+            self.migrating = False
+
+        logger.info(f"Session {self.session_id}: migrée vers le moteur pid={self.engine.pid}")
+        return old_placement
+
     async def stop(self):
         """Arrêt propre et libération des ressources"""
         logger.info(f"Arrêt de la session {self.session_id}...")
-
-        # Arrêt de la boucle de broadcast
-        if self.broadcaster_task:
-            self.broadcaster_task.cancel()
-            try:
-                await self.broadcaster_task
-            except asyncio.CancelledError:
-                pass
+        # Le superviseur ne doit plus relancer ce moteur
+        self.started = False
+        self.status = "stopped"
+        self.ready.set()
+
+        if self.recorder is not None:
+            self.stop_recording()
+
+        # Arrêt des boucles de broadcast
+        for task in (self.broadcaster_task, self.stream_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
         # On prévient le moteur de s'arrêter proprement
         try:
@@ -210,35 +698,222 @@ class AnimationSession:
         except:
             pass
 
-        # Arrêt du processus moteur
+        # Arrêt du processus moteur (jamais lancé si la session attendait encore sa place)
         self.engine.stop()
-        self.engine.join(timeout=2)
-
-        # Si ça bloque toujours -> Terminate
-        if self.engine.is_alive():
-            self.engine.terminate()
+        if self.engine.pid is not None:
+            # Attente sur le sentinel du processus : les arrêts de plusieurs sessions se chevauchent
+            if not await wait_readable(self.engine.sentinel, ENGINE_STOP_TIMEOUT):
+                # Si ça bloque toujours -> Terminate
+                self.engine.terminate()
+                await wait_readable(self.engine.sentinel, ENGINE_STOP_TIMEOUT)
+            self.engine.join(timeout=0)
 
         # Fermeture des WebSockets
         for connection in list(self.connections):
             await connection.close()
         self.connections.clear()
+        self.adaptive.clear()
+        self.compressed.clear()
+        self.stream_rates.clear()
+        if self.udp is not None:
+            for peer in self.udp_peers:
+                self.udp.unregister(peer)
+        self.udp_peers.clear()
+
+        # Les clients multiplexés restent connectés (autres sessions), on les désabonne seulement
+        for client in self.mux_clients:
+            for session_id in self.session_ids:
+                client.subscriptions.discard(session_id)
+                client.pending.pop(session_id, None)
+        self.mux_clients.clear()
 
         # NETTOYAGE CRITIQUE DE LA MÉMOIRE PARTAGÉE
         # Si on oublie ça, la RAM du serveur se remplit indéfiniment (memory leak)
-        try:
-            self.shm.close()
-            self.shm.unlink()  # Demande à l'OS de détruire le fichier mémoire
-            logger.info(f"Mémoire partagée {self.shm.name} libérée.")
-        except FileNotFoundError:
-            pass  # Déjà nettoyé
-
-    async def connect(self, websocket: WebSocket):
+        # Les vues NumPy du ring empêchent la libération de la zone
+        self.ring = None
+        self.last_frame = None
+        if self.region is not None:
+            self.region.release()  # Bloc rendu à l'arène, ou segment dédié détruit
+            logger.info(f"Mémoire partagée {self.region.name} @ {self.region.offset} libérée.")
+            self.region = None
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_id: Optional[str] = None,
+        adaptive: bool = False,
+        compress: bool = False,
+        fps: Optional[float] = None,
+    ):
+        if compress and self.compressor is None:
+            raise ValueError("Compression indisponible pour cette session (pas de dictionnaire).")
+        if fps is not None and fps <= 0:
+            raise ValueError("Le fps demandé doit être positif.")
         await websocket.accept()
         self.connections.add(websocket)
+        if compress:
+            self.compressed.add(websocket)
+        if fps:
+            self.stream_rates[websocket] = fps
+        self.views.setdefault(session_id or self.session_id, set()).add(websocket)
+        if adaptive:
+            self.adaptive.add(websocket)
+            await websocket.send_json(self._quality_event())
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.connections:
             self.connections.remove(websocket)
+        self.adaptive.discard(websocket)
+        self.compressed.discard(websocket)
+        self.stream_rates.pop(websocket, None)
+        for view in self.views.values():
+            view.discard(websocket)
+
+    def subscribe(self, client: MultiplexClient, session_id: Optional[str] = None):
+        self.mux_clients.add(client)
+        client.subscriptions.add(session_id or self.session_id)
+
+    def unsubscribe(self, client: MultiplexClient, session_id: Optional[str] = None):
+        session_id = session_id or self.session_id
+        client.subscriptions.discard(session_id)
+        client.pending.pop(session_id, None)
+        # Le client peut encore suivre une autre vue de ce moteur partagé
+        if not client.subscriptions & self.session_ids:
+            self.mux_clients.discard(client)
+
+    def detach_view(self, session_id: str):
+        """
+        Retire une vue d'un moteur partagé.
+        Retourne ses connexions WebSocket et ses clients multiplexés pour les rattacher ailleurs.
+        """
+        self.session_ids.discard(session_id)
+        websockets = self.views.pop(session_id, set())
+        self.connections -= websockets
+        self.adaptive -= websockets
+        self.compressed -= websockets
+        for websocket in websockets:
+            self.stream_rates.pop(websocket, None)
+        self.udp_peers -= {peer for peer in self.udp_peers if peer.session_id == session_id}
+
+        clients = {c for c in self.mux_clients if session_id in c.subscriptions}
+        for client in clients:
+            self.unsubscribe(client, session_id)
+        return websockets, clients
+
+    def _quality_event(self) -> Dict[str, Any]:
+        return {
+            "type": "QUALITY",
+            "level": self.quality_level,
+            "fps": self.ring.playback_snapshot()["fps"] if self.ring else 0.0,
+            "dtype": "float32" if self.quality_level > 0 else "float64",
+        }
+
+    async def _on_quality_change(self, level: int):
+        self.quality_level = level
+        logger.info(f"Session {self.session_id}: palier qualité {level}")
+        event = self._quality_event()
+        await asyncio.gather(*[ws.send_json(event) for ws in self.adaptive], return_exceptions=True)
+
+    def _reduced_payload(self, frame_view: memoryview) -> bytes:
+        """Payload en float32 (moitié moins d'octets), en-tête binaire éventuel inchangé"""
+        header = self.frame_header_size
+        payload = bytearray(header + (self.frame_size - header) // 2)
+        payload[:header] = frame_view[:header]
+        matrices = np.frombuffer(frame_view, dtype=np.float64, offset=header)
+        np.ndarray(matrices.shape, dtype=np.float32, buffer=payload, offset=header)[:] = matrices
+        return bytes(payload)
+
+    async def _send_frames(self, clients, frame_view):
+        """
+        Envoie une frame à des clients WebSocket.
+        Chemin rapide : la frame WebSocket est encodée une fois par payload et écrite telle quelle
+        sur le transport de chaque client ; repli send_bytes si le transport n'est pas accessible.
+        """
+        # En mode dégradé, les clients adaptatifs reçoivent une frame float32 calculée une fois
+        reduced = None
+        if self.quality_level > 0 and self.adaptive:
+            reduced = self._reduced_payload(frame_view)
+
+        encoded = {}
+        compressed = {}
+        fallback = []
+        for client in clients:
+            payload = reduced if reduced is not None and client in self.adaptive else frame_view
+            if client in self.compressed:
+                # Compressé une seule fois par tick (et par précision), partagé par les abonnés
+                packed = compressed.get(id(payload))
+                if packed is None:
+                    packed = compressed[id(payload)] = self.compressor.compress(payload)
+                payload = packed
+            writer = raw_writer(client) if WS_FAST_BROADCAST else None
+            if writer is not None:
+                frame = encoded.get(id(payload))
+                if frame is None:
+                    frame = encoded[id(payload)] = encode_binary_frame(payload)
+                if writer.write(frame):
+                    continue
+            fallback.append(client.send_bytes(payload))
+
+        if fallback:
+            await asyncio.gather(*fallback, return_exceptions=True)
+
+    def _stream_groups(self) -> Dict[float, list]:
+        """Clients servis par interpolation, regroupés par fréquence d'envoi"""
+        groups: Dict[float, list] = {}
+        for websocket in self.connections:
+            rate = interpolation_rate(self.stream_rates.get(websocket), self.stream_fps, self.simulation_fps)
+            if rate:
+                groups.setdefault(rate, []).append(websocket)
+        return groups
+
+    async def stream_loop(self):
+        """
+        Envoi à fréquence propre : à chaque échéance d'une fréquence, une pose interpolée (calculée une fois)
+        est envoyée à tous les clients de cette fréquence. Le coût du moteur reste celui de simulation_fps.
+        """
+        loop = asyncio.get_running_loop()
+        # fréquence -> prochaine échéance (horloge de la boucle)
+        deadlines: Dict[float, float] = {}
+        # fréquence -> frame_id de la dernière pose envoyée telle quelle (rien de neuf à envoyer ensuite)
+        held: Dict[float, int] = {}
+
+        while True:
+            try:
+                groups = self._stream_groups()
+                if not groups or not self.interpolator.ready:
+                    deadlines.clear()
+                    await asyncio.sleep(SUPERVISOR_INTERVAL / 10)
+                    continue
+
+                now = loop.time()
+                for rate in list(deadlines):
+                    if rate not in groups:
+                        del deadlines[rate]
+                for rate in groups:
+                    deadlines.setdefault(rate, now)
+
+                rate, deadline = min(deadlines.items(), key=lambda item: item[1])
+                if deadline > now:
+                    await asyncio.sleep(deadline - now)
+                    continue
+                # Pas de rafale de rattrapage après un retard de la boucle
+                deadlines[rate] = max(deadline + 1.0 / rate, now)
+
+                payload, alpha = self.interpolator.sample(time.monotonic_ns())
+                if alpha >= 1.0:
+                    # Pose maintenue (pause, moteur en retard) : envoyée une seule fois
+                    if held.get(rate) == self.interpolator.frame_id:
+                        continue
+                    held[rate] = self.interpolator.frame_id
+                else:
+                    held.pop(rate, None)
+
+                await self._send_frames(groups[rate], payload)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erreur stream interpolé session {self.session_id}: {e}")
 
     async def broadcast_loop(self):
         """
@@ -252,28 +927,112 @@ class AnimationSession:
         while True:
             try:
                 # 1. Attente non-bloquante de la prochaine frame disponible
-                slot_index = await loop.run_in_executor(None, self.queue.get)
-
-                if not self.connections:
+                # Timeout : la Queue peut être remplacée par un redémarrage du moteur
+                try:
+                    slot_index = await loop.run_in_executor(None, self.queue.get, True, SUPERVISOR_INTERVAL)
+                except queue.Empty:
                     continue
 
-                # 2. Zero-Copy Slice
-                # On crée une vue sur la zone mémoire spécifique à cette frame
-                offset = slot_index * self.frame_size
-                frame_view = self.shm.buf[offset : offset + self.frame_size]
+                # Frame calculée d'avance : retenue jusqu'à son instant de présentation,
+                # puis jetée si un seek / changement de vitesse l'a invalidée entre-temps
+                delay_ns = self.ring.timestamp_ns(slot_index) - time.monotonic_ns()
+                if delay_ns > 0 and not self.ring.stale(slot_index):
+                    await asyncio.sleep(delay_ns / 1e9)
 
-                # 3. Broadcast parallèle
-                # starlette/uvicorn gère l'envoi de memoryview efficacement
-                await asyncio.gather(
-                    *[client.send_bytes(frame_view) for client in self.connections],
-                    return_exceptions=True,
-                )
+                await self._broadcast(slot_index)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Erreur broadcast session {self.session_id}: {e}")
 
+    async def flush(self, now_ns: int):
+        """
+        Mode horloge : appelé par le manager une fois par tick, diffuse sans attente toutes les frames
+        publiées et dues (les frames d'avance restent en attente jusqu'à leur tick).
+        """
+        while True:
+            try:
+                self.ready_slots.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        while self.ready_slots:
+            slot_index = self.ready_slots[0]
+            if self.ring.timestamp_ns(slot_index) > now_ns and not self.ring.stale(slot_index):
+                break
+            self.ready_slots.popleft()
+            await self._broadcast(slot_index)
+
+    async def _broadcast(self, slot_index: int):
+        """Diffuse la frame du slot à tous les clients de la session, puis libère le slot"""
+        tracer = self.tracer
+        dispatch_ns = time.monotonic_ns() if tracer is not None else 0
+        if self.ring.stale(slot_index):
+            self.ring.consume(self.ring.frame_id(slot_index))
+            return
+
+        self.frame_id = self.ring.frame_id(slot_index)
+
+        if self.recorder is not None:
+            self._record_frame(slot_index)
+
+        level = self.ring.quality_level
+        if level != self.quality_level:
+            await self._on_quality_change(level)
+
+        # Clients à fréquence propre : copie de la pose pour l'interpolation (stream_loop)
+        interpolated = self._stream_groups()
+        if interpolated:
+            self.interpolator.push(
+                self.ring.slot_view(slot_index), self.ring.timestamp_ns(slot_index), self.frame_id
+            )
+        streamed = {ws for group in interpolated.values() for ws in group}
+        direct = [ws for ws in self.connections if ws not in streamed]
+
+        if not direct and not self.mux_clients and not self.udp_peers:
+            self.ring.consume(self.frame_id)
+            return
+
+        # 2. Zero-Copy Slice
+        # On crée une vue sur la zone mémoire spécifique à cette frame
+        frame_view = self.ring.slot_view(slot_index)
+        slice_ns = time.monotonic_ns() if tracer is not None else 0
+
+        # Clients UDP : fragments envoyés directement depuis le slot SHM (frame complète, float64)
+        if self.udp_peers:
+            self.udp.send_frame(self.udp_peers, self.frame_id, frame_view)
+
+        # Les clients multiplexés envoient à leur propre tick : le slot SHM aura été
+        # réécrit d'ici là, on fait donc UNE copie partagée par tous ces clients
+        if self.mux_clients:
+            payload = bytes(frame_view)
+            for client in self.mux_clients:
+                for session_id in client.subscriptions & self.session_ids:
+                    client.push(session_id, self.frame_id, payload)
+
+        # 3. Broadcast
+        if direct:
+            await self._send_frames(direct, frame_view)
+
+        if tracer is not None:
+            # Relevé avant consume : le moteur peut réécrire l'en-tête du slot dès sa libération
+            publish_ns = self.ring.publish_ns(slot_index)
+            tracer.record(
+                self.frame_id,
+                self.ring.compute_ns(slot_index),
+                publish_ns,
+                max(publish_ns, self.ring.timestamp_ns(slot_index)),
+                dispatch_ns,
+                slice_ns,
+                time.monotonic_ns(),
+                len(direct) + len(self.mux_clients) + len(self.udp_peers),
+            )
+
+        # 4. Curseur de lecture : le moteur peut réécrire ce slot
+        # (un broadcaster lent fait remonter la pression jusqu'au moteur)
+        self.ring.consume(self.frame_id)
+
 
 class SessionManager:
     """
@@ -287,35 +1046,573 @@ class SessionManager:
         if cls._instance is None:
             cls._instance = super(SessionManager, cls).__new__(cls)
             # Initialisation unique du dictionnaire de sessions
+            # Plusieurs identifiants peuvent pointer vers la même AnimationSession (moteur partagé)
             cls._instance.sessions: Dict[str, AnimationSession] = {}
+            # Moteurs partageables, indexés par (type d'animateur, fichier, paramètres)
+            cls._instance.shared_engines: Dict[tuple, AnimationSession] = {}
+            cls._instance.supervisor_task = None
+            # Coeurs et plafonds de threads attribués à chaque moteur
+            cls._instance.placement = PlacementPolicy(ENGINE_CPU_POLICY, ENGINE_CPUS_PER_SESSION)
+            # Arène SHM unique : les segments orphelins d'un serveur précédent sont supprimés d'abord
+            ShmArena.sweep_orphans()
+            cls._instance.arena = ShmArena(SHM_ARENA_SIZE)
+            # Socket UDP commune à toutes les sessions (démarrée avec l'application)
+            cls._instance.udp = UdpTransport(UDP_PORT, UDP_DATAGRAM_SIZE) if UDP_PORT else None
+            # Cache des poses du VAE, commun à tous les moteurs
+            cls._instance.pose_caches = PoseCacheRegistry(VAE_CACHE_SIZE) if VAE_CACHE_SIZE > 0 else None
+            # Horloge de tick commune : une seule boucle de diffusion pour toutes les sessions
+            cls._instance.clock = ServerClock(TICK_FPS) if TICK_FPS > 0 else None
+            cls._instance.tick_task = None
+            # Groupes de lecture synchronisée : identifiant -> sessions démarrées au même tick
+            cls._instance.sync_groups: Dict[str, List[str]] = {}
+            # Admission des nouvelles sessions selon la marge restante de la machine
+            cls._instance.admission = AdmissionController(
+                ADMISSION_POLICY,
+                ADMISSION_CPU_BUDGET,
+                ADMISSION_MEMORY_BUDGET,
+                ADMISSION_SHM_BUDGET,
+                ADMISSION_QUEUE_TIMEOUT,
+                ADMISSION_REDIRECT_URL,
+            )
+            cls._instance.server_usage = EngineUsage()
+            # Démarrages en tâche de fond (création asynchrone) : session_id -> tâche
+            cls._instance.launches: Dict[str, asyncio.Task] = {}
+            # Promotions en cours (copy-on-write d'une vue) : session_id -> tâche
+            cls._instance.promotions: Dict[str, asyncio.Task] = {}
+            # Redémarrages en cours, un par session : le superviseur continue de surveiller les autres
+            cls._instance.recoveries: Dict[AnimationSession, asyncio.Task] = {}
         return cls._instance
 
+    # --- SUPERVISION DES MOTEURS ---
+    def start_supervisor(self):
+        if self.supervisor_task is None:
+            self.supervisor_task = asyncio.create_task(self.supervise_loop())
+
+    async def stop_supervisor(self):
+        if self.supervisor_task:
+            self.supervisor_task.cancel()
+            try:
+                await self.supervisor_task
+            except asyncio.CancelledError:
+                pass
+            self.supervisor_task = None
+
+    async def supervise_loop(self):
+        """
+        Détecte les moteurs morts (sentinel du processus) ou bloqués (heartbeat figé dans la SHM)
+        et les relance en conservant la SHM et l'état de lecture.
+        """
+        loop = asyncio.get_running_loop()
+        # session -> (dernier heartbeat vu, instant où il a changé)
+        heartbeats: Dict[AnimationSession, tuple] = {}
+
+        while True:
+            try:
+                sessions = {
+                    s
+                    for s in self.sessions.values()
+                    if s.started and not s.failed and not s.migrating and s not in self.recoveries
+                }
+
+                # Attente sur les sentinels : réveil immédiat si un moteur meurt
+                sentinels = [s.engine.sentinel for s in sessions]
+                if sentinels:
+                    await loop.run_in_executor(
+                        None, multiprocessing.connection.wait, sentinels, SUPERVISOR_INTERVAL
+                    )
+                else:
+                    await asyncio.sleep(SUPERVISOR_INTERVAL)
+
+                if self.udp is not None:
+                    self._expire_udp_peers()
+
+                await self._account()
+
+                now = loop.time()
+                for session in sessions:
+                    if not session.started or session.migrating or session in self.recoveries:
+                        continue  # Arrêtée, en migration ou déjà en redémarrage entre-temps
+
+                    beat = session.ring.heartbeat
+                    last_beat, since = heartbeats.get(session, (beat, now))
+                    if beat != last_beat:
+                        since = now
+                    heartbeats[session] = (beat, since)
+
+                    if not session.engine.is_alive():
+                        reason = f"processus terminé (code {session.engine.exitcode})"
+                    elif now - since > ENGINE_HEARTBEAT_TIMEOUT:
+                        reason = f"heartbeat figé depuis {now - since:.1f}s"
+                    else:
+                        continue
+
+                    heartbeats.pop(session, None)
+                    # Une poignée de main peut durer ENGINE_INIT_TIMEOUT : en tâche de fond
+                    recovery = self.recoveries[session] = asyncio.create_task(self._recover(session, reason))
+                    recovery.add_done_callback(lambda _, s=session: self.recoveries.pop(s, None))
+
+                for session in list(heartbeats):
+                    if session not in sessions:
+                        del heartbeats[session]
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erreur superviseur: {e}")
+
+    async def _account(self):
+        """
+        Mesure le serveur et chaque moteur : les moteurs chauds remplacent leur réservation par leur consommation
+        réelle et affinent le coût de leur type d'animateur (s'ils calculent des frames, pas en pause).
+        """
+        admission = self.admission
+        self.server_usage.update(os.getpid())
+        used = list(self.server_usage.cost())
+
+        for session in {s for s in self.sessions.values() if s.started and s.ring is not None and not s.migrating}:
+            usage = session.usage
+            if not usage.update(session.engine.pid, session.ring.write_seq, session.region.size) or not usage.warm:
+                continue  # Moteur arrêté, ou encore couvert par sa réservation (chargement)
+            cost = usage.cost()
+            used = [total + value for total, value in zip(used, cost)]
+            for session_id in session.session_ids:
+                admission.release(session_id)
+            if usage.frames > 0:
+                admission.model.observe(session.animator_class.__name__, cost)
+
+        admission.used = tuple(used)
+        await admission.changed()
+
+    def capacity(self) -> Dict[str, Any]:
+        """Budget, consommation et marge de la machine, coût estimé par type d'animateur (répartiteur de charge)"""
+        stats = self.admission.stats()
+        stats["server"] = self.server_usage.as_dict()
+        stats["sessions"] = {
+            session.session_id: {
+                "animator": session.animator_class.__name__,
+                "views": sorted(session.session_ids),
+                **session.usage.as_dict(),
+            }
+            for session in {s for s in self.sessions.values() if s.started}
+        }
+        return stats
+
+    # --- HORLOGE DE TICK ---
+    def start_clock(self):
+        if self.clock is not None and self.tick_task is None:
+            self.tick_task = asyncio.create_task(self.tick_loop())
+
+    async def stop_clock(self):
+        if self.tick_task:
+            self.tick_task.cancel()
+            try:
+                await self.tick_task
+            except asyncio.CancelledError:
+                pass
+            self.tick_task = None
+
+    async def tick_loop(self):
+        """
+        Un réveil par tick pour toutes les sessions, au milieu du tick : les moteurs, calés sur sa frontière,
+        ont publié leur frame entre-temps. Remplace les boucles de broadcast (et leurs threads d'attente) par session.
+        """
+        clock = self.clock.clock
+        half_period = clock.period_ns // 2
+        logger.info("Boucle de diffusion à l'horloge démarrée.")
+
+        while True:
+            try:
+                now = time.monotonic_ns()
+                tick = clock.tick_at(now - half_period) + 1
+                await asyncio.sleep((clock.tick_time(tick) + half_period - now) / 1e9)
+
+                now = time.monotonic_ns()
+                clock.mark(tick)
+                for session in {s for s in self.sessions.values() if s.started and s.ring is not None}:
+                    try:
+                        await session.flush(now)
+                    except Exception as e:
+                        logger.error(f"Erreur broadcast session {session.session_id}: {e}")
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Erreur boucle de diffusion: {e}")
+
+    async def sync_group(
+        self, group_id: str, session_ids: List[str], time_s: float = 0.0, speed: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Lecture synchronisée : toutes les sessions du groupe repartent de 'time_s' au même tick de l'horloge,
+        puis avancent du même pas (ticks écoulés) : leurs frames restent cohérentes entre elles.
+        Rappeler avec le même identifiant resynchronise le groupe (ex: après une pause).
+        """
+        if self.clock is None:
+            raise RuntimeError("Horloge de tick désactivée (TICK_FPS=0).")
+        for session_id in session_ids:
+            if not self.get_session(session_id):
+                raise ValueError("Session introuvable")
+
+        clock = self.clock.clock
+        tick = clock.next_tick(time.monotonic_ns() + int(SYNC_START_DELAY * 1e9))
+        args = {"time": time_s, "tick": tick, "speed": speed}
+        for session_id in session_ids:
+            await self.dispatch_action(session_id, "sync_start", args)
+        # Une session en pause repart avec le groupe
+        for session_id in session_ids:
+            await self.dispatch_action(session_id, "play")
+
+        self.sync_groups[group_id] = list(session_ids)
+        return {"group_id": group_id, "sessions": list(session_ids), "start_tick": tick, "time": time_s}
+
+    def remove_sync_group(self, group_id: str):
+        if self.sync_groups.pop(group_id, None) is None:
+            raise ValueError("Groupe introuvable")
+
+    async def _recover(self, session: AnimationSession, reason: str):
+        if session.restart_count >= ENGINE_MAX_RESTARTS:
+            session.failed = True
+            session.status, session.error = "failed", f"abandon après {session.restart_count} redémarrages ({reason})"
+            logger.error(f"Session {session.session_id}: abandon après {session.restart_count} redémarrages")
+            return
+
+        session.restart_count += 1
+        logger.warning(f"Session {session.session_id}: moteur défaillant ({reason}), redémarrage...")
+        try:
+            await session.restart()
+        except Exception as e:
+            logger.error(f"Session {session.session_id}: échec du redémarrage: {e}")
+
+    @staticmethod
+    def _dedup_key(animator_cls: type[AnimatorInterface], path: str, parameters: Optional[Dict[str, Any]]):
+        return animator_cls.__name__, path, json.dumps(parameters or {}, sort_keys=True)
+
+    async def admit(
+        self,
+        session_id: str,
+        animator_cls: type[AnimatorInterface],
+        path: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        shared: Optional[bool] = None,
+    ):
+        """
+        Contrôle d'admission avant create_session : réserve le coût estimé du moteur, ou lève CapacityError
+        (CapacityRedirect en mode "redirect"). Une vue sur un moteur partagé existant ne coûte rien.
+        """
+        if self._reuses_engine(animator_cls, path, parameters, shared):
+            return
+        await self.admission.admit(session_id, animator_cls.__name__)
+
+    def _reuses_engine(
+        self,
+        animator_cls: type[AnimatorInterface],
+        path: str,
+        parameters: Optional[Dict[str, Any]],
+        shared: Optional[bool],
+    ) -> bool:
+        if shared is None:
+            shared = SESSION_DEDUP
+        return shared and self._dedup_key(animator_cls, path, parameters) in self.shared_engines
+
+    async def launch(
+        self,
+        session_id: str,
+        animator_cls: type[AnimatorInterface],
+        path: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        shared: Optional[bool] = None,
+    ) -> AnimationSession:
+        """
+        Création asynchrone : la session est enregistrée tout de suite, son moteur démarre en tâche de fond
+        (status "starting" puis "running" ou "failed"). Un refus d'admission (reject / redirect) est levé ici ;
+        en mode "queue", l'attente de capacité se fait aussi en tâche de fond (status "queued").
+        """
+        if session_id in self.sessions:
+            raise ValueError(f"La session {session_id} existe déjà.")
+
+        queued = not self._reuses_engine(animator_cls, path, parameters, shared) and self.admission.policy == "queue"
+        if not queued:
+            await self.admit(session_id, animator_cls, path, parameters, shared)
+        session = self.create_session(session_id, animator_cls, path, parameters, shared)
+
+        if not session.started:
+            session.status = "queued" if queued else "starting"
+            self.launches[session_id] = asyncio.create_task(
+                self._launch(session, session_id, animator_cls.__name__ if queued else None)
+            )
+        return session
+
+    async def _launch(self, session: AnimationSession, session_id: str, queued_animator: Optional[str]):
+        try:
+            if queued_animator is not None:
+                await self.admission.admit(session_id, queued_animator)
+            await session.start()
+        except Exception as e:
+            # La session reste enregistrée ("failed") pour que le client lise l'erreur, puis la supprime
+            self.admission.release(session_id)
+            session.status, session.error = "failed", str(e)
+            session.ready.set()
+            logger.error(f"Session {session_id}: échec du démarrage: {e}")
+        finally:
+            if self.launches.get(session_id) is asyncio.current_task():
+                del self.launches[session_id]
+
+    async def launch_many(self, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Création groupée : chaque session passe l'admission puis démarre en tâche de fond,
+        les handshakes des moteurs se chevauchent. Retourne l'état (ou l'erreur) de chaque session.
+        """
+        results = {}
+        for request in requests:
+            session_id = request["session_id"]
+            try:
+                session = await self.launch(**request)
+                results[session_id] = {"status": session.status, "shared": session.shared}
+            except CapacityRedirect as e:
+                results[session_id] = {"status": "redirected", "url": e.url, "error": str(e)}
+            except (ValueError, CapacityError) as e:
+                results[session_id] = {"status": "rejected", "error": str(e)}
+        return results
+
     def create_session(
-        self, session_id: str, animator_cls: type[AnimatorInterface], path: str
+        self,
+        session_id: str,
+        animator_cls: type[AnimatorInterface],
+        path: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        shared: Optional[bool] = None,
     ) -> AnimationSession:
-        """Crée une nouvelle session (mais ne la démarre pas forcément tout de suite)"""
+        """
+        Crée une nouvelle session (mais ne la démarre pas forcément tout de suite).
+        Si le partage est actif (SESSION_DEDUP ou 'shared'), une session identique à une session
+        existante devient une vue sur le même moteur au lieu d'en lancer un nouveau.
+        """
         if session_id in self.sessions:
             raise ValueError(f"La session {session_id} existe déjà.")
 
-        session = AnimationSession(session_id, animator_cls, path)
+        if shared is None:
+            shared = SESSION_DEDUP
+
+        key = self._dedup_key(animator_cls, path, parameters)
+        session = self.shared_engines.get(key) if shared else None
+
+        if session is not None:
+            session.session_ids.add(session_id)
+            logger.info(f"Session {session_id}: partage du moteur de {session.session_id}")
+        else:
+            session = AnimationSession(
+                session_id,
+                animator_cls,
+                path,
+                parameters,
+                self.placement.acquire(),
+                self.arena,
+                self.udp,
+                self.pose_caches,
+                self.clock,
+            )
+            if shared:
+                self.shared_engines[key] = session
+
         self.sessions[session_id] = session
         return session
 
     def get_session(self, session_id: str) -> Optional[AnimationSession]:
         return self.sessions.get(session_id)
 
+    # --- CLIENTS UDP ---
+    async def register_udp(self, session_id: str) -> Dict[str, Any]:
+        """
+        Inscrit un client UDP : il envoie ensuite HELLO + token depuis sa socket de réception
+        (puis régulièrement, comme keep-alive) pour recevoir les frames de la session.
+        """
+        session = self.get_session(session_id)
+        if not session:
+            raise ValueError("Session introuvable")
+        if self.udp is None or self.udp.sock is None:
+            raise RuntimeError("Transport UDP désactivé (UDP_PORT=0 ou port indisponible).")
+        await session.wait_ready()
+
+        peer = self.udp.register(session_id)
+        session.udp_peers.add(peer)
+        return {
+            "token": peer.token,
+            "port": self.udp.sock.getsockname()[1],
+            "datagram_size": self.udp.datagram_size,
+            "frame_size": session.frame_size,
+            "timeout": self.udp.peer_timeout,
+        }
+
+    def _expire_udp_peers(self):
+        for peer in self.udp.expire():
+            session = self.get_session(peer.session_id)
+            if session:
+                session.udp_peers.discard(peer)
+
+    # --- ABONNEMENTS MULTIPLEXÉS ---
+    def subscribe(self, client: MultiplexClient, session_ids: list[str]):
+        """Abonne un client multiplexé ; retourne (sessions abonnées, sessions inconnues)"""
+        subscribed, unknown = [], []
+        for session_id in session_ids:
+            session = self.get_session(session_id)
+            if session:
+                session.subscribe(client, session_id)
+                subscribed.append(session_id)
+            else:
+                unknown.append(session_id)
+        return subscribed, unknown
+
+    def unsubscribe(self, client: MultiplexClient, session_ids: Optional[list[str]] = None):
+        """Désabonne un client (de toutes ses sessions si session_ids est None)"""
+        for session_id in list(client.subscriptions if session_ids is None else session_ids):
+            session = self.get_session(session_id)
+            if session:
+                session.unsubscribe(client, session_id)
+            client.subscriptions.discard(session_id)
+
     async def delete_session(self, session_id: str):
-        """Arrête proprement une session et la retire de la liste"""
-        if session_id in self.sessions:
-            await self.sessions[session_id].stop()
-            del self.sessions[session_id]
-            logger.info(f"Session {session_id} supprimée du manager.")
+        """
+        Arrête proprement une session et la retire de la liste.
+        Un moteur partagé n'est arrêté qu'au départ de sa dernière vue.
+        """
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+
+        # Démarrage encore en cours (ou en attente de capacité) : abandonné, sauf si le moteur qu'il démarre
+        # sert aussi d'autres vues. L'annulation est attendue avant l'arrêt de la session.
+        launch = self.launches.pop(session_id, None)
+        if launch is not None and not session.shared:
+            launch.cancel()
+            await asyncio.gather(launch, return_exceptions=True)
+
+        for group in self.sync_groups.values():
+            if session_id in group:
+                group.remove(session_id)
+        self.admission.release(session_id)
+
+        if session.shared:
+            websockets, _ = session.detach_view(session_id)
+            for websocket in websockets:
+                await websocket.close()
+        else:
+            await session.stop()
+            self.placement.release(session.placement)
+            for key, shared_session in list(self.shared_engines.items()):
+                if shared_session is session:
+                    del self.shared_engines[key]
+        await self.admission.changed()
+        logger.info(f"Session {session_id} supprimée du manager.")
+
+    async def delete_sessions(self, session_ids: List[str]) -> Dict[str, str]:
+        """Suppression groupée : les arrêts des moteurs (attente de fin de processus) se chevauchent"""
+        known = [session_id for session_id in session_ids if session_id in self.sessions]
+        results = await asyncio.gather(
+            *(self.delete_session(session_id) for session_id in known), return_exceptions=True
+        )
+        status = {session_id: "not_found" for session_id in session_ids}
+        for session_id, result in zip(known, results):
+            if isinstance(result, Exception):
+                logger.error(f"Session {session_id}: échec de la suppression: {result}")
+                status[session_id] = f"error: {result}"
+            else:
+                status[session_id] = "deleted"
+        return status
+
+    async def _promote(self, session_id: str) -> AnimationSession:
+        """
+        Copy-on-write : donne à une vue son propre moteur avant qu'elle ne modifie son état.
+        Les commandes concurrentes d'une même vue attendent la même promotion (un seul nouveau moteur).
+        """
+        promotion = self.promotions.get(session_id)
+        if promotion is None:
+            session = self.sessions[session_id]
+            if not session.shared:
+                return session  # Déjà promue par une commande concurrente
+            promotion = self.promotions[session_id] = asyncio.create_task(self._promote_view(session_id))
+            promotion.add_done_callback(lambda _: self.promotions.pop(session_id, None))
+        # shield : une requête abandonnée n'interrompt pas la promotion attendue par les autres
+        return await asyncio.shield(promotion)
+
+    async def _promote_view(self, session_id: str) -> AnimationSession:
+        """Le nouveau moteur reprend au même instant et récupère les connexions de la vue"""
+        shared_session = self.sessions[session_id]
+        logger.info(f"Session {session_id}: promotion vers un moteur dédié")
+
+        placement = self.placement.acquire()
+        session = AnimationSession(
+            session_id,
+            shared_session.animator_class,
+            shared_session.source_path,
+            shared_session.parameters,
+            placement,
+            self.arena,
+            self.udp,
+            self.pose_caches,
+            self.clock,
+        )
+        # Promotion non refusable : le nouveau moteur est seulement compté
+        self.admission.reserve(session_id, session.animator_class.__name__)
+        try:
+            await session.start()
+            await session.restore(await shared_session.snapshot())
+        except BaseException:
+            # La vue reste sur le moteur partagé : le nouveau moteur et ses ressources sont rendus
+            await session.stop()
+            self.placement.release(placement)
+            self.admission.release(session_id)
+            raise
+
+        # detach_view retire la vue des ensembles du moteur partagé : options des clients relevées avant
+        adaptive, compressed = set(shared_session.adaptive), set(shared_session.compressed)
+        stream_rates = dict(shared_session.stream_rates)
+        peers = {peer for peer in shared_session.udp_peers if peer.session_id == session_id}
+        websockets, clients = shared_session.detach_view(session_id)
+        session.connections |= websockets
+        session.views[session_id] = websockets
+        session.adaptive |= websockets & adaptive
+        session.compressed |= websockets & compressed
+        session.stream_rates.update({ws: fps for ws, fps in stream_rates.items() if ws in websockets})
+        session.stream_fps = shared_session.stream_fps
+        session.target_fps = shared_session.target_fps
+        session.udp_peers |= peers
+        for client in clients:
+            session.subscribe(client, session_id)
+
+        self.sessions[session_id] = session
+        return session
+
+    async def migrate_session(self, session_id: str) -> int:
+        """
+        Déplace le moteur d'une session vers un nouveau processus, sans coupure côté clients.
+        Le nouveau moteur reçoit le groupe de coeurs le moins chargé (l'ancien compte encore) :
+        la migration déleste ainsi un coeur surchargé. L'ancien groupe est libéré après la passation.
+        """
+        session = self.get_session(session_id)
+        if not session:
+            raise ValueError("Session introuvable")
+
+        placement = self.placement.acquire()
+        try:
+            old_placement = await session.migrate(placement)
+        except BaseException:
+            self.placement.release(placement)
+            raise
+        if placement is not None:
+            self.placement.release(old_placement)
+        return session.engine.pid
 
     # --- DISPATCHER CENTRAL ---
     async def dispatch_action(self, session_id: str, command: str, args: Any = None):
         session = self.get_session(session_id)
         if not session:
             raise ValueError("Session introuvable")
+        # Création asynchrone : le Pipe sert au handshake tant que le moteur démarre
+        await session.wait_ready()
+
+        # Une vue partagée qui change d'état obtient d'abord son propre moteur
+        if session.shared and command not in READ_ONLY_COMMANDS:
+            session = await self._promote(session_id)
 
         # Interception des commandes locales (rapides)
         if command == "pause":
@@ -324,6 +1621,10 @@ class SessionManager:
         elif command == "play":
             session.play()
             return "playing"
+        elif command == "set_fps":
+            # Fps demandé mémorisé côté session : cadence d'envoi, interpolation, rejoué après un redémarrage
+            await session.set_fps(float(args))
+            return session.target_fps
 
         # Délégation au moteur (via Pipe)
         return await session.execute_command(command, args)
@@ -349,13 +1650,6 @@ class SessionManager:
     #         return await s.set_speed(speed)
     #     else:
     #         raise ValueError("Session introuvable")
-    #
-    # async def set_session_fps(self, session_id: str, fps: float):
-    #     s = self.get_session(session_id)
-    #     if s:
-    #         return await s.set_fps(fps)
-    #     else:
-    #         raise ValueError("Session introuvable")
 
     async def set_session_vae_values(self, session_id: str, vae_values: list[float]):
         s = self.get_session(session_id)
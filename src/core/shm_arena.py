@@ -0,0 +1,192 @@
+import logging
+import os
+import secrets
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ShmArena")
+logger.setLevel(logging.INFO)
+
+# Tous les segments du serveur sont nommés "moma_<pid du serveur>_<boot>_<suffixe>" : au démarrage, ceux dont
+# le processus propriétaire n'existe plus sont supprimés. Le pid seul ne suffit pas (toujours 1 dans un
+# conteneur Docker) : BOOT_ID, tiré à chaque lancement, distingue les segments d'une exécution précédente.
+SEGMENT_PREFIX = "moma_"
+SHM_DIR = "/dev/shm"
+BOOT_ID = secrets.token_hex(4)
+
+# Alignement des blocs : une page (les slots du ring restent alignés sur 64 octets à l'intérieur)
+MIN_CLASS_SIZE = 4096
+
+
+def segment_name(suffix: str) -> str:
+    """Nom d'un segment de ce serveur (reconnu par sweep_orphans s'il lui survit)"""
+    return f"{SEGMENT_PREFIX}{os.getpid()}_{BOOT_ID}_{suffix}"
+
+
+def _size_class(size: int) -> int:
+    """Plus petite puissance de deux >= size (et >= MIN_CLASS_SIZE)"""
+    return max(MIN_CLASS_SIZE, 1 << (size - 1).bit_length())
+
+
+class ShmRegion:
+    """
+    Zone de mémoire partagée attribuée à une session : un bloc de l'arène, ou un segment dédié.
+    Le moteur s'y rattache avec 'address' = (nom du segment, offset, taille).
+    """
+
+    def __init__(self, shm: SharedMemory, offset: int, size: int, arena: "ShmArena" = None, size_class: int = 0):
+        self.shm = shm
+        self.offset = offset
+        self.size = size
+        self.arena = arena
+        self.size_class = size_class
+        self.buf = shm.buf[offset : offset + size]
+
+    @classmethod
+    def dedicated(cls, size: int, name: Optional[str] = None) -> "ShmRegion":
+        return cls(SharedMemory(name=name, create=True, size=size), 0, size)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def address(self) -> Tuple[str, int, int]:
+        return self.shm.name, self.offset, self.size
+
+    def release(self):
+        # Les vues NumPy (FrameRing) sur la zone doivent être libérées avant
+        self.buf.release()
+        if self.arena is not None:
+            self.arena.free(self)
+        else:
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ShmArena:
+    """
+    Arène de mémoire partagée unique pour toutes les sessions du serveur.
+
+    Un seul segment (créé au premier besoin, ses pages ne sont engagées qu'à l'écriture) découpé en blocs
+    de tailles puissances de deux : chaque classe de taille a sa liste de blocs libres, réutilisés
+    à la session suivante. Une demande plus grande que 'max_class_size', ou une arène pleine,
+    repli sur un segment dédié (nommé lui aussi "moma_<pid>_<boot>_..." pour le nettoyage).
+    """
+
+    def __init__(self, size: int, max_class_size: int = 64 * 1024 * 1024):
+        self.size = size
+        self.max_class_size = max_class_size
+        self.shm: Optional[SharedMemory] = None
+        # Prochain offset jamais attribué (allocation en pile, les blocs libérés vont dans free_lists)
+        self.top = 0
+        self.free_lists: Dict[int, List[int]] = {}
+        self.allocated: Dict[int, int] = {}
+        self.dedicated_count = 0
+
+    def allocate(self, size: int) -> ShmRegion:
+        size_class = _size_class(size)
+
+        if size_class <= self.max_class_size:
+            if self.shm is None and self.size > 0:
+                self.shm = SharedMemory(name=segment_name("arena"), create=True, size=self.size)
+                logger.info(f"Arène SHM {self.shm.name} créée ({self.size} octets)")
+
+            offset = self._take_block(size_class)
+            if offset is not None:
+                region = ShmRegion(self.shm, offset, size, self, size_class)
+                # Un bloc réutilisé contient encore l'ancien ring (WRITE_SEQ, heartbeat...)
+                region.buf[:] = bytes(size)
+                return region
+
+        self.dedicated_count += 1
+        logger.info(f"Arène SHM : segment dédié pour {size} octets")
+        return ShmRegion.dedicated(size, segment_name(str(self.dedicated_count)))
+
+    def _take_block(self, size_class: int) -> Optional[int]:
+        free = self.free_lists.get(size_class)
+        if free:
+            offset = free.pop()
+        elif self.shm is not None and self.top + size_class <= self.size:
+            offset = self.top
+            self.top += size_class
+        else:
+            return None
+        self.allocated[offset] = size_class
+        return offset
+
+    def free(self, region: ShmRegion):
+        size_class = self.allocated.pop(region.offset, None)
+        if size_class is not None:
+            self.free_lists.setdefault(size_class, []).append(region.offset)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "segment": self.shm.name if self.shm else None,
+            "size": self.size,
+            "used": sum(self.allocated.values()),
+            "reserved": self.top,
+            "regions": len(self.allocated),
+            "free_blocks": {size_class: len(offsets) for size_class, offsets in self.free_lists.items() if offsets},
+            "dedicated_segments": self.dedicated_count,
+        }
+
+    def close(self):
+        if self.shm is None:
+            return
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning("Arène SHM encore référencée à la fermeture")
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+    @staticmethod
+    def sweep_orphans() -> List[str]:
+        """
+        Supprime les segments "moma_<pid>_<boot>_*" laissés par un serveur arrêté sans nettoyage (crash, kill -9).
+        Seuls ceux de l'exécution courante et des autres serveurs encore en vie sont conservés.
+        """
+        if not os.path.isdir(SHM_DIR):
+            return []
+
+        removed = []
+        for name in os.listdir(SHM_DIR):
+            if not name.startswith(SEGMENT_PREFIX):
+                continue
+            fields = name[len(SEGMENT_PREFIX) :].split("_", 2)
+            try:
+                pid = int(fields[0])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                # Même pid qu'une exécution précédente (redémarrage du conteneur) : seul BOOT_ID les distingue
+                if len(fields) == 3 and fields[1] == BOOT_ID:
+                    continue
+            elif _pid_alive(pid):
+                continue
+            try:
+                os.unlink(os.path.join(SHM_DIR, name))
+                removed.append(name)
+            except OSError as e:
+                logger.warning(f"Segment orphelin {name} non supprimé: {e}")
+
+        if removed:
+            logger.info(f"{len(removed)} segment(s) SHM orphelin(s) supprimé(s): {removed}")
+        return removed
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,102 @@
+import logging
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .shm_arena import ShmRegion, segment_name
+
+logger = logging.getLogger("TickClock")
+logger.setLevel(logging.INFO)
+
+# Horloge de tick du serveur, en mémoire partagée (segment "moma_<pid>_<boot>_clock", un seul par serveur) :
+#
+#   [ origine (monotonic_ns) | période (ns) | dernier tick diffusé | ... ]  (int64)
+#
+# time.monotonic_ns() est commune à tous les processus : les moteurs calent leurs frames sur les
+# frontières de tick (origine + k * période) et le broadcaster du serveur se réveille une fois par tick
+# pour diffuser toutes les sessions prêtes, au lieu d'un réveil désaligné par session.
+
+CLOCK_SIZE = 64
+
+# --- Mots de l'horloge (int64) ---
+CLOCK_ORIGIN_NS = 0
+CLOCK_PERIOD_NS = 1
+CLOCK_TICK = 2  # Dernier tick diffusé par le processus principal
+
+
+class TickClock:
+    """Vue (NumPy, zero-copy) sur l'horloge partagée, utilisée des deux côtés"""
+
+    def __init__(self, buffer: memoryview):
+        self.buffer = buffer
+        self.words = np.ndarray((CLOCK_SIZE // 8,), dtype=np.int64, buffer=buffer, offset=0)
+
+    @staticmethod
+    def format(buffer: memoryview, fps: float):
+        words = np.ndarray((CLOCK_SIZE // 8,), dtype=np.int64, buffer=buffer, offset=0)
+        words[CLOCK_ORIGIN_NS] = time.monotonic_ns()
+        words[CLOCK_PERIOD_NS] = int(round(1e9 / fps))
+
+    @property
+    def period_ns(self) -> int:
+        return int(self.words[CLOCK_PERIOD_NS])
+
+    @property
+    def tick(self) -> int:
+        return int(self.words[CLOCK_TICK])
+
+    def tick_at(self, now_ns: int) -> int:
+        """Index du tick en cours à l'instant 'now_ns'"""
+        return (now_ns - int(self.words[CLOCK_ORIGIN_NS])) // self.period_ns
+
+    def tick_time(self, tick: int) -> int:
+        """Instant (monotonic_ns) de la frontière du tick"""
+        return int(self.words[CLOCK_ORIGIN_NS]) + tick * self.period_ns
+
+    def next_tick(self, now_ns: int) -> int:
+        """Premier tick dont la frontière est strictement postérieure à 'now_ns'"""
+        return self.tick_at(now_ns) + 1
+
+    def ticks_per_frame(self, fps: float) -> int:
+        """Nombre de ticks entre deux frames d'un moteur à 'fps' (au moins un)"""
+        return max(1, int(round(1e9 / (fps * self.period_ns))))
+
+    def mark(self, tick: int):
+        self.words[CLOCK_TICK] = tick
+
+
+class ServerClock:
+    """Côté processus principal : crée et possède le segment de l'horloge"""
+
+    def __init__(self, fps: float):
+        self.fps = fps
+        self.region = ShmRegion.dedicated(CLOCK_SIZE, segment_name("clock"))
+        TickClock.format(self.region.buf, fps)
+        self.clock = TickClock(self.region.buf)
+        logger.info(f"Horloge de tick : {fps} Hz ({self.region.name})")
+
+    @property
+    def address(self) -> Tuple[str, int, int]:
+        return self.region.address
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fps": self.fps,
+            "period_ns": self.clock.period_ns,
+            "tick": self.clock.tick_at(time.monotonic_ns()),
+            "last_flushed_tick": self.clock.tick,
+        }
+
+    def close(self):
+        # La vue NumPy référence le segment : on la libère avant de le détruire
+        self.clock = None
+        self.region.release()
+
+
+def attach(address: Tuple[str, int, int]) -> Tuple[SharedMemory, TickClock]:
+    """Côté moteur : rattachement à l'horloge créée par le processus principal"""
+    name, offset, size = address
+    shm = SharedMemory(name=name)
+    return shm, TickClock(shm.buf[offset : offset + size])
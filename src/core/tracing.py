@@ -0,0 +1,104 @@
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Étapes d'une frame, de son calcul à son envoi (instants time.monotonic_ns, communs à tous les processus) :
+#
+#   compute ──> publish ──> ready ──> dispatch ──> slice ──> sent
+#   (moteur : en-tête du slot)   (broadcaster : relevés par le FrameTracer)
+#
+# ready = instant de présentation (frame calculée d'avance, LOOKAHEAD_FRAMES), sinon la publication :
+# l'avance voulue (publish -> ready) est ainsi séparée de la latence de réveil du broadcaster (ready -> dispatch).
+
+TRACE_FIELDS = ("frame_id", "compute", "publish", "ready", "dispatch", "slice", "sent", "clients")
+(
+    FIELD_FRAME_ID,
+    FIELD_COMPUTE,
+    FIELD_PUBLISH,
+    FIELD_READY,
+    FIELD_DISPATCH,
+    FIELD_SLICE,
+    FIELD_SENT,
+    FIELD_CLIENTS,
+) = range(len(TRACE_FIELDS))
+
+# (nom de l'étape, début, fin, côté moteur)
+STAGES = (
+    ("compute", FIELD_COMPUTE, FIELD_PUBLISH, True),
+    ("ahead", FIELD_PUBLISH, FIELD_READY, False),
+    ("wakeup", FIELD_READY, FIELD_DISPATCH, False),
+    ("slice", FIELD_DISPATCH, FIELD_SLICE, False),
+    ("send", FIELD_SLICE, FIELD_SENT, False),
+)
+
+
+class FrameTracer:
+    """
+    Ring borné des instants de chaque étape, pour les 'capacity' dernières frames diffusées d'une session.
+    Une ligne int64 par frame, écrasée circulairement : pas d'allocation pendant la diffusion.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.records = np.zeros((capacity, len(TRACE_FIELDS)), dtype=np.int64)
+        self.count = 0
+
+    def record(self, frame_id: int, compute: int, publish: int, ready: int, dispatch: int, slice_end: int, sent: int, clients: int):
+        self.records[self.count % self.capacity] = (frame_id, compute, publish, ready, dispatch, slice_end, sent, clients)
+        self.count += 1
+
+    def rows(self) -> np.ndarray:
+        """Frames enregistrées, de la plus ancienne à la plus récente"""
+        if self.count <= self.capacity:
+            return self.records[: self.count]
+        start = self.count % self.capacity
+        return np.concatenate((self.records[start:], self.records[:start]))
+
+    def summary(self) -> Dict[str, Any]:
+        """Durée médiane et p99 de chaque étape (µs)"""
+        rows = self.rows()
+        stages = {}
+        for name, start, end, _ in STAGES:
+            valid = (rows[:, start] > 0) & (rows[:, end] >= rows[:, start])
+            if name == "ahead":
+                valid &= rows[:, end] > rows[:, start]  # Frames calculées d'avance seulement
+            durations = (rows[valid, end] - rows[valid, start]) / 1000.0
+            if len(durations):
+                stages[name] = {
+                    "p50_us": float(np.percentile(durations, 50)),
+                    "p99_us": float(np.percentile(durations, 99)),
+                }
+        return {"frames": len(rows), "capacity": self.capacity, "stages": stages}
+
+    def chrome_trace(self, session_id: str, engine_pid: int) -> Dict[str, Any]:
+        """
+        Trace au format Chrome / Perfetto (chrome://tracing, ui.perfetto.dev) : un événement complet ("X")
+        par étape et par frame, le calcul sur la piste du processus moteur, la diffusion sur celle du serveur.
+        L'avance des frames calculées d'avance se chevauche d'une frame à l'autre : événements asynchrones (b/e).
+        """
+        server_pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": engine_pid, "args": {"name": f"moteur {session_id}"}},
+            {"name": "process_name", "ph": "M", "pid": server_pid, "args": {"name": "serveur (broadcaster)"}},
+            {"name": "thread_name", "ph": "M", "pid": server_pid, "tid": 0, "args": {"name": session_id}},
+        ]
+        for row in self.rows():
+            frame_id = int(row[FIELD_FRAME_ID])
+            for name, start, end, engine_side in STAGES:
+                if row[start] <= 0 or row[end] < row[start] or (name == "ahead" and row[end] == row[start]):
+                    continue
+                event = {
+                    "name": name,
+                    "cat": "frame",
+                    "ts": row[start] / 1000.0,
+                    "pid": engine_pid if engine_side else server_pid,
+                    "tid": 0,
+                    "args": {"frame_id": frame_id, "clients": int(row[FIELD_CLIENTS])},
+                }
+                if name == "ahead":
+                    events.append({**event, "ph": "b", "id": frame_id})
+                    events.append({**event, "ph": "e", "id": frame_id, "ts": row[end] / 1000.0})
+                else:
+                    events.append({**event, "ph": "X", "dur": (row[end] - row[start]) / 1000.0})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
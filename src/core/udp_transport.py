@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import secrets
+import socket
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("UdpTransport")
+logger.setLevel(logging.INFO)
+
+# Datagramme serveur -> client (little-endian), une frame étant découpée en fragments :
+#   magic (4) + frame_id (4) + taille frame (4) + index fragment (2) + nombre de fragments (2) + offset (4)
+#   + octets [offset, offset + n) de la frame
+# Aucune retransmission : le client garde la frame complète la plus récente et jette les autres.
+FRAGMENT_MAGIC = 0x4D4F4D55  # "MOMU"
+FRAGMENT_HEADER = struct.Struct("<IIIHHI")
+
+# Client -> serveur : magic (4) + token (ASCII) ; HELLO enregistre / rafraîchit l'adresse, BYE la retire
+HELLO_MAGIC = b"MOMH"
+BYE_MAGIC = b"MOMB"
+
+# Recul de frame_id au-delà duquel le client considère que le flux a repris à zéro (vue promue vers son propre
+# moteur, ring recréé) plutôt qu'il s'agit d'un fragment en retard
+REORDER_WINDOW = 32
+
+
+class UdpPeer:
+    """Client UDP enregistré via l'API REST ; son adresse est connue à son premier HELLO"""
+
+    def __init__(self, token: str, session_id: str):
+        self.token = token
+        self.session_id = session_id
+        self.addr: Optional[Tuple[str, int]] = None
+        self.last_seen = time.monotonic()
+        self.datagrams = 0
+        self.dropped = 0
+
+
+class UdpTransport(asyncio.DatagramProtocol):
+    """
+    Socket UDP unique du serveur : reçoit les HELLO / BYE des clients et leur envoie les frames.
+
+    Les fragments sont émis avec sendmsg (scatter-gather : en-tête + tranche de la vue SHM du slot),
+    sans copier la frame. Un client qui n'envoie plus de HELLO pendant 'peer_timeout' est oublié.
+    """
+
+    def __init__(self, port: int, datagram_size: int = 1472, peer_timeout: float = 10.0):
+        self.port = port
+        self.datagram_size = datagram_size
+        self.chunk_size = datagram_size - FRAGMENT_HEADER.size
+        self.peer_timeout = peer_timeout
+        self.peers: Dict[str, UdpPeer] = {}
+        self.sock: Optional[socket.socket] = None
+        self.transport = None
+
+    async def start(self) -> bool:
+        """Ouvre la socket ; un port occupé (plusieurs noeuds sur une machine) laisse le serveur démarrer sans UDP"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+            sock.bind(("0.0.0.0", self.port))
+        except OSError as e:
+            sock.close()
+            logger.error(f"Transport UDP désactivé : port {self.port} indisponible ({e})")
+            return False
+        sock.setblocking(False)
+        self.sock = sock
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: self, sock=self.sock)
+        logger.info(f"Transport UDP en écoute sur le port {self.sock.getsockname()[1]}")
+        return True
+
+    def stop(self):
+        if self.transport is not None:
+            self.transport.close()  # Ferme aussi la socket
+            self.transport = None
+        self.sock = None
+        self.peers.clear()
+
+    # --- Enregistrement ---
+
+    def register(self, session_id: str) -> UdpPeer:
+        peer = UdpPeer(secrets.token_hex(16), session_id)
+        self.peers[peer.token] = peer
+        return peer
+
+    def unregister(self, peer: UdpPeer):
+        self.peers.pop(peer.token, None)
+
+    def datagram_received(self, data: bytes, addr):
+        magic, token = data[:4], data[4:].decode("ascii", errors="ignore")
+        peer = self.peers.get(token)
+        if peer is None:
+            return
+        if magic == HELLO_MAGIC:
+            peer.addr = addr
+            peer.last_seen = time.monotonic()
+        elif magic == BYE_MAGIC:
+            # Oublié au prochain passage de expire()
+            peer.addr = None
+            peer.last_seen = float("-inf")
+
+    def expire(self) -> List[UdpPeer]:
+        """Retire et retourne les clients sans HELLO depuis 'peer_timeout' (ou partis avec BYE)"""
+        deadline = time.monotonic() - self.peer_timeout
+        expired = [peer for peer in self.peers.values() if peer.last_seen < deadline]
+        for peer in expired:
+            del self.peers[peer.token]
+        return expired
+
+    # --- Émission ---
+
+    def send_frame(self, peers: Set[UdpPeer], frame_id: int, frame_view: memoryview):
+        """Fragmente la frame à la taille d'un datagramme et l'envoie à chaque client actif"""
+        if self.sock is None:
+            return
+        size = frame_view.nbytes
+        count = max(1, -(-size // self.chunk_size))
+        fragments = [
+            (
+                FRAGMENT_HEADER.pack(FRAGMENT_MAGIC, frame_id & 0xFFFFFFFF, size, index, count, offset),
+                frame_view[offset : offset + self.chunk_size],
+            )
+            for index, offset in enumerate(range(0, size, self.chunk_size))
+        ]
+
+        for peer in peers:
+            if peer.addr is None:
+                continue
+            try:
+                for header, chunk in fragments:
+                    if hasattr(self.sock, "sendmsg"):
+                        self.sock.sendmsg([header, chunk], [], 0, peer.addr)
+                    else:
+                        # Windows : pas de sendmsg, une copie par fragment
+                        self.sock.sendto(header + bytes(chunk), peer.addr)
+                    peer.datagrams += 1
+            except (BlockingIOError, InterruptedError):
+                # Buffer d'envoi plein : la frame est perdue pour ce client, la suivante la remplacera
+                peer.dropped += 1
+            except OSError as e:
+                logger.debug(f"Envoi UDP vers {peer.addr} impossible: {e}")
+                peer.dropped += 1
+
+
+class FrameReassembler:
+    """
+    Côté client : reconstitue les frames à partir des fragments.
+    Ne livre que des frames complètes et plus récentes que la dernière livrée ; une frame incomplète
+    est abandonnée dès qu'un fragment d'une frame plus récente arrive. Un frame_id qui recule de plus de
+    REORDER_WINDOW marque un nouveau flux (les frame_id d'un moteur promu repartent de 1).
+    """
+
+    def __init__(self):
+        self.frame_id = None
+        self.buffer: Optional[bytearray] = None
+        self.received: Set[int] = set()
+        self.count = 0
+        self.last_delivered = -1
+        self.incomplete = 0
+        self.restarts = 0
+
+    def feed(self, datagram: bytes) -> Optional[Tuple[int, bytes]]:
+        if len(datagram) < FRAGMENT_HEADER.size:
+            return None
+        magic, frame_id, size, index, count, offset = FRAGMENT_HEADER.unpack_from(datagram)
+        if magic != FRAGMENT_MAGIC:
+            return None
+        newest = max(self.last_delivered, self.frame_id or -1)
+        if frame_id < newest - REORDER_WINDOW:
+            # Nouveau flux : l'historique de l'ancien ne doit pas masquer ses frames
+            self.restarts += 1
+            self.last_delivered = -1
+            if self.frame_id is not None:
+                self.incomplete += 1
+            self.frame_id = None
+        elif frame_id <= self.last_delivered:
+            return None  # Frame périmée (ou déjà livrée)
+
+        if frame_id != self.frame_id:
+            if self.frame_id is not None and self.frame_id > frame_id:
+                return None  # Fragment en retard d'une frame plus ancienne que celle en cours
+            if self.frame_id is not None:
+                self.incomplete += 1
+            self.frame_id = frame_id
+            self.buffer = bytearray(size)
+            self.received = set()
+            self.count = count
+
+        chunk = memoryview(datagram)[FRAGMENT_HEADER.size :]
+        self.buffer[offset : offset + len(chunk)] = chunk
+        self.received.add(index)
+
+        if len(self.received) < self.count:
+            return None
+        frame, self.frame_id, self.buffer = bytes(self.buffer), None, None
+        self.last_delivered = frame_id
+        return frame_id, frame
@@ -0,0 +1,115 @@
+import logging
+import struct
+import weakref
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("WsBroadcast")
+logger.setLevel(logging.INFO)
+
+# Au-delà de ce volume en attente d'envoi, un client lent saute des frames plutôt que d'accumuler du retard
+MAX_PENDING_BYTES = 1024 * 1024
+
+# Premier octet d'une frame WebSocket serveur -> client : FIN + opcode binaire (RFC 6455, non masquée)
+FIN_BINARY = 0x82
+
+
+def encode_binary_frame(payload) -> bytes:
+    """
+    Construit une frame WebSocket binaire complète (en-tête + payload, une seule copie).
+    Jamais compressée : permessage-deflate autorise l'envoi de messages non compressés (RFC 7692).
+    """
+    length = memoryview(payload).nbytes
+    if length < 126:
+        header = struct.pack("!BB", FIN_BINARY, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", FIN_BINARY, 126, length)
+    else:
+        header = struct.pack("!BBQ", FIN_BINARY, 127, length)
+    return b"".join((header, payload))
+
+
+def _find_protocol(websocket: WebSocket):
+    """
+    Remonte la chaîne des callables ASGI 'send' (wrappers Starlette) jusqu'au protocole uvicorn,
+    qui détient le transport asyncio de la connexion.
+    """
+    send = getattr(websocket, "_send", None)
+    for _ in range(8):
+        owner = getattr(send, "__self__", None)
+        if owner is not None:
+            return owner if hasattr(owner, "transport") else None
+        code = getattr(send, "__code__", None)
+        if code is None or not send.__closure__:
+            return None
+        cells = dict(zip(code.co_freevars, send.__closure__))
+        if "send" not in cells:
+            return None
+        send = cells["send"].cell_contents
+    return None
+
+
+def _is_open(protocol) -> bool:
+    # websockets_sansio / wsproto : état porté par protocol.conn ; websockets (legacy) : par le protocole
+    state = getattr(getattr(protocol, "conn", None), "state", None)
+    if state is None:
+        state = getattr(protocol, "state", None)
+    return getattr(state, "name", None) == "OPEN"
+
+
+class RawWebSocketWriter:
+    """Écriture directe de frames pré-encodées sur le transport d'une connexion WebSocket uvicorn"""
+
+    # Frames sautées par l'ensemble des connexions, y compris celles déjà fermées
+    total_dropped = 0
+
+    def __init__(self, protocol):
+        self.protocol = protocol
+        self.dropped = 0
+
+    def write(self, frame: bytes) -> bool:
+        """
+        Retourne False si la connexion n'est plus ouverte (l'appelant repasse par send_bytes).
+        Une frame sautée (client trop lent) est comptée, et compte comme envoyée pour l'appelant.
+        """
+        transport = self.protocol.transport
+        if transport is None or transport.is_closing() or not _is_open(self.protocol):
+            return False
+        if transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            self.dropped += 1
+            RawWebSocketWriter.total_dropped += 1
+            return True
+        transport.write(frame)
+        return True
+
+
+# Résolu une fois par connexion ; suit la WebSocket d'une session à l'autre (promotion, migration)
+_writers: "weakref.WeakKeyDictionary[WebSocket, Optional[RawWebSocketWriter]]" = weakref.WeakKeyDictionary()
+
+
+def raw_writer(websocket: WebSocket) -> Optional[RawWebSocketWriter]:
+    """Writer direct de la connexion, ou None si le serveur ASGI n'expose pas de transport (repli send_bytes)"""
+    try:
+        return _writers[websocket]
+    except KeyError:
+        pass
+    protocol = _find_protocol(websocket)
+    writer = RawWebSocketWriter(protocol) if protocol is not None else None
+    if writer is None:
+        logger.info(f"Pas de transport direct pour {type(websocket).__name__}, repli sur send_bytes")
+    _writers[websocket] = writer
+    return writer
+
+
+def stats() -> Dict[str, Any]:
+    """Connexions servies par le chemin direct ou par send_bytes, et frames sautées faute de débit"""
+    writers = [writer for writer in _writers.values() if writer is not None]
+    return {
+        "connections": len(_writers),
+        "direct": len(writers),
+        "fallback": len(_writers) - len(writers),
+        "lagging_connections": sum(1 for writer in writers if writer.dropped),
+        "dropped_frames": RawWebSocketWriter.total_dropped,
+        "max_pending_bytes": MAX_PENDING_BYTES,
+    }
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from starlette.middleware.cors import CORSMiddleware
+
+from core.env import GATEWAY_PORT
+from routers import gateway_routes
+from routers.gateway_routes import registry
+
+# Passerelle du mode cluster : aucun moteur ni mémoire partagée ici, seulement le placement des sessions
+# sur les noeuds inscrits (CLUSTER_GATEWAY_URL) et le relais de leurs routes et WebSockets.
+#   uv run gateway.py  (GATEWAY_PORT, 9830 par défaut)
+
+logging.basicConfig()
+logger = logging.getLogger("Gateway")
+logger.setLevel(logging.DEBUG)
+
+app = FastAPI(title="MoMa Cluster Gateway")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+# --- WEBSOCKET ---
+
+
+@app.websocket("/ws/{session_id}")
+async def websocket_proxy(websocket: WebSocket, session_id: str):
+    """
+    Relaie le flux d'une session depuis son noeud (mêmes paramètres ?adaptive, ?compress, ?fps).
+    Un client qui veut éviter ce saut se connecte à l'URL donnée par GET /sessions/{session_id}/node.
+    """
+    node = registry.owner(session_id)
+    if node is None:
+        await websocket.close(code=4000, reason="Session does not exist")
+        return
+
+    query = websocket.url.query
+    url = f"{node.ws_url}/ws/{session_id}" + (f"?{query}" if query else "")
+    try:
+        upstream = await websockets.connect(url, max_size=None, compression=None)
+    except (OSError, websockets.exceptions.InvalidHandshake) as e:
+        logger.warning(f"Session {session_id}: connexion au noeud {node.node_id} impossible ({e})")
+        await websocket.close(code=4000, reason="Session does not exist")
+        return
+
+    await websocket.accept()
+
+    async def downstream() -> str:
+        # Frames binaires et événements texte (QUALITY) du noeud vers le client
+        try:
+            async for message in upstream:
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+        except WebSocketDisconnect:
+            return "client"
+        return "node"
+
+    async def client_messages() -> str:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return "client"
+                if message.get("bytes") is not None:
+                    await upstream.send(message["bytes"])
+                elif message.get("text") is not None:
+                    await upstream.send(message["text"])
+        except websockets.exceptions.ConnectionClosed:
+            return "node"
+
+    pumps = [asyncio.create_task(downstream()), asyncio.create_task(client_messages())]
+    try:
+        done, _ = await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        closed_by = done.pop().result()
+    finally:
+        for pump in pumps:
+            pump.cancel()
+        await upstream.close()
+
+    # Fin du flux côté noeud (ex: session supprimée) : fermeture transmise au client
+    if closed_by == "node":
+        try:
+            await websocket.close(code=upstream.close_code or 1000, reason=upstream.close_reason or "")
+        except (RuntimeError, WebSocketDisconnect):
+            pass
+
+
+@app.websocket("/ws")
+async def multiplex_unsupported(websocket: WebSocket):
+    # Un flux multiplexé agrège des sessions d'un même noeud : connexion directe au noeud
+    await websocket.close(code=4000, reason="Multiplexed stream: connect to the node (GET /sessions/{id}/node)")
+
+
+app.include_router(gateway_routes.router)
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=GATEWAY_PORT)
@@ -0,0 +1,533 @@
+import gc
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+from numba import njit, prange
+
+# --- CONSTANTES glTF ---
+GLB_MAGIC = 0x46546C67  # b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+FLOAT_COMPONENT = 5126
+
+PATH_TRANSLATION = 0
+PATH_ROTATION = 1
+PATH_SCALE = 2
+_PATHS = {"translation": PATH_TRANSLATION, "rotation": PATH_ROTATION, "scale": PATH_SCALE}
+
+INTERP_LINEAR = 0
+INTERP_STEP = 1
+INTERP_CUBIC = 2
+_INTERPOLATIONS = {"LINEAR": INTERP_LINEAR, "STEP": INTERP_STEP, "CUBICSPLINE": INTERP_CUBIC}
+
+_TYPE_WIDTH = {"SCALAR": 1, "VEC3": 3, "VEC4": 4}
+
+# Colonnes de la table des canaux (int64) consommée par les noyaux numba
+# [bone, path, times_offset, key_count, values_offset, values_stride, interpolation]
+CH_BONE, CH_PATH, CH_TIMES, CH_COUNT, CH_VALUES, CH_STRIDE, CH_INTERP = range(7)
+
+
+# ---------------------------------------------------------------------------
+# NOYAUX NUMBA
+# Ils lisent directement les clés dans la vue float32 du chunk BIN (fichier mappé),
+# sans jamais recopier les accessors.
+# ---------------------------------------------------------------------------
+
+@njit(cache=True)
+def _find_key(data, times_off, count, t):
+    """Recherche dichotomique : index k tel que times[k] <= t < times[k+1]"""
+    lo = 0
+    hi = count - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if data[times_off + mid] <= t:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+@njit(cache=True)
+def _sample_channel(data, ch, t, out):
+    count = ch[CH_COUNT]
+    times_off = ch[CH_TIMES]
+    values_off = ch[CH_VALUES]
+    stride = ch[CH_STRIDE]
+    interp = ch[CH_INTERP]
+    width = 4 if ch[CH_PATH] == PATH_ROTATION else 3
+
+    # CUBICSPLINE : chaque clé contient (tangente entrée, valeur, tangente sortie)
+    key_step = 3 if interp == INTERP_CUBIC else 1
+    value_shift = 1 if interp == INTERP_CUBIC else 0
+
+    first = data[times_off]
+    last = data[times_off + count - 1]
+    if count == 1 or t <= first:
+        base = values_off + value_shift * stride
+        for c in range(width):
+            out[c] = data[base + c]
+        return
+    if t >= last:
+        base = values_off + ((count - 1) * key_step + value_shift) * stride
+        for c in range(width):
+            out[c] = data[base + c]
+        return
+
+    k = _find_key(data, times_off, count, t)
+    t0 = data[times_off + k]
+    t1 = data[times_off + k + 1]
+    span = t1 - t0
+    s = (t - t0) / span if span > 0.0 else 0.0
+    v0 = values_off + (k * key_step + value_shift) * stride
+    v1 = values_off + ((k + 1) * key_step + value_shift) * stride
+
+    if interp == INTERP_STEP:
+        for c in range(width):
+            out[c] = data[v0 + c]
+        return
+
+    if interp == INTERP_CUBIC:
+        b0 = values_off + (k * 3 + 2) * stride  # tangente sortante de k
+        a1 = values_off + ((k + 1) * 3) * stride  # tangente entrante de k+1
+        s2 = s * s
+        s3 = s2 * s
+        h00 = 2.0 * s3 - 3.0 * s2 + 1.0
+        h10 = s3 - 2.0 * s2 + s
+        h01 = -2.0 * s3 + 3.0 * s2
+        h11 = s3 - s2
+        for c in range(width):
+            out[c] = (h00 * data[v0 + c] + h10 * span * data[b0 + c]
+                      + h01 * data[v1 + c] + h11 * span * data[a1 + c])
+    elif width == 4:
+        # Slerp (plus court chemin)
+        dot = 0.0
+        for c in range(4):
+            dot += data[v0 + c] * data[v1 + c]
+        sign = 1.0
+        if dot < 0.0:
+            dot = -dot
+            sign = -1.0
+        if dot > 0.9995:
+            w0 = 1.0 - s
+            w1 = s * sign
+        else:
+            theta = np.arccos(dot)
+            sin_theta = np.sin(theta)
+            w0 = np.sin((1.0 - s) * theta) / sin_theta
+            w1 = np.sin(s * theta) / sin_theta * sign
+        for c in range(4):
+            out[c] = w0 * data[v0 + c] + w1 * data[v1 + c]
+    else:
+        for c in range(width):
+            out[c] = data[v0 + c] + s * (data[v1 + c] - data[v0 + c])
+
+    if width == 4:
+        norm = np.sqrt(out[0] * out[0] + out[1] * out[1] + out[2] * out[2] + out[3] * out[3])
+        if norm > 0.0:
+            for c in range(4):
+                out[c] /= norm
+
+
+@njit(cache=True)
+def _compose_trs(tr, q, sc, out):
+    """Matrice 4x4 (translation en colonne 3) à partir de T, R (xyzw) et S"""
+    x, y, z, w = q[0], q[1], q[2], q[3]
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+
+    out[0, 0] = (1.0 - 2.0 * (yy + zz)) * sc[0]
+    out[0, 1] = 2.0 * (xy - wz) * sc[1]
+    out[0, 2] = 2.0 * (xz + wy) * sc[2]
+    out[1, 0] = 2.0 * (xy + wz) * sc[0]
+    out[1, 1] = (1.0 - 2.0 * (xx + zz)) * sc[1]
+    out[1, 2] = 2.0 * (yz - wx) * sc[2]
+    out[2, 0] = 2.0 * (xz - wy) * sc[0]
+    out[2, 1] = 2.0 * (yz + wx) * sc[1]
+    out[2, 2] = (1.0 - 2.0 * (xx + yy)) * sc[2]
+    out[0, 3] = tr[0]
+    out[1, 3] = tr[1]
+    out[2, 3] = tr[2]
+    out[3, 0] = 0.0
+    out[3, 1] = 0.0
+    out[3, 2] = 0.0
+    out[3, 3] = 1.0
+
+
+@njit(cache=True)
+def _mat4_mul(a, b, out):
+    for i in range(4):
+        for j in range(4):
+            acc = 0.0
+            for k in range(4):
+                acc += a[i, k] * b[k, j]
+            out[i, j] = acc
+
+
+@njit(cache=True)
+def _pose_at_time(data, channels, rest_t, rest_r, rest_s, root_mats, parents, t, local, out):
+    num_bones = parents.shape[0]
+    tr = rest_t.copy()
+    rot = rest_r.copy()
+    scl = rest_s.copy()
+    sample = np.empty(4, dtype=np.float64)
+
+    # 1. Échantillonnage des canaux animés
+    for i in range(channels.shape[0]):
+        ch = channels[i]
+        _sample_channel(data, ch, t, sample)
+        bone = ch[CH_BONE]
+        path = ch[CH_PATH]
+        if path == PATH_TRANSLATION:
+            tr[bone, 0] = sample[0]
+            tr[bone, 1] = sample[1]
+            tr[bone, 2] = sample[2]
+        elif path == PATH_ROTATION:
+            for c in range(4):
+                rot[bone, c] = sample[c]
+        else:
+            scl[bone, 0] = sample[0]
+            scl[bone, 1] = sample[1]
+            scl[bone, 2] = sample[2]
+
+    # 2. Matrices locales (les racines portent la transformation de leurs ancêtres hors squelette)
+    tmp = np.empty((4, 4), dtype=np.float64)
+    for b in range(num_bones):
+        if parents[b] < 0:
+            _compose_trs(tr[b], rot[b], scl[b], tmp)
+            _mat4_mul(root_mats[b], tmp, out[b])
+        else:
+            _compose_trs(tr[b], rot[b], scl[b], out[b])
+
+    # 3. FK globale (les parents sont toujours ordonnés avant leurs enfants)
+    if not local:
+        for b in range(num_bones):
+            p = parents[b]
+            if p >= 0:
+                _mat4_mul(out[p], out[b], tmp)
+                out[b] = tmp
+    return out
+
+
+@njit(cache=True, parallel=True)
+def _poses_at_times(data, channels, rest_t, rest_r, rest_s, root_mats, parents, times, local, out):
+    """Version batchée : une pose par instant de 'times', écrites dans out [N, num_bones, 4, 4]"""
+    for i in prange(times.shape[0]):
+        _pose_at_time(data, channels, rest_t, rest_r, rest_s, root_mats, parents, times[i], local, out[i])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# OUTILS NUMPY (chargement uniquement)
+# ---------------------------------------------------------------------------
+
+def _trs_matrix(translation, rotation, scale) -> np.ndarray:
+    mat = np.empty((4, 4), dtype=np.float64)
+    _compose_trs(
+        np.asarray(translation, dtype=np.float64),
+        np.asarray(rotation, dtype=np.float64),
+        np.asarray(scale, dtype=np.float64),
+        mat,
+    )
+    return mat
+
+
+def _matrix_to_trs(mat: np.ndarray):
+    """Décompose une matrice affine en (translation, quaternion xyzw, échelle)"""
+    translation = mat[:3, 3].copy()
+    scale = np.linalg.norm(mat[:3, :3], axis=0)
+    rot = mat[:3, :3] / np.where(scale > 0.0, scale, 1.0)
+
+    trace = rot[0, 0] + rot[1, 1] + rot[2, 2]
+    if trace > 0.0:
+        s = np.sqrt(trace + 1.0) * 2.0
+        q = [(rot[2, 1] - rot[1, 2]) / s, (rot[0, 2] - rot[2, 0]) / s, (rot[1, 0] - rot[0, 1]) / s, 0.25 * s]
+    elif rot[0, 0] > rot[1, 1] and rot[0, 0] > rot[2, 2]:
+        s = np.sqrt(1.0 + rot[0, 0] - rot[1, 1] - rot[2, 2]) * 2.0
+        q = [0.25 * s, (rot[0, 1] + rot[1, 0]) / s, (rot[0, 2] + rot[2, 0]) / s, (rot[2, 1] - rot[1, 2]) / s]
+    elif rot[1, 1] > rot[2, 2]:
+        s = np.sqrt(1.0 + rot[1, 1] - rot[0, 0] - rot[2, 2]) * 2.0
+        q = [(rot[0, 1] + rot[1, 0]) / s, 0.25 * s, (rot[1, 2] + rot[2, 1]) / s, (rot[0, 2] - rot[2, 0]) / s]
+    else:
+        s = np.sqrt(1.0 + rot[2, 2] - rot[0, 0] - rot[1, 1]) * 2.0
+        q = [(rot[0, 2] + rot[2, 0]) / s, (rot[1, 2] + rot[2, 1]) / s, 0.25 * s, (rot[1, 0] - rot[0, 1]) / s]
+    q = np.asarray(q, dtype=np.float64)
+    return translation, q / np.linalg.norm(q), scale
+
+
+def _node_matrix(node: Dict[str, Any]) -> np.ndarray:
+    if "matrix" in node:
+        # glTF stocke les matrices en column-major
+        return np.asarray(node["matrix"], dtype=np.float64).reshape(4, 4).T.copy()
+    return _trs_matrix(
+        node.get("translation", [0.0, 0.0, 0.0]),
+        node.get("rotation", [0.0, 0.0, 0.0, 1.0]),
+        node.get("scale", [1.0, 1.0, 1.0]),
+    )
+
+
+class FastGLB:
+    """
+    Chargeur glTF 2.0 natif (.glb, ou .gltf + .bin externe) pour le chemin FastFK.
+
+    Le fichier binaire est mappé en mémoire (mmap) et les accessors d'animation sont lus
+    directement depuis une vue NumPy float32 du buffer : aucune copie des clés.
+    Seules de petites tables d'offsets (int64) sont construites au chargement,
+    puis consommées par les noyaux numba.
+
+    Expose la même API que FastBVH : bone_names, frame_time, num_frames, duration,
+    get_skeleton_definition() et get_pose_at_time_numba().
+    """
+
+    def __init__(self, source_path: str, animation_index: int = 0):
+        self.source_path = source_path
+        self._file = None
+        self._mmap = None
+
+        gltf, self.data = self._map_file(Path(source_path))
+        self._build_skeleton(gltf)
+        self._build_channels(gltf, animation_index)
+
+    # --- CHARGEMENT ---
+
+    def _map_file(self, path: Path):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if path.suffix.lower() == ".gltf":
+            gltf = json.loads(self._mmap[:])
+            uri = gltf["buffers"][0].get("uri")
+            if uri is None or uri.startswith("data:"):
+                raise ValueError("glTF: seuls les buffers externes (.bin) sont supportés")
+            # Le JSON est lu, on mappe le .bin à la place
+            self._mmap.close()
+            self._file.close()
+            self._file = open(path.parent / uri, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            bin_offset, bin_length = 0, len(self._mmap)
+        else:
+            if len(self._mmap) < 20:
+                raise ValueError(f"{path.name}: fichier GLB tronqué")
+            magic, version, _ = struct.unpack_from("<III", self._mmap, 0)
+            if magic != GLB_MAGIC or version != 2:
+                raise ValueError(f"{path.name}: fichier GLB 2.0 invalide")
+
+            json_length, json_type = struct.unpack_from("<II", self._mmap, 12)
+            if json_type != CHUNK_JSON:
+                raise ValueError(f"{path.name}: chunk JSON manquant")
+            bin_header = 20 + json_length
+            if bin_header + 8 > len(self._mmap):
+                raise ValueError(f"{path.name}: fichier GLB tronqué (chunk BIN absent)")
+            gltf = json.loads(self._mmap[20:bin_header])
+
+            bin_length, bin_type = struct.unpack_from("<II", self._mmap, bin_header)
+            if bin_type != CHUNK_BIN:
+                raise ValueError(f"{path.name}: chunk BIN manquant")
+            bin_offset = bin_header + 8
+            # Les noyaux numba lisent sans contrôle de bornes : le chunk doit tenir dans le fichier
+            if bin_offset % 4 or bin_offset + bin_length > len(self._mmap):
+                raise ValueError(f"{path.name}: chunk BIN tronqué ou non aligné")
+
+        # Vue zero-copy (lecture seule) sur tout le buffer binaire
+        data = np.frombuffer(self._mmap, dtype=np.float32, count=bin_length // 4, offset=bin_offset)
+        return gltf, data
+
+    def _accessor(self, gltf: Dict[str, Any], index: int):
+        """
+        Retourne (offset, stride, count, width) en unités float32 dans self.data.
+        Les bornes sont vérifiées ici : les noyaux numba lisent la vue sans contrôle (un fichier malformé
+        ferait sinon planter le moteur au lieu de lever une erreur).
+        """
+        accessor = gltf["accessors"][index]
+        if accessor.get("componentType") != FLOAT_COMPONENT or "sparse" in accessor:
+            raise ValueError(f"Accessor {index}: seuls les accessors float32 denses sont supportés")
+        if accessor.get("type") not in _TYPE_WIDTH:
+            raise ValueError(f"Accessor {index}: type {accessor.get('type')} non supporté")
+
+        view = gltf["bufferViews"][accessor["bufferView"]]
+        if view.get("buffer", 0) != 0:
+            raise ValueError(f"Accessor {index}: seul le buffer 0 est supporté")
+
+        width = _TYPE_WIDTH[accessor["type"]]
+        count = accessor["count"]
+        view_offset = view.get("byteOffset", 0)
+        view_length = view["byteLength"]
+        accessor_offset = accessor.get("byteOffset", 0)
+        byte_offset = view_offset + accessor_offset
+        byte_stride = view.get("byteStride", width * 4)
+        if byte_offset % 4 or byte_stride % 4:
+            raise ValueError(f"Accessor {index}: données non alignées sur 4 octets")
+        if count < 1 or byte_stride < width * 4:
+            raise ValueError(f"Accessor {index}: count ou byteStride invalide")
+
+        # Dernier élément : (count - 1) pas complets + un élément
+        accessor_length = (count - 1) * byte_stride + width * 4
+        if accessor_offset + accessor_length > view_length or view_offset + view_length > self.data.size * 4:
+            raise ValueError(f"Accessor {index}: données hors du buffer binaire (fichier tronqué ?)")
+
+        return byte_offset // 4, byte_stride // 4, count, width
+
+    def _build_skeleton(self, gltf: Dict[str, Any]):
+        nodes = gltf["nodes"]
+        parent_of = {}
+        for i, node in enumerate(nodes):
+            for child in node.get("children", []):
+                parent_of[child] = i
+
+        skins = gltf.get("skins", [])
+        if skins:
+            joints = list(skins[0]["joints"])
+        else:
+            # Pas de skin : on anime les noeuds ciblés par les canaux
+            joints = sorted({
+                ch["target"]["node"]
+                for anim in gltf.get("animations", [])
+                for ch in anim["channels"]
+                if "node" in ch["target"]
+            })
+        joint_set = set(joints)
+
+        def joint_parent(node_index):
+            p = parent_of.get(node_index)
+            while p is not None and p not in joint_set:
+                p = parent_of.get(p)
+            return p
+
+        # Ordre topologique : un parent est toujours avant ses enfants (exigé par la FK)
+        children = {j: [] for j in joints}
+        roots = []
+        for j in joints:
+            p = joint_parent(j)
+            (children[p] if p is not None else roots).append(j)
+
+        order: List[int] = []
+        stack = list(reversed(roots))
+        while stack:
+            j = stack.pop()
+            order.append(j)
+            stack.extend(reversed(children[j]))
+
+        self.node_to_bone = {node: bone for bone, node in enumerate(order)}
+        num_bones = len(order)
+
+        self.bone_names = [nodes[n].get("name", f"joint_{n}") for n in order]
+        self.parents = np.array(
+            [self.node_to_bone[joint_parent(n)] if joint_parent(n) is not None else -1 for n in order],
+            dtype=np.int64,
+        )
+
+        self.rest_t = np.zeros((num_bones, 3), dtype=np.float64)
+        self.rest_r = np.zeros((num_bones, 4), dtype=np.float64)
+        self.rest_s = np.ones((num_bones, 3), dtype=np.float64)
+        self.root_mats = np.tile(np.eye(4), (num_bones, 1, 1))
+
+        for bone, n in enumerate(order):
+            self.rest_t[bone], self.rest_r[bone], self.rest_s[bone] = _matrix_to_trs(_node_matrix(nodes[n]))
+
+            if self.parents[bone] < 0:
+                # Transformation monde des ancêtres hors squelette (ex: noeud Z_UP)
+                mat = np.eye(4)
+                p = parent_of.get(n)
+                while p is not None:
+                    mat = _node_matrix(nodes[p]) @ mat
+                    p = parent_of.get(p)
+                self.root_mats[bone] = mat
+
+    def _build_channels(self, gltf: Dict[str, Any], animation_index: int):
+        animations = gltf.get("animations", [])
+        rows = []
+        durations = [0.0]
+        key_times = None
+
+        if animations:
+            anim = animations[animation_index]
+            for ch in anim["channels"]:
+                target = ch["target"]
+                bone = self.node_to_bone.get(target.get("node"))
+                path = _PATHS.get(target["path"])
+                if bone is None or path is None:
+                    continue  # Poids de morph targets ou noeud hors squelette
+
+                sampler = anim["samplers"][ch["sampler"]]
+                times_off, times_stride, count, times_width = self._accessor(gltf, sampler["input"])
+                if times_width != 1 or times_stride != 1:
+                    raise ValueError(f"Sampler {ch['sampler']}: instants des clés non contigus (SCALAR attendu)")
+                values_off, values_stride, values_count, width = self._accessor(gltf, sampler["output"])
+                interp = _INTERPOLATIONS[sampler.get("interpolation", "LINEAR")]
+                # Les noyaux lisent 'count' clés (x3 en CUBICSPLINE) de 4 (rotation) ou 3 composantes
+                key_step = 3 if interp == INTERP_CUBIC else 1
+                if width != (4 if path == PATH_ROTATION else 3) or values_count < count * key_step:
+                    raise ValueError(
+                        f"Sampler {ch['sampler']}: {values_count} valeurs {width}D pour {count} clés {target['path']}"
+                    )
+
+                rows.append((bone, path, times_off, count, values_off, values_stride, interp))
+                times = self.data[times_off:times_off + count]
+                durations.append(float(times[-1]))
+                if key_times is None and count > 1:
+                    key_times = times
+
+        self.channels = np.array(rows, dtype=np.int64).reshape(-1, 7)
+        self.duration = max(durations)
+
+        if key_times is not None:
+            self.frame_time = float(np.median(np.diff(key_times)))
+        else:
+            self.frame_time = 1.0 / 30.0
+        self.num_frames = int(round(self.duration / self.frame_time)) + 1
+
+    # --- API PUBLIQUE (identique à FastBVH) ---
+
+    def get_skeleton_definition(self) -> Dict[str, Any]:
+        positions, rotations, scales = [], [], []
+        for bone in range(len(self.bone_names)):
+            local = _trs_matrix(self.rest_t[bone], self.rest_r[bone], self.rest_s[bone])
+            if self.parents[bone] < 0:
+                local = self.root_mats[bone] @ local
+            t, r, s = _matrix_to_trs(local)
+            positions.append([float(x) for x in t])
+            rotations.append([float(x) for x in r])  # xyzw
+            scales.append([float(x) for x in s])
+
+        return {
+            "type": "SKELETON_DEF",
+            "bone_names": self.bone_names,
+            "parents": [int(p) for p in self.parents],
+            "bind_pose": {"positions": positions, "rotations": rotations, "scales": scales},
+        }
+
+    def get_pose_at_time_numba(self, t: float, out: np.ndarray, loop: bool = True, local: bool = True):
+        """Écrit la pose à l'instant t dans 'out' ([num_bones, 4, 4] float64)"""
+        if loop and self.duration > 0.0:
+            t = t % self.duration
+        return _pose_at_time(
+            self.data, self.channels, self.rest_t, self.rest_r, self.rest_s,
+            self.root_mats, self.parents, float(t), local, out,
+        )
+
+    def get_poses_at_times(self, times: np.ndarray, out: np.ndarray, loop: bool = True, local: bool = True):
+        """Évalue N poses en un seul appel numba parallèle ('out' : [N, num_bones, 4, 4] float64)"""
+        times = np.asarray(times, dtype=np.float64)
+        if loop and self.duration > 0.0:
+            times = np.mod(times, self.duration)
+        return _poses_at_times(
+            self.data, self.channels, self.rest_t, self.rest_r, self.rest_s,
+            self.root_mats, self.parents, times, local, out,
+        )
+
+    def close(self):
+        if self._mmap is not None:
+            # La vue NumPy référence le mmap : on la libère avant de fermer
+            self.data = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Une compilation numba (premier appel sans cache) peut garder la vue dans un cycle de références
+                gc.collect()
+                self._mmap.close()
+            self._file.close()
+            self._mmap = None
@@ -1,11 +1,20 @@
 import logging
 import multiprocessing
 from contextlib import asynccontextmanager
+from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from starlette.middleware.cors import CORSMiddleware
 
+from core.env import JIT_CACHE_DIR, CLUSTER_GATEWAY_URL, CLUSTER_NODE_URL, CLUSTER_NODE_ID, CLUSTER_HEARTBEAT
+from core.jit_cache import configure_cache
+
+# Avant tout import de numba (routes -> animateurs -> solveur FK) : les moteurs héritent du cache versionné
+configure_cache(JIT_CACHE_DIR)
+
+from core.cluster import ClusterAgent
+from core.multiplex import MultiplexClient
 from core.session_manager import SessionManager
 from routers import base_routes, vae_routes
 
@@ -20,17 +29,44 @@ manager: SessionManager = SessionManager()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # On Startup Event
-    # Initialisation si nécessaire
-    # <...>
+    # Surveillance des moteurs (redémarrage automatique en cas de crash)
+    manager.start_supervisor()
+    # Diffusion à l'horloge de tick commune (TICK_FPS > 0)
+    manager.start_clock()
+    # Socket UDP des clients temps réel (POST /sessions/{session_id}/udp)
+    if manager.udp is not None:
+        await manager.udp.start()
+    # Mode cluster : relevés de capacité et de sessions envoyés à la passerelle
+    agent = None
+    if CLUSTER_GATEWAY_URL:
+        agent = ClusterAgent(
+            CLUSTER_GATEWAY_URL,
+            CLUSTER_NODE_URL,
+            CLUSTER_NODE_ID,
+            CLUSTER_HEARTBEAT,
+            lambda: {"capacity": manager.capacity(), "sessions": list(manager.sessions)},
+        )
+        agent.start()
 
     yield
 
     # On Shutdown Event
-    for session_id in list(manager.sessions.keys()):
-        await manager.delete_session(session_id)
+    if agent is not None:
+        await agent.stop()
+    await manager.stop_supervisor()
+    await manager.stop_clock()
+    # Arrêt des moteurs en parallèle
+    await manager.delete_sessions(list(manager.sessions.keys()))
+    manager.arena.close()
+    if manager.pose_caches is not None:
+        manager.pose_caches.close()
+    if manager.udp is not None:
+        manager.udp.stop()
+    if manager.clock is not None:
+        manager.clock.close()
 
 
-app = FastAPI(title="MoMa Animation Streamer")
+app = FastAPI(title="MoMa Animation Streamer", lifespan=lifespan)
 
 # Ceci autorise toutes les origines, toutes les méthodes et tous les headers.
 # Pour la prod, remplacez ["*"] par ["http://localhost:5173"]
@@ -47,14 +83,29 @@ app.add_middleware(
 
 
 @app.websocket("/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    session_id: str,
+    adaptive: bool = False,
+    compress: bool = False,
+    fps: Optional[float] = None,
+):
     logger.info(f"Nouvelle connexion WS pour la session: {session_id}")
     session = manager.get_session(session_id)
     if not session:
         await websocket.close(code=4000, reason="Session does not exist")
         return
 
-    await session.connect(websocket)
+    # adaptive=1 : le client accepte les événements QUALITY (JSON) et des frames float32 sous pression
+    # compress=1 : frames zlib avec le dictionnaire de GET /sessions/{session_id}/dictionary
+    # fps=N : poses interpolées à N Hz, indépendamment du rythme de simulation du moteur
+    try:
+        # Création asynchrone : connexion acceptée une fois le moteur démarré
+        await session.wait_ready()
+        await session.connect(websocket, session_id, adaptive=adaptive, compress=compress, fps=fps)
+    except (ValueError, RuntimeError) as e:
+        await websocket.close(code=4001, reason=str(e))
+        return
     try:
         # On attend juste que la connexion se ferme
         # Le flux de données est géré par session.broadcast_loop()
@@ -66,10 +117,56 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             # Simple keep-alive ou attente passive
             await websocket.receive_text()
     except WebSocketDisconnect:
-        session.disconnect(websocket)
+        pass
     except Exception as e:
         print(f"Erreur WS: {e}")
-        session.disconnect(websocket)
+    finally:
+        # La vue a pu être promue vers un autre moteur entre-temps
+        session = manager.get_session(session_id)
+        if session:
+            session.disconnect(websocket)
+
+
+@app.websocket("/ws")
+async def multiplex_endpoint(websocket: WebSocket, fps: float = 60.0):
+    """
+    Une seule connexion pour suivre plusieurs sessions.
+    Le client envoie des messages texte JSON :
+        {"action": "subscribe", "sessions": ["a", "b"]}
+        {"action": "unsubscribe", "sessions": ["a"]}
+    et reçoit, à chaque tick (fps), un message binaire regroupant les frames prêtes
+    (format décrit dans core/multiplex.py).
+    """
+    try:
+        client = MultiplexClient(websocket, fps)
+    except ValueError as e:
+        await websocket.close(code=4001, reason=str(e))
+        return
+    await websocket.accept()
+    client.start()
+    logger.info("Nouvelle connexion WS multiplexée")
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            session_ids = list(message.get("sessions", []))
+
+            if action == "subscribe":
+                subscribed, unknown = manager.subscribe(client, session_ids)
+                await websocket.send_json({"type": "SUBSCRIBED", "sessions": subscribed, "unknown": unknown})
+            elif action == "unsubscribe":
+                manager.unsubscribe(client, session_ids)
+                await websocket.send_json({"type": "UNSUBSCRIBED", "sessions": session_ids})
+            else:
+                await websocket.send_json({"type": "ERROR", "detail": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Erreur WS multiplexé: {e}")
+    finally:
+        manager.unsubscribe(client)
+        await client.stop()
 
 
 # @app.websocket("/ws")
@@ -1,19 +1,32 @@
+import asyncio
 import os
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from pydantic import BaseModel, Field
 
-from animators.fast_fk_animator import FastFKAnimator
+from animators.crowd_animator import CrowdAnimator
+from animators.fast_fk_animator import FastFKAnimator, LOADERS
+from animators.replay_animator import ReplayAnimator
 from animators.vae_animator import VaeAnimator
-from core.env import ANIMATION_DIR
-from core.session_manager import SessionManager, AnimationSession
+from core import ws_broadcast
+from core.admission import CapacityError, CapacityRedirect
+from core.capture import CAPTURE_EXTENSION
+from core.env import ANIMATION_DIR, CAPTURE_DIR
+from core.session_manager import SessionManager, AnimationSession, ENGINE_INIT_TIMEOUT
 
 
 # Data model for session creation request
 class SessionCreateRequest(BaseModel):
     session_id: str
-    session_type: str = "FK"  # ex: "FK", "VAE", etc.
-    animation_file: str  # ex: "Walking.fbx"
+    session_type: str = "FK"  # ex: "FK", "VAE", "CROWD", "REPLAY", etc.
+    animation_file: str  # ex: "Walking.fbx" (REPLAY : fichier de capture, ex: "demo.cap")
+    # Paramètres propres à l'animateur
+    # ex CROWD : {"instances": [{"time_offset": 0.5, "speed": 1.2, "root_transform": [[...4x4...]]}, ...]}
+    parameters: Dict[str, Any] = {}
+    # Partage du moteur avec les sessions identiques (None = valeur serveur SESSION_DEDUP)
+    shared: Optional[bool] = None
 
 class SpeedRequest(BaseModel):
     playback_speed: float
@@ -21,6 +34,33 @@ class SpeedRequest(BaseModel):
 class FpsRequest(BaseModel):
     fps: float
 
+class ClipSwapRequest(BaseModel):
+    animation_file: str  # ex: "Walking.glb", même squelette que le clip courant
+    fade_duration: float = 0.5  # secondes
+
+class SyncGroupRequest(BaseModel):
+    session_ids: list[str]
+    time: float = 0.0  # temps de départ commun (s)
+    playback_speed: Optional[float] = None  # vitesse commune (None = vitesse de chaque session)
+
+class ProfileRequest(BaseModel):
+    mode: str = "sample"  # "sample" (échantillonnage de pile) ou "cprofile" (déterministe)
+    duration: float = 5.0  # secondes
+    interval_ms: float = 5.0  # période d'échantillonnage (mode sample)
+
+class BulkCreateRequest(BaseModel):
+    sessions: list[SessionCreateRequest]
+
+class BulkDeleteRequest(BaseModel):
+    session_ids: list[str]
+
+class TraceRequest(BaseModel):
+    capacity: int = Field(4096, gt=0)  # nombre de frames conservées (les plus récentes)
+
+class RecordingRequest(BaseModel):
+    name: Optional[str] = None  # nom du fichier de capture (défaut : <session_id>_<date>)
+    max_frames: int = Field(36000, gt=0)  # taille préallouée (10 min à 60 fps)
+
 
 print("Using animation directory:", ANIMATION_DIR)
 
@@ -31,36 +71,149 @@ router = APIRouter()
 
 @router.get("/animations")
 async def get_all_animations():
-    # Retourne la liste de toutes les animations .bvh dans le dossier ./animations
+    # Retourne la liste de toutes les animations lisibles par FastFK (.bvh, .glb, .gltf)
     import os
     try:
         files = os.listdir(ANIMATION_DIR)
-        bvh_files = [f for f in files if f.lower().endswith(".bvh")]
-        return {"animations": bvh_files}
+        anim_files = [f for f in files if os.path.splitext(f)[1].lower() in LOADERS]
+        return {"animations": anim_files}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/sessions")
-async def create_session(req: SessionCreateRequest):
-    """Crée une nouvelle session d'animation (lance le process)"""
-    try:
-        session : AnimationSession = None
-        match req.session_type:
-            case "FK":
-                session  = manager.create_session(
-                    req.session_id, FastFKAnimator, f"{ANIMATION_DIR}/{req.animation_file}"
-                )
-            case "VAE":
-                session = manager.create_session(
-                    req.session_id, VaeAnimator, f"{ANIMATION_DIR}/{req.animation_file}"
-                )
-            case _:
-                raise ValueError(f"Unknown session type: {req.session_type}")
-
-        await session.start()
-        return {"status": "created", "session_id": req.session_id}
+@router.get("/captures")
+async def get_all_captures():
+    # Retourne la liste des captures rejouables (session_type "REPLAY")
+    try:
+        files = os.listdir(CAPTURE_DIR) if os.path.isdir(CAPTURE_DIR) else []
+        return {"captures": [f for f in files if f.endswith(CAPTURE_EXTENSION)]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/shm")
+async def get_shm_stats():
+    """Occupation de l'arène de mémoire partagée (blocs attribués, blocs libres par classe de taille)"""
+    return manager.arena.stats()
+
+@router.get("/broadcast")
+async def get_broadcast_stats():
+    """Diffusion WebSocket : connexions en écriture directe / send_bytes, frames sautées par les clients lents"""
+    return ws_broadcast.stats()
+
+def _animator(req: SessionCreateRequest):
+    """Type d'animateur et fichier source d'une demande de création"""
+    match req.session_type:
+        case "FK":
+            return FastFKAnimator, f"{ANIMATION_DIR}/{req.animation_file}"
+        case "VAE":
+            return VaeAnimator, f"{ANIMATION_DIR}/{req.animation_file}"
+        case "CROWD":
+            return CrowdAnimator, f"{ANIMATION_DIR}/{req.animation_file}"
+        case "REPLAY":
+            return ReplayAnimator, f"{CAPTURE_DIR}/{req.animation_file}"
+        case _:
+            raise ValueError(f"Unknown session type: {req.session_type}")
+
+
+def _status(session: AnimationSession, session_id: str) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "status": session.status,
+        "error": session.error,
+        "shared": session.shared,
+        "restarts": session.restart_count,
+    }
+
+
+@router.post("/sessions", status_code=202)
+async def create_session(req: SessionCreateRequest, response: Response, wait: bool = False):
+    """
+    Crée une nouvelle session d'animation, si la capacité du serveur le permet : le moteur démarre en tâche
+    de fond (202, suivi via GET /sessions/{id}/status). ?wait=1 : réponse une fois le moteur démarré.
+    """
+    try:
+        animator_cls, path = _animator(req)
+        session = await manager.launch(req.session_id, animator_cls, path, req.parameters, req.shared)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacityRedirect as e:
+        # 307 : le client rejoue le POST (même corps) sur le serveur de repli
+        return RedirectResponse(e.url, status_code=307)
+    except CapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    if wait:
+        try:
+            await session.wait_ready()
+        except RuntimeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        response.status_code = 200
+        return {"status": "created", "session_id": req.session_id, "shared": session.shared}
+
+    response.headers["Location"] = f"/sessions/{req.session_id}/status"
+    return _status(session, req.session_id)
+
+
+@router.post("/sessions/bulk", status_code=202)
+async def create_sessions(req: BulkCreateRequest, wait: bool = False):
+    """
+    Crée plusieurs sessions d'un coup (ex: une scène) : les moteurs démarrent en parallèle,
+    la durée totale est celle du démarrage le plus lent. Une demande refusée n'empêche pas les autres.
+    """
+    requests, results = [], {}
+    for item in req.sessions:
+        try:
+            animator_cls, path = _animator(item)
+        except ValueError as e:
+            results[item.session_id] = {"status": "rejected", "error": str(e)}
+            continue
+        requests.append(
+            {
+                "session_id": item.session_id,
+                "animator_cls": animator_cls,
+                "path": path,
+                "parameters": item.parameters,
+                "shared": item.shared,
+            }
+        )
+    results.update(await manager.launch_many(requests))
+
+    if wait:
+        launched = [session_id for session_id, result in results.items() if result["status"] in ("queued", "starting")]
+        sessions = [manager.get_session(session_id) for session_id in launched]
+        await asyncio.gather(*(session.wait_ready() for session in sessions if session), return_exceptions=True)
+        for session_id, session in zip(launched, sessions):
+            if session:
+                results[session_id] = _status(session, session_id)
+    return {"sessions": results}
+
+
+@router.delete("/sessions/bulk")
+async def stop_sessions(req: BulkDeleteRequest):
+    """Supprime plusieurs sessions : les moteurs s'arrêtent en parallèle"""
+    return {"sessions": await manager.delete_sessions(req.session_ids)}
+
+
+@router.get("/sessions/{session_id}/status")
+async def get_session_status(session_id: str, wait: float = 0.0):
+    """
+    État du démarrage : "queued", "starting", "running", "failed" (voir "error") ou "stopped".
+    wait > 0 : attend au plus 'wait' s la fin du démarrage (long polling).
+    """
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    if wait > 0 and not session.ready.is_set():
+        try:
+            await asyncio.wait_for(session.ready.wait(), min(wait, ENGINE_INIT_TIMEOUT))
+        except asyncio.TimeoutError:
+            pass
+    return _status(session, session_id)
+
+
+@router.get("/capacity")
+async def get_capacity():
+    """Marge de la machine pour de nouvelles sessions (interrogée par le répartiteur de charge)"""
+    return manager.capacity()
 
 
 @router.get("/sessions/{session_id}/skeleton")
@@ -69,9 +222,37 @@ async def get_skeleton(session_id: str):
     session = manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    # Création asynchrone : le squelette est connu à la fin du handshake du moteur
+    try:
+        await session.wait_ready()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return session.skeleton_structure
 
 
+@router.get("/sessions/{session_id}/frame")
+async def get_latest_frame(session_id: str, if_none_match: Optional[str] = Header(default=None)):
+    """
+    Dernière frame présentée, au format binaire du flux WebSocket (payload complet, sans dégradation de qualité),
+    pour les clients qui interrogent la pose au lieu de s'abonner. X-Frame-Id et X-Timestamp-Ns (horloge monotone
+    du serveur) la situent ; If-None-Match avec l'ETag reçu : 304 tant qu'aucune nouvelle frame n'est présentée.
+    """
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        await session.wait_ready()
+        frame = await session.latest_frame(if_none_match)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if frame is None:
+        raise HTTPException(status_code=503, detail="Aucune frame présentée", headers={"Retry-After": "1"})
+    headers, payload = frame
+    if payload is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/octet-stream", headers=headers)
+
+
 @router.delete("/sessions/{session_id}")
 async def stop_session(session_id: str):
     if not manager.get_session(session_id):
@@ -115,8 +296,260 @@ async def set_speed(session_id: str, req: SpeedRequest):
 @router.post("/sessions/{session_id}/fps")
 async def set_fps(session_id: str, req: FpsRequest):
     try:
-        # await manager.set_session_fps(session_id, req.fps)
         await manager.dispatch_action(session_id, "set_fps", req.fps)
         return {"status": "updated", "session_id": session_id, "fps": req.fps}
     except ValueError:
         raise HTTPException(status_code=404, detail="Session introuvable")
+
+@router.post("/sessions/{session_id}/clip")
+async def swap_clip(session_id: str, req: ClipSwapRequest):
+    """
+    Change le clip d'une session en cours, avec fondu enchaîné.
+    Le moteur et la SHM sont conservés : les clients n'ont pas à se reconnecter.
+    """
+    try:
+        await manager.dispatch_action(
+            session_id,
+            "swap_clip",
+            {
+                "source_path": f"{ANIMATION_DIR}/{req.animation_file}",
+                "fade_duration": req.fade_duration,
+            },
+        )
+        return {"status": "loading", "session_id": session_id, "animation_file": req.animation_file}
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/migrate")
+async def migrate_session(session_id: str):
+    """
+    Migre la session vers un nouveau processus moteur (rééquilibrage, drain d'un coeur).
+    Le nouveau moteur, placé sur le groupe de coeurs le moins chargé (ENGINE_CPU_POLICY=pinned),
+    est préchauffé en parallèle puis reprend le ring à une frontière de frame.
+    """
+    try:
+        pid = await manager.migrate_session(session_id)
+        return {"status": "migrated", "session_id": session_id, "engine_pid": pid}
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except (RuntimeError, TimeoutError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/recording")
+async def start_recording(session_id: str, req: RecordingRequest):
+    """
+    Enregistre les frames diffusées et la timeline des commandes dans un fichier de capture,
+    rejouable ensuite sans coût d'animation via une session "REPLAY".
+    """
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        await session.wait_ready()
+        path = session.start_recording(req.name, req.max_frames)
+        return {"status": "recording", "session_id": session_id, "capture": os.path.basename(path)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/sessions/{session_id}/recording")
+async def stop_recording(session_id: str):
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        info = session.stop_recording()
+        return {"status": "stopped", "session_id": session_id, "capture": os.path.basename(info["path"]), "frames": info["frames"]}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/trace")
+async def start_tracing(session_id: str, req: TraceRequest):
+    """
+    Trace chaque frame diffusée : calcul et publication (en-tête du slot, côté moteur), réveil du broadcaster,
+    retenue éventuelle, découpe de la vue SHM et envoi, dans un ring borné aux 'capacity' dernières frames.
+    """
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        session.start_tracing(req.capacity)
+        return {"status": "tracing", "session_id": session_id, "capacity": req.capacity}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/sessions/{session_id}/trace")
+async def get_trace(session_id: str):
+    """Trace au format Chrome / Perfetto (à ouvrir dans ui.perfetto.dev ou chrome://tracing)"""
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        return session.trace()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/sessions/{session_id}/trace/summary")
+async def get_trace_summary(session_id: str):
+    """Durées médiane et p99 de chaque étape (µs)"""
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    if session.tracer is None:
+        raise HTTPException(status_code=409, detail="Aucun traçage en cours")
+    return session.tracer.summary()
+
+
+@router.delete("/sessions/{session_id}/trace")
+async def stop_tracing(session_id: str):
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        return session.stop_tracing()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/sessions/{session_id}/udp")
+async def register_udp_client(session_id: str):
+    """
+    Inscrit un client UDP (LAN, temps réel) : datagrammes numérotés, fragmentés au MTU, sans retransmission.
+    Le client envoie b"MOMH" + token au port retourné (keep-alive avant 'timeout'), b"MOMB" + token pour partir ;
+    format des fragments décrit dans core/udp_transport.py.
+    """
+    try:
+        return await manager.register_udp(session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/clock")
+async def get_clock():
+    """Horloge de tick commune (TICK_FPS) : période, tick courant et dernier tick diffusé"""
+    if manager.clock is None:
+        raise HTTPException(status_code=409, detail="Horloge de tick désactivée (TICK_FPS=0)")
+    return manager.clock.stats()
+
+
+@router.get("/sync_groups")
+async def list_sync_groups():
+    return manager.sync_groups
+
+
+@router.post("/sync_groups/{group_id}")
+async def sync_group(group_id: str, req: SyncGroupRequest):
+    """
+    Lecture synchronisée (scènes multi-personnages) : les sessions repartent de 'time' au même tick de l'horloge
+    et avancent ensuite du même pas. Rappeler pour resynchroniser le groupe.
+    """
+    try:
+        return await manager.sync_group(group_id, req.session_ids, req.time, req.playback_speed)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/sync_groups/{group_id}")
+async def delete_sync_group(group_id: str):
+    try:
+        manager.remove_sync_group(group_id)
+        return {"status": "deleted", "group_id": group_id}
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Groupe introuvable")
+
+
+@router.post("/sessions/{session_id}/profile")
+async def start_profiling(session_id: str, req: ProfileRequest):
+    """
+    Profile le processus moteur de la session pendant 'duration' secondes, sans l'interrompre.
+    Le résultat se récupère ensuite avec GET /sessions/{session_id}/profile?output=...
+    """
+    try:
+        args = {"mode": req.mode, "duration": req.duration, "interval": req.interval_ms / 1000.0}
+        return await manager.dispatch_action(session_id, "profile", args)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/sessions/{session_id}/profile")
+async def get_profile(session_id: str, output: Optional[str] = None, limit: int = 40):
+    """
+    Sans 'output' : état de la fenêtre de profilage.
+    output=collapsed (mode sample, pour flamegraph.pl / speedscope), pstats (mode cprofile, fichier binaire
+    pour pstats / snakeviz) ou text (résumé lisible).
+    """
+    try:
+        if output is None:
+            return await manager.dispatch_action(session_id, "get_profile")
+        report = await manager.dispatch_action(session_id, "get_profile", {"output": output, "limit": limit})
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if output == "pstats":
+        return Response(
+            content=report,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{session_id}.prof"'},
+        )
+    return PlainTextResponse(report)
+
+
+@router.get("/sessions/{session_id}/dictionary")
+async def get_compression_dictionary(session_id: str):
+    """
+    Dictionnaire zlib du flux compressé (/ws/{session_id}?compress=1).
+    Chaque message binaire est un flux zlib indépendant : inflate avec ce dictionnaire (zdict).
+    """
+    session = manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    try:
+        await session.wait_ready()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if session.compressor is None:
+        raise HTTPException(status_code=409, detail="Compression indisponible pour cette session")
+    return Response(content=session.compressor.dictionary, media_type="application/octet-stream")
+
+
+@router.get("/compression")
+async def get_compression_stats():
+    """Gain de bande passante et coût d'encodage du flux compressé, par fichier d'animation"""
+    assets: Dict[str, Dict[str, Any]] = {}
+    for session in set(manager.sessions.values()):
+        if session.compressor is None or session.compressor.frames == 0:
+            continue
+        stats = session.compressor.stats()
+        entry = assets.setdefault(
+            stats["asset"],
+            {"sessions": 0, "frames": 0, "raw_bytes": 0, "compressed_bytes": 0, "encode_us": 0.0, "ratio_without_dictionary": []},
+        )
+        entry["sessions"] += 1
+        entry["frames"] += stats["frames"]
+        entry["raw_bytes"] += stats["raw_bytes"]
+        entry["compressed_bytes"] += stats["compressed_bytes"]
+        entry["encode_us"] += stats["encode_us"] * stats["frames"]
+        if stats["ratio_without_dictionary"] is not None:
+            entry["ratio_without_dictionary"].append(stats["ratio_without_dictionary"])
+
+    for entry in assets.values():
+        entry["ratio"] = entry["compressed_bytes"] / entry["raw_bytes"]
+        entry["encode_us"] /= entry["frames"]
+        baselines = entry.pop("ratio_without_dictionary")
+        entry["ratio_without_dictionary"] = sum(baselines) / len(baselines) if baselines else None
+    return {"assets": assets}
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel
+
+from core.cluster import FORWARDED_HEADERS, PROXY_TIMEOUT, ClusterNode, NodeRegistry, http_json, http_request
+from core.env import GATEWAY_MODE, GATEWAY_NODE_TIMEOUT
+
+
+class NodeHeartbeat(BaseModel):
+    url: str  # ex: "http://10.0.0.12:9810"
+    capacity: Dict[str, Any] = {}  # GET /capacity du noeud
+    sessions: List[str] = []
+
+
+if GATEWAY_MODE not in ("proxy", "redirect"):
+    raise ValueError(f"Mode de passerelle inconnu: {GATEWAY_MODE} (attendu: proxy, redirect)")
+
+# Noeuds inscrits et propriétaire de chaque session
+registry = NodeRegistry(GATEWAY_NODE_TIMEOUT)
+
+router = APIRouter()
+
+
+async def _forward(node: ClusterNode, request: Request, route: str) -> Response:
+    """Relaie la requête du client vers le noeud (urllib dans l'executor), réponse rendue telle quelle"""
+    body = await request.body()
+    headers = {k: v for k, v in request.headers.items() if k.lower() in FORWARDED_HEADERS}
+    url = f"{node.url}{route}" + (f"?{request.url.query}" if request.url.query else "")
+
+    loop = asyncio.get_running_loop()
+    try:
+        status, response_headers, content = await loop.run_in_executor(
+            None, http_request, url, request.method, body or None, headers, PROXY_TIMEOUT
+        )
+    except OSError as e:
+        raise HTTPException(status_code=502, detail=f"Noeud {node.node_id} injoignable: {e}")
+
+    return Response(
+        content=content,
+        status_code=status,
+        headers={k: v for k, v in response_headers.items() if k in FORWARDED_HEADERS and k != "content-type"},
+        media_type=response_headers.get("content-type"),
+    )
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(status_code=503, detail="Aucun noeud disponible", headers={"Retry-After": "5"})
+
+
+# --- INSCRIPTION DES NOEUDS ---
+
+@router.put("/nodes/{node_id}")
+async def register_node(node_id: str, req: NodeHeartbeat):
+    """Relevé périodique d'un noeud (ClusterAgent) : URL, capacité, sessions"""
+    registry.heartbeat(node_id, req.url, req.capacity, req.sessions)
+    return {"status": "registered", "node_id": node_id}
+
+
+@router.delete("/nodes/{node_id}")
+async def unregister_node(node_id: str):
+    try:
+        registry.remove(node_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"status": "removed", "node_id": node_id}
+
+
+@router.get("/nodes")
+async def get_nodes():
+    return registry.stats()["nodes"]
+
+
+@router.get("/capacity")
+async def get_cluster_capacity():
+    """Capacité cumulée des noeuds vivants"""
+    stats = registry.stats()
+    del stats["nodes"]
+    return stats
+
+
+# --- PLACEMENT DES SESSIONS ---
+
+@router.post("/sessions")
+async def create_session(request: Request):
+    """Place la session sur le noeud le moins chargé ; un noeud plein (503 / 307) passe la main au suivant"""
+    try:
+        payload = json.loads(await request.body())
+        session_id = payload["session_id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Corps invalide (session_id requis)")
+    if session_id in registry.owners:
+        raise HTTPException(status_code=400, detail=f"La session {session_id} existe déjà.")
+
+    for node in registry.candidates(payload.get("session_type", "FK")):
+        try:
+            response = await _forward(node, request, "/sessions")
+        except HTTPException:
+            continue  # Noeud injoignable
+        if response.status_code in (307, 503):
+            continue
+        if response.status_code < 300:
+            registry.place(session_id, node)
+            response.headers["X-Moma-Node"] = node.node_id
+        return response
+    raise _unavailable()
+
+
+@router.post("/sessions/bulk", status_code=202)
+async def create_sessions(request: Request):
+    """Répartit les sessions entre les noeuds, puis une création groupée par noeud, en parallèle"""
+    payload = await request.json()
+    query = f"?{request.url.query}" if request.url.query else ""
+
+    results: Dict[str, Any] = {}
+    assignments: Dict[str, List[Dict[str, Any]]] = {}
+    for item in payload.get("sessions", []):
+        session_id = item.get("session_id")
+        nodes = registry.candidates(item.get("session_type", "FK"))
+        if session_id in registry.owners:
+            results[session_id] = {"status": "rejected", "error": f"La session {session_id} existe déjà."}
+        elif not nodes:
+            results[session_id] = {"status": "rejected", "error": "Aucun noeud disponible"}
+        else:
+            # Placement compté tout de suite (pending) : les sessions suivantes vont aux autres noeuds
+            registry.place(session_id, nodes[0])
+            assignments.setdefault(nodes[0].node_id, []).append(item)
+
+    responses = await asyncio.gather(
+        *(
+            http_json(f"{registry.nodes[node_id].url}/sessions/bulk{query}", "POST", {"sessions": items}, PROXY_TIMEOUT)
+            for node_id, items in assignments.items()
+        ),
+        return_exceptions=True,
+    )
+    for (node_id, items), response in zip(assignments.items(), responses):
+        if isinstance(response, Exception) or response[0] >= 300:
+            error = str(response) if isinstance(response, Exception) else f"Noeud {node_id}: {response[1]}"
+            for item in items:
+                registry.forget(item["session_id"])
+                results[item["session_id"]] = {"status": "rejected", "error": error}
+            continue
+        for session_id, result in response[1]["sessions"].items():
+            if result["status"] in ("rejected", "redirected"):
+                registry.forget(session_id)
+            results[session_id] = {**result, "node": node_id}
+    return {"sessions": results}
+
+
+@router.delete("/sessions/bulk")
+async def stop_sessions(request: Request):
+    """Suppression groupée, en parallèle sur chaque noeud propriétaire"""
+    session_ids = (await request.json()).get("session_ids", [])
+
+    results = {session_id: "not_found" for session_id in session_ids}
+    by_node: Dict[str, List[str]] = {}
+    for session_id in session_ids:
+        node = registry.owner(session_id)
+        if node is not None:
+            by_node.setdefault(node.node_id, []).append(session_id)
+
+    responses = await asyncio.gather(
+        *(
+            http_json(f"{registry.nodes[node_id].url}/sessions/bulk", "DELETE", {"session_ids": ids}, PROXY_TIMEOUT)
+            for node_id, ids in by_node.items()
+        ),
+        return_exceptions=True,
+    )
+    for (node_id, ids), response in zip(by_node.items(), responses):
+        if isinstance(response, Exception) or response[0] >= 300:
+            for session_id in ids:
+                results[session_id] = f"error: noeud {node_id} injoignable"
+            continue
+        for session_id, status in response[1]["sessions"].items():
+            if status in ("deleted", "not_found"):
+                registry.forget(session_id)
+            results[session_id] = status
+    return {"sessions": results}
+
+
+@router.get("/sessions/{session_id}/node")
+async def get_session_node(session_id: str):
+    """Noeud propriétaire : un client peut s'y connecter directement (WebSocket, UDP) sans passer par la passerelle"""
+    node = registry.owner(session_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    return {"node_id": node.node_id, "url": node.url, "ws_url": f"{node.ws_url}/ws/{session_id}"}
+
+
+@router.api_route("/sessions/{session_id}", methods=["GET", "DELETE"])
+@router.api_route("/sessions/{session_id}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def session_route(session_id: str, request: Request, path: str = ""):
+    """Routes de contrôle d'une session : relayées (ou redirigées) vers son noeud"""
+    node = registry.owner(session_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+
+    route = f"/sessions/{session_id}" + (f"/{path}" if path else "")
+    if GATEWAY_MODE == "redirect":
+        query = f"?{request.url.query}" if request.url.query else ""
+        return RedirectResponse(f"{node.url}{route}{query}", status_code=307)
+
+    response = await _forward(node, request, route)
+    if request.method == "DELETE" and not path and response.status_code in (200, 404):
+        registry.forget(session_id)
+    return response
+
+
+@router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def node_route(path: str, request: Request):
+    """Autres routes (animations, captures, horloge...) : servies par le noeud vivant le moins chargé"""
+    nodes = sorted(registry.alive(), key=lambda node: node.room(None), reverse=True)
+    if not nodes:
+        raise _unavailable()
+    return await _forward(nodes[0], request, f"/{path}")
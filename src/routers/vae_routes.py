@@ -32,3 +32,14 @@ async def set_vae_values(session_id: str, req: VaeValuesRequest):
         }
     except ValueError:
         raise HTTPException(status_code=404, detail="Session introuvable")
+
+
+@router.get("/sessions/{session_id}/vae_cache")
+async def get_vae_cache_stats(session_id: str):
+    """Succès / échecs du cache de poses pour ce moteur, et occupation de la table partagée"""
+    try:
+        return await manager.dispatch_action(session_id, "get_pose_cache_stats")
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session introuvable")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
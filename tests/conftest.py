@@ -0,0 +1,12 @@
+import multiprocessing
+
+import pytest
+
+
+@pytest.fixture
+def spawn_start_method():
+    # Méthode de démarrage imposée par main.py
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method("spawn", force=True)
+    yield multiprocessing.get_context()
+    multiprocessing.set_start_method(previous, force=True)
@@ -0,0 +1,114 @@
+import asyncio
+import os
+
+import pytest
+
+from core import admission
+from core.admission import (
+    DEFAULT_COSTS,
+    MODEL_ALPHA,
+    AdmissionController,
+    CapacityError,
+    CapacityModel,
+    CapacityRedirect,
+    EngineUsage,
+)
+
+_MB = 1024 * 1024
+
+
+def _controller(policy: str = "reject", **kwargs) -> AdmissionController:
+    # Budget explicite : indépendant de la machine qui lance les tests
+    return AdmissionController(policy, cpu_budget=1.0, memory_budget=1000 * _MB, shm_budget=100 * _MB, **kwargs)
+
+
+def test_headroom_subtracts_measured_and_reserved_costs():
+    controller = _controller()
+    controller.used = (0.2, 100 * _MB, 0)
+    controller.reserve("a", "FastFKAnimator")
+
+    assert controller.headroom() == pytest.approx((0.7, 700 * _MB, 99 * _MB))
+    assert controller.max_sessions()["FastFKAnimator"] == 3  # RAM : 700 / 200 Mo
+    assert controller.release("a")
+    assert not controller.release("a")
+
+
+def test_first_measure_replaces_the_default_cost_then_averages():
+    model = CapacityModel()
+    assert model.estimate("FastFKAnimator") == DEFAULT_COSTS["FastFKAnimator"]
+
+    model.observe("FastFKAnimator", (0.2, 100 * _MB, _MB))
+    assert model.estimate("FastFKAnimator") == (0.2, 100 * _MB, _MB)
+    model.observe("FastFKAnimator", (1.2, 100 * _MB, _MB))
+
+    assert model.estimate("FastFKAnimator")[0] == pytest.approx(0.2 + MODEL_ALPHA)
+    assert model.as_dict()["FastFKAnimator"]["samples"] == 2
+
+
+def test_reject_and_redirect_policies():
+    controller = _controller()
+    controller.used = (0.99, 0, 0)
+    with pytest.raises(CapacityError):
+        asyncio.run(controller.admit("a", "FastFKAnimator"))
+    assert not controller.reservations
+    assert not controller.stats()["accepting"]
+
+    redirect = _controller("redirect", redirect_url="http://other:8000/")
+    redirect.used = (0.99, 0, 0)
+    with pytest.raises(CapacityRedirect) as error:
+        asyncio.run(redirect.admit("a", "FastFKAnimator"))
+    assert error.value.url == "http://other:8000/sessions"
+
+
+def test_queued_creation_is_admitted_once_headroom_frees():
+    controller = _controller("queue", queue_timeout=2.0)
+    controller.reserve("a", "VaeAnimator")
+
+    async def scenario():
+        waiting = asyncio.create_task(controller.admit("b", "FastFKAnimator"))
+        await asyncio.sleep(0.01)
+        assert controller.queued == 1
+        controller.release("a")
+        await controller.changed()
+        await waiting
+
+    asyncio.run(scenario())
+    assert set(controller.reservations) == {"b"}
+    assert controller.queued == 0
+
+
+def test_queue_timeout_raises():
+    controller = _controller("queue", queue_timeout=0.01)
+    controller.reserve("a", "VaeAnimator")
+
+    with pytest.raises(CapacityError, match="attente"):
+        asyncio.run(controller.admit("b", "FastFKAnimator"))
+    assert controller.queued == 0
+
+
+def test_unknown_policy_or_missing_redirect_url():
+    with pytest.raises(ValueError):
+        _controller("maybe")
+    with pytest.raises(ValueError):
+        _controller("redirect")
+
+
+def test_engine_usage_measures_cores_and_cost_per_frame(monkeypatch):
+    cpu = iter([10.0, 10.5])
+    monkeypatch.setattr(admission, "cpu_seconds", lambda pid: next(cpu))
+    monkeypatch.setattr(admission, "memory_bytes", lambda pid: 300 * _MB)
+    usage = EngineUsage()
+
+    assert usage.update(os.getpid(), write_seq=100, now=0.0)
+    assert not usage.warm
+    assert usage.update(os.getpid(), write_seq=200, shm=_MB, now=admission.WARMUP_S)
+
+    assert usage.warm
+    assert usage.cores == pytest.approx(0.5 / admission.WARMUP_S)
+    assert usage.cpu_per_frame_us == pytest.approx(5000.0)
+    assert usage.cost() == (usage.cores, 300 * _MB, _MB)
+
+
+def test_cpu_seconds_of_a_missing_process():
+    assert admission.cpu_seconds(2**22 + 12345) is None
+    assert admission.cpu_seconds(os.getpid()) >= 0.0
@@ -0,0 +1,57 @@
+import pytest
+
+from core.backpressure import AdaptiveRateController
+
+
+@pytest.fixture
+def controller():
+    return AdaptiveRateController(60.0, 20.0, window=10, saturation_ratio=0.1, recovery_windows=2, step=0.5)
+
+
+def _window(controller: AdaptiveRateController, saturated_ticks: int) -> bool:
+    changed = [controller.update(tick < saturated_ticks) for tick in range(controller.window)]
+    assert not any(changed[:-1])
+    return changed[-1]
+
+
+def test_saturated_windows_step_down_to_min_fps(controller):
+    assert _window(controller, 2)
+    assert (controller.fps, controller.level) == (30.0, 1)
+    assert _window(controller, 10)
+    assert (controller.fps, controller.level) == (20.0, 2)
+    # Plancher atteint : plus de changement
+    assert not _window(controller, 10)
+    assert controller.fps == 20.0
+
+
+def test_tolerated_saturation_changes_nothing(controller):
+    assert not _window(controller, 1)
+    assert (controller.fps, controller.level) == (60.0, 0)
+
+
+def test_recovers_one_level_per_calm_period(controller):
+    _window(controller, 10)
+    _window(controller, 10)
+
+    assert not _window(controller, 0)
+    assert _window(controller, 0)
+    assert (controller.fps, controller.level) == (40.0, 1)
+    assert not _window(controller, 0)
+    assert _window(controller, 0)
+    assert (controller.fps, controller.level) == (60.0, 0)
+
+
+def test_partial_saturation_restarts_the_calm_count(controller):
+    _window(controller, 10)
+    _window(controller, 0)
+    _window(controller, 1)
+
+    assert not _window(controller, 0)
+    assert _window(controller, 0)
+
+
+def test_set_target_resets_the_level(controller):
+    _window(controller, 10)
+    controller.set_target(30.0)
+
+    assert (controller.target_fps, controller.fps, controller.level) == (30.0, 30.0, 0)
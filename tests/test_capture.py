@@ -0,0 +1,89 @@
+import pytest
+
+from core.capture import CaptureReader, CaptureWriter
+
+FRAME_SIZE = 32
+
+
+def _payload(value: int) -> bytes:
+    return bytes([value]) * FRAME_SIZE
+
+
+def _record(path: str, frames: int, capacity: int = 8) -> dict:
+    writer = CaptureWriter(path, FRAME_SIZE, capacity, {"session_id": "s", "skeleton": {"bones": 1}})
+    for index in range(frames):
+        writer.append(index + 10, 1_000_000_000 + index * 20_000_000, _payload(index))
+    writer.record_command(11, "set_speed", 2.0)
+    return writer.close()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "walk.cap")
+    assert _record(path, 3) == {"path": path, "frames": 3}
+
+    reader = CaptureReader(path)
+    try:
+        assert reader.frame_count == 3
+        assert list(reader.frame_ids) == [10, 11, 12]
+        assert list(reader.times) == pytest.approx([0.0, 0.02, 0.04])
+        assert reader.frame_time == pytest.approx(0.02)
+        assert reader.duration == pytest.approx(0.06)
+        for index in range(3):
+            with reader.frame(index) as frame:
+                assert frame.tobytes() == _payload(index)
+
+        assert reader.metadata["session_id"] == "s"
+        assert reader.metadata["frame_count"] == 3
+        assert [c["command"] for c in reader.metadata["commands"]] == ["set_speed"]
+    finally:
+        reader.close()
+
+
+def test_close_trims_the_unused_capacity(tmp_path):
+    path = tmp_path / "walk.cap"
+    _record(str(path), 2, capacity=100)
+    reader = CaptureReader(str(path))
+    try:
+        assert path.stat().st_size == reader.payload_offset + 2 * FRAME_SIZE
+    finally:
+        reader.close()
+
+
+def test_full_capture_refuses_frames(tmp_path):
+    writer = CaptureWriter(str(tmp_path / "walk.cap"), FRAME_SIZE, 2)
+    assert writer.append(1, 0, _payload(1))
+    assert writer.append(2, 1, _payload(2))
+    assert writer.full
+    assert not writer.append(3, 2, _payload(3))
+    assert writer.close()["frames"] == 2
+
+
+def test_interrupted_capture_stays_readable(tmp_path):
+    path = str(tmp_path / "walk.cap")
+    writer = CaptureWriter(path, FRAME_SIZE, 4)
+    writer.append(1, 0, _payload(1))
+    writer.append(2, 10, _payload(2))
+    # Crash : ni close() ni fichier JSON
+    writer.mm.flush()
+
+    reader = CaptureReader(path)
+    try:
+        assert reader.frame_count == 2
+        assert reader.metadata == {}
+    finally:
+        reader.close()
+        writer.index = None
+        writer.mm.close()
+        writer.file.close()
+
+
+@pytest.mark.parametrize("content", [b"NOTACAPTURE" + bytes(64), None])
+def test_invalid_or_empty_files_raise(tmp_path, content):
+    path = tmp_path / "walk.cap"
+    if content is None:
+        CaptureWriter(str(path), FRAME_SIZE, 4).close()
+    else:
+        path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
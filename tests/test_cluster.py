@@ -0,0 +1,92 @@
+import pytest
+
+from core import cluster
+from core.cluster import NodeRegistry
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cluster.time, "monotonic", clock)
+    return clock
+
+
+def _capacity(fk: int, policy: str = "reject", accepting: bool = True) -> dict:
+    return {"policy": policy, "accepting": accepting, "max_new_sessions": {"FastFKAnimator": fk}}
+
+
+def test_candidates_are_ordered_by_room(clock):
+    registry = NodeRegistry(node_timeout=6.0)
+    registry.heartbeat("a", "http://a:9810/", _capacity(2), [])
+    registry.heartbeat("b", "http://b:9810", _capacity(5), [])
+    registry.heartbeat("full", "http://c:9810", _capacity(0), [])
+    registry.heartbeat("closed", "http://d:9810", _capacity(9, accepting=False), [])
+
+    assert [node.node_id for node in registry.candidates("FK")] == ["b", "a"]
+    assert registry.nodes["a"].url == "http://a:9810"
+
+
+def test_policy_off_ranks_by_free_cpu(clock):
+    registry = NodeRegistry()
+    registry.heartbeat("busy", "http://a", {"policy": "off", "budget": {"cpu": 8}, "headroom": {"cpu": 2}}, [])
+    registry.heartbeat("idle", "http://b", {"policy": "off", "budget": {"cpu": 4}, "headroom": {"cpu": 3}}, [])
+
+    assert [node.node_id for node in registry.candidates("FK")] == ["idle", "busy"]
+
+
+def test_silent_nodes_are_not_candidates(clock):
+    registry = NodeRegistry(node_timeout=6.0)
+    registry.heartbeat("a", "http://a", _capacity(2), [])
+    clock.now += 7.0
+
+    assert registry.candidates("FK") == []
+
+
+def test_pending_placements_count_until_the_next_heartbeat(clock):
+    registry = NodeRegistry()
+    registry.heartbeat("a", "http://a", _capacity(3), [])
+    registry.heartbeat("b", "http://b", _capacity(2), [])
+
+    registry.place("s1", registry.nodes["a"])
+    registry.place("s2", registry.nodes["a"])
+    assert registry.nodes["a"].pending == 2
+    # a : 3 - 2 = 1 place, b : 2
+    assert [node.node_id for node in registry.candidates("FK")] == ["b", "a"]
+
+    registry.heartbeat("a", "http://a", _capacity(1), ["s1", "s2"])
+    assert registry.nodes["a"].pending == 0
+
+
+def test_heartbeat_reconciles_sessions_after_the_grace_period(clock):
+    registry = NodeRegistry(node_timeout=6.0)
+    registry.heartbeat("a", "http://a", _capacity(3), ["existing"])
+    assert registry.owner("existing").node_id == "a"
+
+    registry.place("new", registry.nodes["a"])
+    # Relevé parti avant la création : la session toute récente est conservée
+    registry.heartbeat("a", "http://a", _capacity(3), [])
+    assert registry.owner("new").node_id == "a"
+    assert registry.owner("existing") is None
+
+    clock.now += 7.0
+    registry.heartbeat("a", "http://a", _capacity(3), [])
+    assert registry.owner("new") is None
+    assert "new" not in registry.placed_at
+
+
+def test_remove_forgets_the_node_sessions(clock):
+    registry = NodeRegistry()
+    registry.heartbeat("a", "http://a", _capacity(3), ["s"])
+    registry.remove("a")
+
+    assert registry.owner("s") is None
+    with pytest.raises(ValueError):
+        registry.remove("a")
@@ -0,0 +1,91 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from core.compression import MAX_DICTIONARY_SIZE, FrameCompressor, train_dictionary
+
+
+class _Animator:
+    """Animateur minimal : une pose par os, fonction du temps"""
+
+    animator_frametime = 1.0 / 30.0
+    deterministic = True
+
+    def __init__(self, bones: int = 20):
+        self.bones = bones
+        self.t = 0.0
+        self.restored = None
+
+    def snapshot(self):
+        return {"time": self.t}
+
+    def restore(self, state):
+        self.restored = state
+        self.t = state["time"]
+
+    def write_frame_to_buffer(self, buffer_view, offset, dt, playback_speed=1.0):
+        self.t += dt * playback_speed
+        poses = np.ndarray((self.bones, 4, 4), dtype=np.float64, buffer=buffer_view, offset=offset)
+        poses[:] = np.eye(4)
+        poses[:, :3, 3] = np.sin(self.t + np.arange(self.bones))[:, None]
+
+
+def _frame(animator: _Animator, dt: float) -> bytes:
+    buffer = bytearray(animator.bones * 128)
+    animator.write_frame_to_buffer(memoryview(buffer), 0, dt)
+    return bytes(buffer)
+
+
+def test_dictionary_training_leaves_the_animator_untouched():
+    animator = _Animator()
+    animator.t = 1.5
+
+    dictionary = train_dictionary(animator, animator.bones * 128, samples=4)
+
+    assert len(dictionary) == 4 * animator.bones * 128
+    assert animator.restored == {"time": 1.5}
+    assert animator.t == 1.5
+
+
+def test_stateful_animators_get_no_dictionary():
+    animator = _Animator()
+    animator.deterministic = False
+    animator.t = 1.5
+
+    assert train_dictionary(animator, animator.bones * 128, samples=4) is None
+    assert animator.restored is None
+    assert animator.t == 1.5
+
+
+def test_dictionary_keeps_the_most_recent_bytes():
+    animator = _Animator(bones=200)
+
+    assert len(train_dictionary(animator, animator.bones * 128, samples=4)) == MAX_DICTIONARY_SIZE
+
+
+def test_each_frame_decodes_alone_with_the_dictionary():
+    animator = _Animator()
+    dictionary = train_dictionary(animator, animator.bones * 128)
+    compressor = FrameCompressor(dictionary, asset="walk.glb")
+    frames = [_frame(animator, 0.01) for _ in range(3)]
+
+    for frame in reversed(frames):
+        decoder = zlib.decompressobj(zdict=dictionary)
+        assert decoder.decompress(compressor.compress(memoryview(frame))) + decoder.flush() == frame
+
+
+def test_stats_compare_against_compression_without_dictionary():
+    animator = _Animator()
+    compressor = FrameCompressor(train_dictionary(animator, animator.bones * 128))
+    assert compressor.stats()["ratio"] is None
+
+    frame = _frame(animator, 0.01)
+    compressor.compress(frame)
+    stats = compressor.stats()
+
+    assert stats["frames"] == 1
+    assert stats["raw_bytes"] == animator.bones * 128
+    assert stats["ratio"] == pytest.approx(stats["compressed_bytes"] / stats["raw_bytes"])
+    # Première frame : toujours dans l'échantillon de référence
+    assert stats["ratio_without_dictionary"] == len(zlib.compress(frame, compressor.level)) / len(frame)
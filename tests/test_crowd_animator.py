@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from animators.crowd_animator import FRAME_HEADER, MAGIC_NUMBER, CrowdAnimator
+from tests.test_fast_fk_animator import _clip
+
+INSTANCES = [
+    {},
+    {"time_offset": 0.25, "speed": 0.5},
+    {"time_offset": 0.6, "speed": 2.0, "root_transform": [[0, -1, 0, 3], [1, 0, 0, -2], [0, 0, 1, 0.5], [0, 0, 0, 1]]},
+]
+
+
+@pytest.fixture
+def crowd(tmp_path):
+    crowd = CrowdAnimator(INSTANCES)
+    crowd.initialize(_clip(tmp_path, "walk.glb"))
+    return crowd
+
+
+def _render(crowd: CrowdAnimator, dt: float):
+    buffer = bytearray(crowd.get_memory_size())
+    crowd.write_frame_to_buffer(memoryview(buffer), 0, dt)
+    poses = np.frombuffer(buffer, dtype=np.float64, offset=FRAME_HEADER.size)
+    return FRAME_HEADER.unpack_from(buffer), poses.reshape(crowd.num_chars, crowd.num_bones, 4, 4)
+
+
+def test_batched_poses_match_one_fk_call_per_instance(crowd):
+    _render(crowd, 0.1)
+    _, poses = _render(crowd, 0.3)
+
+    for index, params in enumerate(INSTANCES):
+        expected = np.empty((crowd.num_bones, 4, 4), dtype=np.float64)
+        time_s = params.get("time_offset", 0.0) + 0.4 * params.get("speed", 1.0)
+        crowd.anim_data.get_pose_at_time_numba(time_s, expected, loop=True, local=True)
+        root = np.asarray(params.get("root_transform", np.eye(4)), dtype=np.float64)
+        expected[crowd.root_bones] = root @ expected[crowd.root_bones]
+        np.testing.assert_allclose(poses[index], expected, atol=1e-9)
+
+
+def test_frame_header_keeps_matrices_aligned(crowd):
+    (magic, frame_id, num_chars, num_bones), _ = _render(crowd, 0.1)
+
+    assert FRAME_HEADER.size == 16
+    assert (magic, frame_id, num_chars, num_bones) == (MAGIC_NUMBER, 1, 3, 2)
+    assert crowd.get_memory_size() == 16 + 3 * 2 * 128
+    assert _render(crowd, 0.1)[0][1] == 2
+
+
+def test_set_instance_rejects_unknown_indices(crowd):
+    with pytest.raises(ValueError):
+        crowd.set_instance(3)
+    with pytest.raises(ValueError):
+        crowd.set_instance(-1)
+
+    assert crowd.set_instance(2, time_offset=1.0, speed=0.0) == {"index": 2, "time_offset": 1.0, "speed": 0.0}
+    assert (crowd.time_offsets[2], crowd.speeds[2]) == (1.0, 0.0)
@@ -0,0 +1,96 @@
+import multiprocessing
+import queue
+from multiprocessing import context, popen_spawn_posix
+from multiprocessing.reduction import ForkingPickler
+
+import numpy as np
+import pytest
+
+from animators.fast_fk_animator import FastFKAnimator
+from core.engine import AnimationEngine
+from core.frame_ring import FrameRing
+from core.profiler import code_key
+from tests.test_fast_fk_animator import _clip
+
+
+def _dump_for_spawn(process: multiprocessing.Process) -> bytes:
+    # Même sérialisation que Process.start() avec la méthode "spawn" (main.py), sans lancer le processus
+    popen = popen_spawn_posix.Popen.__new__(popen_spawn_posix.Popen)
+    popen._fds = []
+    context.set_spawning_popen(popen)
+    try:
+        return ForkingPickler.dumps(process)
+    finally:
+        context.set_spawning_popen(None)
+
+
+def test_engine_pickles_for_spawn(spawn_start_method):
+    ctx = spawn_start_method
+    _, child_conn = ctx.Pipe()
+    engine = AnimationEngine(FastFKAnimator, "Walking.glb", ctx.Queue(), child_conn, ctx.Event())
+
+    payload = _dump_for_spawn(engine)
+
+    assert payload
+    assert engine.profiler.root == code_key(AnimationEngine.run.__code__)
+    assert not engine.profiler.active
+
+
+@pytest.fixture
+def lookahead_engine(tmp_path):
+    """Moteur en mode lookahead piloté dans le processus de test (sans run()) : ring en mémoire locale"""
+    path = _clip(tmp_path, "walk.glb")
+    parent_conn, child_conn = multiprocessing.Pipe()
+    engine = AnimationEngine(
+        FastFKAnimator, path, queue.SimpleQueue(), child_conn, multiprocessing.Event(), fps=30, lookahead=4
+    )
+    engine.animator = FastFKAnimator()
+    engine.animator.initialize(path)
+    engine.frame_size = engine.animator.get_memory_size()
+    engine.slot_count = engine.buffer_count + engine.lookahead
+    region = memoryview(bytearray(FrameRing.required_size(engine.frame_size, engine.slot_count)))
+    engine.ring = FrameRing(region, engine.frame_size, engine.slot_count)
+    engine._compute_ahead(engine.ring, region, 0)
+    yield engine, parent_conn
+    parent_conn.close()
+    child_conn.close()
+
+
+def test_lookahead_frames_match_frames_computed_per_tick(lookahead_engine):
+    engine, _ = lookahead_engine
+    reference = FastFKAnimator()
+    reference.initialize(engine.source_path)
+    dt = int(engine.engine_target_frame_time * 1e9) / 1e9
+    shape = (engine.animator.num_bones, 4, 4)
+
+    assert len(engine.speculative) == engine.lookahead
+    for slot in range(engine.lookahead):
+        expected = bytearray(engine.frame_size)
+        reference.write_frame_to_buffer(memoryview(expected), 0, dt)
+        frame = np.frombuffer(engine.ring.slot_view(slot), dtype=np.float64).reshape(shape)
+        np.testing.assert_allclose(frame, np.frombuffer(expected, dtype=np.float64).reshape(shape), atol=1e-9)
+        assert engine.ring.frame_id(slot) == slot + 1
+
+
+def test_only_playback_changes_drop_lookahead_frames(lookahead_engine):
+    engine, conn = lookahead_engine
+    ahead = engine.animator.current_time
+    assert ahead > 0.0
+
+    for command in (("get_info", None, True), ("snapshot", None, True), ("set_fps", 30, False)):
+        conn.send(command)
+    engine._process_commands(engine.animator)
+    info, _ = conn.recv()
+    snapshot, _ = conn.recv()
+
+    assert len(engine.speculative) == engine.lookahead and engine.ring.epoch == 0
+    # Temps de la frame présentée, pas celui de l'animateur calculé d'avance
+    assert info["time"] == snapshot["animator"]["time"] == 0.0
+    assert engine.animator.current_time == ahead
+
+    conn.send(("seek", 0.5, False))
+    engine._process_commands(engine.animator)
+
+    assert not engine.speculative
+    assert engine.ring.epoch == 1
+    assert engine.animator.current_time == 0.5
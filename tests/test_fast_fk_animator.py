@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from animators.fast_fk_animator import FastFKAnimator
+from tests.test_fast_glb import ROTATIONS, TIMES, _gltf, _write_glb
+
+
+def _clip(tmp_path, name: str, bone: str = "arm") -> str:
+    gltf = _gltf(TIMES.nbytes + ROTATIONS.nbytes)
+    gltf["nodes"][1]["name"] = bone
+    return _write_glb(tmp_path / name, gltf)
+
+
+@pytest.fixture
+def animator(tmp_path):
+    animator = FastFKAnimator()
+    animator.initialize(_clip(tmp_path, "walk.glb"))
+    return animator
+
+
+def _render(animator: FastFKAnimator, dt: float = 0.0):
+    buffer = bytearray(animator.get_memory_size())
+    animator.write_frame_to_buffer(memoryview(buffer), 0, dt)
+    return np.frombuffer(buffer, dtype=np.float64).reshape(animator.num_bones, 4, 4)
+
+
+def test_restore_plays_the_swapped_clip_from_the_first_frame(animator, tmp_path):
+    run = _clip(tmp_path, "run.glb")
+    animator.restore({"source_path": run, "time": 0.75})
+
+    assert animator.source_path == run
+    assert animator._loader_thread is None
+    assert animator.current_time == pytest.approx(0.75)
+
+    # Pas de retour en arrière du temps à la première frame, pas de fondu depuis l'ancien clip
+    _render(animator, 0.1)
+    assert animator.current_time == pytest.approx(0.85)
+    assert animator.get_clip_status() == {"source": run, "loading": False, "fading": False, "error": None}
+
+
+def test_restore_rejects_a_clip_with_another_skeleton(animator, tmp_path):
+    walk, anim_data = animator.source_path, animator.anim_data
+    animator.restore({"source_path": _clip(tmp_path, "other.glb", bone="leg"), "time": 0.75})
+
+    _render(animator)
+
+    assert (animator.source_path, animator.anim_data) == (walk, anim_data)
+    assert animator.current_time == pytest.approx(0.75)
+    assert "Squelette incompatible" in animator.get_clip_status()["error"]
+
+
+def test_restore_of_the_same_clip_only_seeks(animator):
+    animator.restore({"source_path": animator.source_path, "time": 0.5})
+
+    assert animator._loader_thread is None
+    assert animator.current_time == 0.5
@@ -0,0 +1,108 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from loaders.fast_glb import CHUNK_BIN, CHUNK_JSON, FLOAT_COMPONENT, GLB_MAGIC, FastGLB
+
+TIMES = np.array([0.0, 1.0], dtype=np.float32)
+# Rotation de 0 puis 90° autour de z (xyzw)
+ROTATIONS = np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 0.70710677, 0.70710677]], dtype=np.float32)
+
+
+def _gltf(binary_length: int) -> dict:
+    return {
+        "asset": {"version": "2.0"},
+        "nodes": [{"name": "root", "children": [1]}, {"name": "arm", "translation": [0.0, 1.0, 0.0]}],
+        "skins": [{"joints": [0, 1]}],
+        "buffers": [{"byteLength": binary_length}],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": TIMES.nbytes},
+            {"buffer": 0, "byteOffset": TIMES.nbytes, "byteLength": ROTATIONS.nbytes},
+        ],
+        "accessors": [
+            {"bufferView": 0, "componentType": FLOAT_COMPONENT, "count": 2, "type": "SCALAR"},
+            {"bufferView": 1, "componentType": FLOAT_COMPONENT, "count": 2, "type": "VEC4"},
+        ],
+        "animations": [
+            {
+                "channels": [{"sampler": 0, "target": {"node": 1, "path": "rotation"}}],
+                "samplers": [{"input": 0, "output": 1, "interpolation": "LINEAR"}],
+            }
+        ],
+    }
+
+
+def _write_glb(path, gltf: dict = None, binary: bytes = None) -> str:
+    binary = TIMES.tobytes() + ROTATIONS.tobytes() if binary is None else binary
+    gltf = _gltf(len(binary)) if gltf is None else gltf
+    document = json.dumps(gltf).encode()
+    document += b" " * (-len(document) % 4)
+    body = struct.pack("<II", len(document), CHUNK_JSON) + document + struct.pack("<II", len(binary), CHUNK_BIN) + binary
+    path.write_bytes(struct.pack("<III", GLB_MAGIC, 2, 12 + len(body)) + body)
+    return str(path)
+
+
+def test_loads_and_samples_a_valid_file(tmp_path):
+    glb = FastGLB(_write_glb(tmp_path / "arm.glb"))
+    try:
+        assert glb.bone_names == ["root", "arm"]
+        assert list(glb.parents) == [-1, 0]
+        assert glb.duration == pytest.approx(1.0)
+
+        pose = np.empty((2, 4, 4), dtype=np.float64)
+        glb.get_pose_at_time_numba(1.0, pose, loop=False)
+        # 90° autour de z : x local -> y
+        np.testing.assert_allclose(pose[1, :3, 0], [0.0, 1.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose(pose[1, :3, 3], [0.0, 1.0, 0.0], atol=1e-6)
+    finally:
+        glb.close()
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / "arm.glb"
+    _write_glb(path)
+    path.write_bytes(path.read_bytes()[:-12])
+
+    with pytest.raises(ValueError, match="tronqué"):
+        FastGLB(str(path))
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        # Plus de clés que la bufferView n'en contient
+        lambda gltf: gltf["accessors"][0].update(count=50),
+        # byteOffset de l'accessor hors de sa bufferView
+        lambda gltf: gltf["accessors"][1].update(byteOffset=32),
+        # bufferView au-delà du chunk BIN
+        lambda gltf: gltf["bufferViews"][1].update(byteLength=4096),
+        # Données non alignées sur un float32
+        lambda gltf: gltf["bufferViews"][1].update(byteOffset=TIMES.nbytes + 2),
+        # byteStride plus petit qu'un élément
+        lambda gltf: gltf["bufferViews"][1].update(byteStride=8),
+    ],
+)
+def test_accessor_outside_binary_chunk_raises(tmp_path, corrupt):
+    gltf = _gltf(TIMES.nbytes + ROTATIONS.nbytes)
+    corrupt(gltf)
+
+    with pytest.raises(ValueError):
+        FastGLB(_write_glb(tmp_path / "arm.glb", gltf))
+
+
+def test_sampler_values_must_cover_every_key(tmp_path):
+    gltf = _gltf(TIMES.nbytes + ROTATIONS.nbytes)
+    gltf["accessors"][1]["count"] = 1
+
+    with pytest.raises(ValueError, match="clés"):
+        FastGLB(_write_glb(tmp_path / "arm.glb", gltf))
+
+
+def test_rotation_sampler_needs_quaternions(tmp_path):
+    gltf = _gltf(TIMES.nbytes + ROTATIONS.nbytes)
+    gltf["accessors"][1]["type"] = "VEC3"
+
+    with pytest.raises(ValueError, match="clés"):
+        FastGLB(_write_glb(tmp_path / "arm.glb", gltf))
@@ -0,0 +1,112 @@
+import pytest
+
+from core.frame_ring import FrameRing
+
+FRAME_SIZE = 64
+SLOT_COUNT = 4
+
+
+@pytest.fixture
+def ring():
+    buffer = bytearray(FrameRing.required_size(FRAME_SIZE, SLOT_COUNT))
+    return FrameRing(memoryview(buffer), FRAME_SIZE, SLOT_COUNT)
+
+
+def _write(ring: FrameRing, slot_index: int, value: int, timestamp_ns: int, epoch: int = 0) -> int:
+    """Écrit une frame comme le moteur : réclamation du slot, payload, publication"""
+    ring.claim(slot_index)
+    ring.slot_view(slot_index)[:] = bytes([value]) * FRAME_SIZE
+    return ring.publish(slot_index, timestamp_ns, epoch)
+
+
+# --- Publication / consommation (moteur <-> broadcaster) ---
+
+
+def test_publish_numbers_frames_and_tracks_lag(ring):
+    assert [_write(ring, slot, value=slot, timestamp_ns=10) for slot in range(3)] == [1, 2, 3]
+    assert ring.write_seq == 3
+    assert ring.lag == 3
+    assert ring.slot_view(1).tobytes() == bytes([1]) * FRAME_SIZE
+
+    ring.consume(2)
+    assert ring.read_seq == 2
+    assert ring.lag == 1
+
+
+def test_frames_computed_before_an_epoch_change_are_stale(ring):
+    _write(ring, 0, value=1, timestamp_ns=10, epoch=0)
+    ring.set_epoch(1)
+    _write(ring, 1, value=2, timestamp_ns=20, epoch=1)
+
+    assert ring.stale(0)
+    assert not ring.stale(1)
+
+
+def test_beat_publishes_the_playback_snapshot(ring):
+    assert ring.heartbeat == 0
+    ring.beat(1.5, 2.0, 30.0)
+    ring.beat(1.75, 2.0, 24.0)
+
+    assert ring.heartbeat == 2
+    assert ring.playback_snapshot() == {"time": 1.75, "speed": 2.0, "fps": 24.0}
+
+    ring.set_quality(1, 12.0)
+    assert ring.quality_level == 1
+    assert ring.playback_snapshot()["fps"] == 12.0
+
+
+# --- Lecture de la dernière frame (GET /sessions/{id}/frame) ---
+
+
+def test_latest_is_the_newest_presented_frame(ring):
+    assert ring.latest(now_ns=100) is None
+    for frame in range(3):
+        _write(ring, frame, value=frame, timestamp_ns=10 * (frame + 1))
+
+    assert ring.latest(now_ns=100) == (2, 3)
+    assert ring.copy_slot(2, 3) == bytes([2]) * FRAME_SIZE
+
+
+def test_latest_skips_lookahead_frames_until_presented(ring):
+    _write(ring, 0, value=1, timestamp_ns=10)
+    _write(ring, 1, value=2, timestamp_ns=1_000)
+
+    assert ring.latest(now_ns=500) == (0, 1)
+    assert ring.latest(now_ns=1_000) == (1, 2)
+
+
+def test_latest_skips_invalidated_frames_not_yet_broadcast(ring):
+    _write(ring, 0, value=1, timestamp_ns=10)
+    _write(ring, 1, value=2, timestamp_ns=20)
+    ring.consume(1)
+    ring.set_epoch(1)  # Seek : la frame 2, pas encore diffusée, est périmée
+
+    assert ring.latest(now_ns=100) == (0, 1)
+
+
+def test_claimed_slot_is_not_readable(ring):
+    _write(ring, 0, value=1, timestamp_ns=10)
+    ring.claim(0)
+
+    assert ring.latest(now_ns=100) is None
+    assert ring.copy_slot(0, 1) is None
+
+
+def test_copy_detects_a_slot_rewritten_during_the_copy(ring):
+    for frame in range(SLOT_COUNT):
+        _write(ring, frame, value=frame, timestamp_ns=10)
+    slot_index, frame_id = ring.latest(now_ns=100)
+
+    # Le moteur a fait le tour du ring entre latest() et la fin de la copie
+    _write(ring, slot_index, value=99, timestamp_ns=20)
+
+    assert ring.copy_slot(slot_index, frame_id) is None
+
+
+def test_batch_claim_covers_contiguous_slots(ring):
+    for frame in range(SLOT_COUNT):
+        _write(ring, frame, value=frame, timestamp_ns=10)
+    ring.claim(0, SLOT_COUNT)
+
+    assert all(ring.frame_id(slot) == 0 for slot in range(SLOT_COUNT))
+    assert ring.latest(now_ns=100) is None
@@ -0,0 +1,138 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+
+from core.cluster import http_request
+from gateway import app as gateway_app
+from routers.gateway_routes import registry
+
+
+class _Server:
+    """Application ASGI servie par uvicorn dans un thread, sur un port libre de 127.0.0.1"""
+
+    def __init__(self, app: FastAPI):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(app, lifespan="off", log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.sock]}, daemon=True)
+
+    def __enter__(self) -> "_Server":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(5)
+        self.sock.close()
+
+
+def _node(name: str, create_status: int = 201) -> FastAPI:
+    """Noeud MoMa simulé : création (acceptée, pleine ou redirigée), création groupée, une route de contrôle"""
+    node = FastAPI()
+    node.state.received = []
+
+    @node.post("/sessions")
+    async def create(request: Request):
+        session_id = (await request.json())["session_id"]
+        node.state.received.append(("create", session_id))
+        if create_status == 503:
+            return JSONResponse({"detail": "Capacité atteinte"}, 503, headers={"Retry-After": "5"})
+        if create_status == 307:
+            return RedirectResponse("http://elsewhere:9810/sessions", 307)
+        return JSONResponse({"session_id": session_id, "node": name}, 201)
+
+    @node.post("/sessions/bulk")
+    async def create_many(request: Request):
+        sessions = (await request.json())["sessions"]
+        node.state.received.append(("bulk", [item["session_id"] for item in sessions]))
+        return {"sessions": {item["session_id"]: {"status": "starting", "shared": False} for item in sessions}}
+
+    @node.post("/sessions/{session_id}/speed")
+    async def set_speed(session_id: str, request: Request):
+        node.state.received.append(("speed", session_id, await request.json()))
+        return JSONResponse({"status": "updated", "node": name}, headers={"ETag": '"7-1"'})
+
+    return node
+
+
+@pytest.fixture
+def gateway():
+    registry.nodes.clear()
+    registry.owners.clear()
+    registry.placed_at.clear()
+    with _Server(gateway_app) as server:
+        yield server
+    registry.nodes.clear()
+    registry.owners.clear()
+    registry.placed_at.clear()
+
+
+def _call(server: _Server, method: str, route: str, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    status, headers, content = http_request(f"{server.url}{route}", method, body, headers)
+    return status, headers, json.loads(content) if content else None
+
+
+def _register(gateway: _Server, node_id: str, node: _Server, room: int):
+    capacity = {"policy": "reject", "accepting": room > 0, "max_new_sessions": {"FastFKAnimator": room}}
+    status, _, _ = _call(gateway, "PUT", f"/nodes/{node_id}", {"url": node.url, "capacity": capacity, "sessions": []})
+    assert status == 200
+
+
+def test_create_falls_back_past_full_and_redirecting_nodes(gateway):
+    full, redirecting, accepting = _node("full", 503), _node("redirecting", 307), _node("accepting")
+    with _Server(full) as full_server, _Server(redirecting) as redirect_server, _Server(accepting) as accept_server:
+        # Ordre de placement : full (5 places annoncées), redirecting (4), accepting (1)
+        _register(gateway, "full", full_server, 5)
+        _register(gateway, "redirecting", redirect_server, 4)
+        _register(gateway, "accepting", accept_server, 1)
+
+        status, headers, body = _call(gateway, "POST", "/sessions", {"session_id": "s1", "session_type": "FK"})
+
+        assert (status, body["node"]) == (201, "accepting")
+        assert headers["x-moma-node"] == "accepting"
+        assert full.state.received == redirecting.state.received == [("create", "s1")]
+        assert _call(gateway, "GET", "/sessions/s1/node")[2]["url"] == accept_server.url
+
+        # Route de contrôle relayée au noeud propriétaire, en-têtes compris
+        status, headers, body = _call(gateway, "POST", "/sessions/s1/speed", {"playback_speed": 2.0})
+        assert (status, body["node"], headers["etag"]) == (200, "accepting", '"7-1"')
+        assert accepting.state.received[-1] == ("speed", "s1", {"playback_speed": 2.0})
+
+        # Plus aucun noeud n'accepte : 503 + Retry-After
+        _register(gateway, "accepting", accept_server, 0)
+        status, headers, _ = _call(gateway, "POST", "/sessions", {"session_id": "s2"})
+        assert (status, headers["retry-after"]) == (503, "5")
+
+
+def test_bulk_placement_spreads_sessions_by_room(gateway):
+    first, second = _node("first"), _node("second")
+    with _Server(first) as first_server, _Server(second) as second_server:
+        _register(gateway, "first", first_server, 2)
+        _register(gateway, "second", second_server, 1)
+
+        sessions = [{"session_id": f"s{i}", "session_type": "FK"} for i in range(4)]
+        status, _, body = _call(gateway, "POST", "/sessions/bulk", {"sessions": sessions})
+
+    assert status == 202
+    results = body["sessions"]
+    assert [results[f"s{i}"].get("node") for i in range(3)] == ["first", "first", "second"]
+    assert results["s3"]["status"] == "rejected"
+    assert first.state.received == [("bulk", ["s0", "s1"])]
+    assert second.state.received == [("bulk", ["s2"])]
+    assert (registry.owner("s0").node_id, registry.owner("s2").node_id) == ("first", "second")
+    assert registry.owner("s3") is None
+
+
+def test_unknown_session_routes_are_404(gateway):
+    assert _call(gateway, "POST", "/sessions/missing/speed", {"playback_speed": 1.0})[0] == 404
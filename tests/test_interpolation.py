@@ -0,0 +1,69 @@
+import struct
+
+import numpy as np
+import pytest
+
+from core.interpolation import PoseInterpolator, interpolation_rate
+from core.pose_math import compose
+
+HEADER = struct.Struct("<I")
+
+
+def _frame(angle: float, x: float, header: int = 0) -> bytes:
+    """Payload d'une pose à un os : en-tête + rotation autour de z + translation sur x"""
+    pose = np.empty((1, 4, 4))
+    quat = [0.0, 0.0, np.sin(angle / 2), np.cos(angle / 2)]
+    compose(np.array([[x, 0.0, 0.0]]), np.array([quat]), np.ones((1, 3)), pose)
+    return HEADER.pack(header) + pose.tobytes()
+
+
+@pytest.fixture
+def interpolator():
+    return PoseInterpolator(HEADER.size + 128, HEADER.size)
+
+
+def _pose(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype=np.float64, offset=HEADER.size).reshape(1, 4, 4)
+
+
+def test_samples_between_the_last_two_poses_one_interval_late(interpolator):
+    interpolator.push(memoryview(_frame(0.0, 0.0, header=1)), 1_000, 1)
+    assert not interpolator.ready
+    interpolator.push(memoryview(_frame(np.pi / 2, 2.0, header=2)), 2_000, 2)
+    assert interpolator.ready
+
+    payload, alpha = interpolator.sample(2_500)
+
+    assert alpha == pytest.approx(0.5)
+    assert HEADER.unpack_from(payload)[0] == 2
+    np.testing.assert_allclose(_pose(payload), _pose(_frame(np.pi / 4, 1.0)), atol=1e-12)
+
+
+def test_holds_the_latest_pose_without_extrapolating(interpolator):
+    interpolator.push(memoryview(_frame(0.0, 0.0)), 1_000, 1)
+    latest = _frame(np.pi / 2, 2.0, header=7)
+    interpolator.push(memoryview(latest), 2_000, 2)
+
+    assert interpolator.sample(9_000) == (latest, 1.0)
+    assert interpolator.sample(1_500)[1] == 0.0
+
+
+def test_reset_forgets_the_history(interpolator):
+    interpolator.push(memoryview(_frame(0.0, 0.0)), 1_000, 1)
+    interpolator.push(memoryview(_frame(0.1, 0.0)), 2_000, 2)
+    interpolator.reset()
+
+    assert not interpolator.ready
+
+
+@pytest.mark.parametrize(
+    "requested, stream_fps, simulation_fps, expected",
+    [
+        (90.0, 60.0, None, 90.0),
+        (None, 60.0, 30.0, 60.0),
+        (None, 60.0, 60.0, None),
+        (None, 60.0, None, None),
+    ],
+)
+def test_interpolation_rate(requested, stream_fps, simulation_fps, expected):
+    assert interpolation_rate(requested, stream_fps, simulation_fps) == expected
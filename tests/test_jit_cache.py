@@ -0,0 +1,88 @@
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+from core import jit_cache
+from core.jit_cache import configure_cache, enable_caching
+
+
+class _Distribution:
+    """Distribution installée simulée : version + direct_url.json (PEP 610)"""
+
+    def __init__(self, direct_url: dict, version: str = "0.1.0"):
+        self.version = version
+        self.direct_url = direct_url
+        self.files = []
+
+    def read_text(self, name: str):
+        return json.dumps(self.direct_url) if name == "direct_url.json" else None
+
+
+@pytest.fixture
+def solver(monkeypatch):
+    installed = {}
+    real = jit_cache.metadata.distribution
+    monkeypatch.setattr(jit_cache.metadata, "distribution", lambda name: installed.get(name) or real(name))
+    monkeypatch.delenv("NUMBA_CACHE_DIR", raising=False)
+    return installed
+
+
+def _git_install(commit: str) -> _Distribution:
+    return _Distribution({"url": "https://example.org/solver.git", "vcs_info": {"vcs": "git", "commit_id": commit}})
+
+
+def test_each_solver_commit_gets_its_own_cache(solver, tmp_path):
+    solver[jit_cache.SOLVER_DISTRIBUTION] = _git_install("a" * 40)
+    first = configure_cache(str(tmp_path))
+    os.environ.pop("NUMBA_CACHE_DIR")
+    solver[jit_cache.SOLVER_DISTRIBUTION] = _git_install("b" * 40)
+    second = configure_cache(str(tmp_path))
+
+    assert first != second
+    assert "aaaaaaaaaaaa" in first and "bbbbbbbbbbbb" in second
+
+
+def test_editable_install_is_keyed_on_its_sources(solver, tmp_path):
+    source = tmp_path / "solver"
+    source.mkdir()
+    (source / "core.py").write_text("X = 1\n")
+    solver[jit_cache.SOLVER_DISTRIBUTION] = _Distribution({"url": source.as_uri(), "dir_info": {"editable": True}})
+    before = jit_cache._source_fingerprint(jit_cache.SOLVER_DISTRIBUTION)
+    (source / "core.py").write_text("X = 2\n")
+
+    assert jit_cache._source_fingerprint(jit_cache.SOLVER_DISTRIBUTION) != before
+
+
+def test_existing_numba_cache_dir_is_versioned_once(solver, tmp_path, monkeypatch):
+    solver[jit_cache.SOLVER_DISTRIBUTION] = _git_install("c" * 40)
+    monkeypatch.setenv("NUMBA_CACHE_DIR", str(tmp_path / "custom"))
+
+    cache_dir = configure_cache(str(tmp_path / "ignored"))
+    assert os.path.dirname(cache_dir) == str(tmp_path / "custom")
+    # Un moteur 'spawn' réimporte main avec la variable héritée
+    assert configure_cache(str(tmp_path / "ignored")) == cache_dir
+    assert os.environ["NUMBA_CACHE_DIR"] == cache_dir
+
+
+def test_enable_caching_rebuilds_uncached_kernels(tmp_path, monkeypatch):
+    (tmp_path / "kernels.py").write_text(
+        "import numba\n"
+        "@numba.njit\n"
+        "def inc(x):\n    return x + 1\n"
+        "@numba.njit(cache=True)\n"
+        "def double(x):\n    return inc(x) * 2\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    kernels = importlib.import_module("kernels")
+    try:
+        cached = kernels.double
+
+        assert enable_caching(kernels) == 1
+        assert kernels.inc.stats.cache_path is not None
+        assert kernels.double is cached
+        assert kernels.double(1) == 4
+    finally:
+        sys.modules.pop("kernels", None)
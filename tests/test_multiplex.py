@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.multiplex import ENTRY_HEADER, MESSAGE_HEADER, MUX_MAGIC, MultiplexClient, pack_frames
+
+
+def _unpack(message: bytes) -> dict:
+    """Décodage tel que fait par un client : {session_id: (frame_id, offset du payload, payload)}"""
+    magic, count = MESSAGE_HEADER.unpack_from(message)
+    assert magic == MUX_MAGIC
+    frames, position = {}, MESSAGE_HEADER.size
+    for _ in range(count):
+        frame_id, size, sid_size, padding = ENTRY_HEADER.unpack_from(message, position)
+        position += ENTRY_HEADER.size
+        session_id = message[position : position + sid_size].decode("utf-8")
+        position += sid_size
+        assert message[position : position + padding] == bytes(padding)
+        position += padding
+        frames[session_id] = (frame_id, position, message[position : position + size])
+        position += size
+    assert position == len(message)
+    return frames
+
+
+def test_round_trip_with_aligned_payloads():
+    frames = {
+        "a": (1, np.arange(16, dtype=np.float64).tobytes()),
+        "session-éé": (42, np.ones(3, dtype=np.float64).tobytes()),
+        "odd": (7, b"\x01\x02\x03"),
+        "after-odd": (8, np.zeros(2, dtype=np.float64).tobytes()),
+    }
+
+    unpacked = _unpack(pack_frames(frames))
+
+    assert {sid: (fid, payload) for sid, (fid, _, payload) in unpacked.items()} == frames
+    # Float64Array côté client : chaque payload commence sur 8 octets
+    assert all(offset % 8 == 0 for _, offset, _ in unpacked.values())
+
+
+def test_frame_ids_wrap_to_32_bits():
+    unpacked = _unpack(pack_frames({"a": (2**32 + 5, b"")}))
+
+    assert unpacked["a"][0] == 5
+
+
+def test_empty_message():
+    assert pack_frames({}) == MESSAGE_HEADER.pack(MUX_MAGIC, 0)
+
+
+@pytest.mark.parametrize("fps", [0.0, -30.0, math.nan, math.inf])
+def test_client_rejects_a_non_positive_rate(fps):
+    with pytest.raises(ValueError):
+        MultiplexClient(None, fps)
+
+
+def test_client_ticks_at_the_requested_rate():
+    assert MultiplexClient(None, 20.0).interval == pytest.approx(0.05)
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+
+import pytest
+
+from animators.fast_fk_animator import FastFKAnimator
+from core.engine import AnimationEngine
+from core.placement import BLAS_THREAD_VARIABLES, CpuPlacement, PlacementPolicy
+
+THREAD_VARIABLES = BLAS_THREAD_VARIABLES + ("NUMBA_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+
+
+def _thread_environment(results):
+    # Exécuté dans le processus 'spawn', avant tout import de numba / TF
+    results.put({name: os.environ.get(name) for name in THREAD_VARIABLES})
+
+
+def test_pinned_engines_get_disjoint_core_groups():
+    policy = PlacementPolicy("pinned", 2, [0, 1, 2, 3, 4])
+
+    first, second = policy.acquire(), policy.acquire()
+
+    assert policy.groups == [[0, 1], [2, 3]]  # Le coeur 4 seul ne forme pas un groupe complet
+    assert (first.cpus, second.cpus) == ([0, 1], [2, 3])
+    assert first.as_dict() == {"cpus": [0, 1], "numba_threads": 2, "tf_intra_op": 2, "tf_inter_op": 1, "blas_threads": 2}
+
+
+def test_engines_share_the_least_loaded_group_once_cores_run_out():
+    policy = PlacementPolicy("pinned", 2, [0, 1, 2, 3])
+    placements = [policy.acquire() for _ in range(5)]
+
+    assert [p.cpus for p in placements] == [[0, 1], [2, 3], [0, 1], [2, 3], [0, 1]]
+    assert [group["engines"] for group in policy.status()["groups"]] == [3, 2]
+
+
+def test_fewer_cores_than_requested_form_a_single_group():
+    policy = PlacementPolicy("pinned", 4, [0, 1])
+
+    assert policy.acquire().cpus == [0, 1]
+    assert policy.acquire().cpus == [0, 1]
+
+
+def test_release_gives_the_group_back():
+    policy = PlacementPolicy("pinned", 1, [0, 1])
+    first, second = policy.acquire(), policy.acquire()
+
+    policy.release(first)
+    policy.release(first)  # Double libération sans effet sur le compte
+
+    assert policy.load == [0, 1]
+    assert policy.acquire().cpus == first.cpus
+    policy.release(None)
+
+
+def test_threads_and_none_modes():
+    assert PlacementPolicy("none").acquire() is None
+
+    placement = PlacementPolicy("threads", 3).acquire()
+    assert placement.cpus is None and placement.slot is None
+    assert placement.environment()["OMP_NUM_THREADS"] == "3"
+
+    with pytest.raises(ValueError):
+        PlacementPolicy("all")
+
+
+def test_spawned_process_sees_thread_caps_before_its_imports(spawn_start_method, monkeypatch):
+    for name in THREAD_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    ctx = spawn_start_method
+    placement = CpuPlacement(None, numba_threads=2, tf_intra_op=2, tf_inter_op=1, blas_threads=2)
+    results = ctx.Queue()
+
+    with placement.spawn_environment():
+        process = ctx.Process(target=_thread_environment, args=(results,))
+        process.start()
+    environment = results.get(timeout=30)
+    process.join(10)
+
+    assert environment == dict.fromkeys(BLAS_THREAD_VARIABLES, "2") | {
+        "NUMBA_NUM_THREADS": "2",
+        "TF_NUM_INTRAOP_THREADS": "2",
+        "TF_NUM_INTEROP_THREADS": "1",
+    }
+    # Le processus principal retrouve son environnement
+    assert not any(name in os.environ for name in THREAD_VARIABLES)
+
+
+def test_engine_start_runs_inside_the_spawn_environment(monkeypatch):
+    monkeypatch.delenv("NUMBA_NUM_THREADS", raising=False)
+    seen = []
+    monkeypatch.setattr(multiprocessing.Process, "start", lambda self: seen.append(os.environ.get("NUMBA_NUM_THREADS")))
+    placement = PlacementPolicy("threads", 2).acquire()
+    engine = AnimationEngine(
+        FastFKAnimator, "Walking.glb", None, None, multiprocessing.Event(), placement=placement
+    )
+
+    engine.start()
+
+    assert seen == ["2"]
+    assert "NUMBA_NUM_THREADS" not in os.environ
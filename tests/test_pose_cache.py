@@ -0,0 +1,110 @@
+import itertools
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from core import pose_cache
+from core.pose_cache import ENTRY_SEQ, WAYS, PoseCache, quantize_key
+
+POSE_SIZE = 4 * 16 * 8
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Horloge strictement croissante : l'ordre LRU ne dépend pas de la résolution de monotonic_ns"""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(pose_cache.time, "monotonic_ns", lambda: next(ticks))
+
+
+def _table(capacity: int, lock=None) -> PoseCache:
+    buffer = memoryview(bytearray(PoseCache.required_size(POSE_SIZE, capacity)))
+    PoseCache.format(buffer, POSE_SIZE, capacity)
+    return PoseCache(buffer, lock)
+
+
+def _pose(value: float) -> np.ndarray:
+    return np.full((4, 4, 4), value, dtype=np.float64)
+
+
+def _same_set(cache: PoseCache, count: int):
+    """'count' clés distinctes tombant dans le même ensemble"""
+    keys = ((i, 0) for i in itertools.count())
+    first = next(keys)
+    target = cache._ways(first)[0]
+    return [first] + list(itertools.islice((k for k in keys if cache._ways(k)[0] == target), count - 1))
+
+
+def test_lookup_finds_each_key_in_its_set():
+    cache = _table(4 * WAYS)
+    keys = [(i, -i, 3) for i in range(2 * WAYS)]
+    for i, key in enumerate(keys):
+        assert cache.put(key, _pose(i))
+
+    out = np.empty((4, 4, 4))
+    for i, key in enumerate(keys):
+        assert cache.get(key, out)
+        assert (out == i).all()
+    assert not cache.get((99, 99, 99), out)
+    assert cache.stats()["entries"] == 2 * WAYS
+
+
+def test_full_set_evicts_its_least_recently_used_entry():
+    cache = _table(2 * WAYS)
+    keys = _same_set(cache, WAYS + 1)
+    for i, key in enumerate(keys[:WAYS]):
+        cache.put(key, _pose(i))
+    out = np.empty((4, 4, 4))
+    assert cache.get(keys[0], out)  # La première entrée redevient la plus récente
+
+    cache.put(keys[WAYS], _pose(WAYS))
+
+    assert cache.get(keys[0], out) and cache.get(keys[WAYS], out)
+    assert not cache.get(keys[1], out)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_reinserting_a_key_replaces_its_pose_in_place():
+    cache = _table(WAYS)
+    cache.put((1, 2), _pose(1.0))
+    cache.put((1, 2), _pose(2.0))
+
+    out = np.empty((4, 4, 4))
+    assert cache.get((1, 2), out) and (out == 2.0).all()
+    assert cache.stats()["inserts"] == 1
+
+
+def test_entry_being_written_is_not_read():
+    cache = _table(WAYS)
+    cache.put((1, 2), _pose(1.0))
+    index = cache._find(*cache._ways((1, 2)))
+
+    cache.entries[index, ENTRY_SEQ] += 1  # Écriture en cours
+    assert not cache.get((1, 2), np.empty((4, 4, 4)))
+    cache.entries[index, ENTRY_SEQ] += 1
+    assert cache.get((1, 2), np.empty((4, 4, 4)))
+
+
+def test_concurrent_insert_is_dropped_instead_of_waiting():
+    lock = multiprocessing.Lock()
+    cache = _table(WAYS, lock)
+
+    with lock:
+        assert not cache.put((1, 2), _pose(1.0))
+    assert cache.put((1, 2), _pose(1.0))
+
+
+def test_only_one_engine_claims_the_prefill():
+    lock = multiprocessing.Lock()
+    first = _table(WAYS, lock)
+    second = PoseCache(first.buffer, lock)  # Autre moteur rattaché à la même table
+
+    assert first.claim_prefill()
+    assert not second.claim_prefill()
+    assert not first.claim_prefill()
+    assert second.stats()["prefilled"]
+
+
+def test_keys_wider_than_the_entry_are_not_cached():
+    assert quantize_key([0.1, 0.2, 0.3], 0.5, 0.1, 8) == (1, 2, 3, 4)
+    assert quantize_key([0.0] * 5, 0.0, 0.1, 8) is None
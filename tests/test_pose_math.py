@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from core.pose_math import blend_poses, compose, decompose, slerp
+
+SQRT_HALF = np.sqrt(0.5)
+
+
+def _pose(quats, translations, scales) -> np.ndarray:
+    quats = np.asarray(quats, dtype=np.float64)
+    out = np.empty(quats.shape[:-1] + (4, 4))
+    return compose(np.asarray(translations, dtype=np.float64), quats, np.asarray(scales, dtype=np.float64), out)
+
+
+def test_decompose_inverts_compose():
+    rng = np.random.default_rng(0)
+    quats = rng.normal(size=(5, 4))
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+    translations = rng.normal(size=(5, 3))
+    scales = rng.uniform(0.5, 2.0, size=(5, 3))
+
+    t, q, s = decompose(_pose(quats, translations, scales))
+
+    np.testing.assert_allclose(t, translations, atol=1e-12)
+    np.testing.assert_allclose(s, scales, atol=1e-12)
+    # q et -q : même rotation
+    np.testing.assert_allclose(np.abs(np.sum(q * quats, axis=-1)), 1.0, atol=1e-9)
+
+
+def test_slerp_follows_the_shortest_arc():
+    identity = np.array([0.0, 0.0, 0.0, 1.0])
+    quarter_z = np.array([0.0, 0.0, SQRT_HALF, SQRT_HALF])
+    eighth_z = [0.0, 0.0, np.sin(np.pi / 8), np.cos(np.pi / 8)]
+
+    np.testing.assert_allclose(slerp(identity, quarter_z, 0.5), eighth_z, atol=1e-12)
+    np.testing.assert_allclose(slerp(identity, -quarter_z, 0.5), eighth_z, atol=1e-12)
+    np.testing.assert_allclose(slerp(quarter_z, quarter_z, 0.3), quarter_z, atol=1e-12)
+
+
+def test_slerp_accepts_one_alpha_per_bone():
+    q0 = np.tile([0.0, 0.0, 0.0, 1.0], (2, 1))
+    q1 = np.tile([0.0, 0.0, SQRT_HALF, SQRT_HALF], (2, 1))
+
+    np.testing.assert_allclose(slerp(q0, q1, np.array([0.0, 1.0])), [q0[0], q1[1]], atol=1e-12)
+
+
+def test_blend_poses_in_place():
+    pose_a = _pose([[0.0, 0.0, 0.0, 1.0]], [[0.0, 0.0, 0.0]], [[1.0, 1.0, 1.0]])
+    pose_b = _pose([[0.0, 0.0, SQRT_HALF, SQRT_HALF]], [[2.0, 0.0, 0.0]], [[3.0, 3.0, 3.0]])
+    expected = _pose([[0.0, 0.0, np.sin(np.pi / 8), np.cos(np.pi / 8)]], [[1.0, 0.0, 0.0]], [[2.0, 2.0, 2.0]])
+
+    result = blend_poses(pose_a, pose_b, 0.5, pose_b)
+
+    assert result is pose_b
+    np.testing.assert_allclose(result, expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("alpha", [0.0, 1.0])
+def test_blend_poses_endpoints(alpha):
+    pose_a = _pose([[0.0, 0.0, 0.0, 1.0]], [[1.0, 2.0, 3.0]], [[1.0, 1.0, 1.0]])
+    pose_b = _pose([[SQRT_HALF, 0.0, 0.0, SQRT_HALF]], [[-1.0, 0.0, 4.0]], [[2.0, 1.0, 0.5]])
+
+    result = blend_poses(pose_a, pose_b, alpha, np.empty_like(pose_a))
+
+    np.testing.assert_allclose(result, pose_b if alpha else pose_a, atol=1e-12)
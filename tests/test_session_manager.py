@@ -0,0 +1,356 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from animators.fast_fk_animator import FastFKAnimator
+from core.frame_ring import FrameRing
+from core.placement import PlacementPolicy
+from core.interpolation import PoseInterpolator
+from core import session_manager
+from core.capture import CaptureReader
+from core.session_manager import AnimationSession, SessionManager
+from tests.test_fast_glb import _write_glb
+
+
+@pytest.fixture
+def manager():
+    manager = SessionManager()
+    yield manager
+    manager.sessions.clear()
+    manager.shared_engines.clear()
+    manager.admission.reservations.clear()
+    manager.arena.close()
+    if manager.pose_caches is not None:
+        manager.pose_caches.close()
+    if manager.clock is not None:
+        manager.clock.close()
+    SessionManager._instance = None
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Démarrage des moteurs simulé (sans processus) : liste des sessions démarrées"""
+    started = []
+
+    async def start(self):
+        started.append(self)
+        await asyncio.sleep(0.05)
+        if self.source_path == "broken.glb":
+            raise RuntimeError("asset illisible")
+        self.started, self.status = True, "running"
+        self.ready.set()
+
+    async def snapshot(self):
+        return {}
+
+    async def restore(self, state):
+        return None
+
+    monkeypatch.setattr(AnimationSession, "start", start)
+    monkeypatch.setattr(AnimationSession, "snapshot", snapshot)
+    monkeypatch.setattr(AnimationSession, "restore", restore)
+    return started
+
+
+def _shared_pair(manager: SessionManager, path: str = "Walking.glb") -> AnimationSession:
+    shared = manager.create_session("a", FastFKAnimator, path, shared=True)
+    assert manager.create_session("b", FastFKAnimator, path, shared=True) is shared
+    shared.started, shared.status = True, "running"
+    shared.ready.set()
+    return shared
+
+
+def test_concurrent_commands_promote_a_view_once(manager, engines):
+    shared = _shared_pair(manager)
+
+    async def scenario():
+        return await asyncio.gather(manager._promote("b"), manager._promote("b"), manager._promote("b"))
+
+    promoted = asyncio.run(scenario())
+
+    assert len(engines) == 1
+    assert promoted[0] is promoted[1] is promoted[2] is manager.sessions["b"]
+    assert manager.sessions["b"] is not shared
+    assert shared.session_ids == {"a"}
+    assert set(manager.admission.reservations) == {"b"}
+    assert not manager.promotions
+
+
+def test_promoting_an_already_promoted_view_is_a_no_op(manager, engines):
+    _shared_pair(manager)
+
+    async def scenario():
+        first = await manager._promote("b")
+        return first, await manager._promote("b")
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert len(engines) == 1
+
+
+def test_failed_promotion_releases_placement_and_reservation(manager, engines):
+    manager.placement = PlacementPolicy("pinned", 1, [0, 1])
+    shared = _shared_pair(manager, "broken.glb")
+    assert manager.placement.load == [1, 0]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager._promote("b"))
+
+    assert manager.sessions["b"] is shared
+    assert shared.session_ids == {"a", "b"}
+    assert "b" not in manager.admission.reservations
+    assert manager.placement.load == [1, 0]
+    assert not manager.promotions
+
+
+# --- Dernière frame (GET /sessions/{id}/frame) ---
+
+
+@pytest.fixture
+def polled_session():
+    session = AnimationSession("s", FastFKAnimator, "Walking.glb")
+    session.ring = FrameRing(memoryview(bytearray(FrameRing.required_size(16, 3))), 16, 3)
+    return session
+
+
+def _publish(ring: FrameRing, value: int) -> int:
+    slot_index = ring.write_seq % ring.slot_count
+    ring.claim(slot_index)
+    ring.slot_view(slot_index)[:] = bytes([value]) * 16
+    return ring.publish(slot_index, 0)
+
+
+def test_latest_frame_and_conditional_request(polled_session):
+    ring = polled_session.ring
+    assert asyncio.run(polled_session.latest_frame()) is None
+
+    _publish(ring, 7)
+    headers, payload = asyncio.run(polled_session.latest_frame())
+    assert payload == bytes([7]) * 16
+    assert headers["X-Frame-Id"] == "1"
+
+    assert asyncio.run(polled_session.latest_frame(headers["ETag"])) == (headers, None)
+    _publish(ring, 8)
+    headers, payload = asyncio.run(polled_session.latest_frame(headers["ETag"]))
+    assert (headers["X-Frame-Id"], payload) == ("2", bytes([8]) * 16)
+
+
+def test_latest_frame_survives_a_lookahead_batch_claiming_every_slot(polled_session):
+    ring = polled_session.ring
+    for value in range(3):
+        _publish(ring, value)
+    headers, payload = asyncio.run(polled_session.latest_frame())
+
+    ring.claim(0, ring.slot_count)  # Lot de frames d'avance en cours d'écriture
+
+    assert asyncio.run(polled_session.latest_frame()) == (headers, payload)
+    assert asyncio.run(polled_session.latest_frame(headers["ETag"])) == (headers, None)
+
+
+# --- Redémarrage d'un moteur mort ---
+
+
+class _RecordingConn:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+class _FakeEngine:
+    """Processus moteur simulé : vivant jusqu'à terminate()"""
+
+    def __init__(self):
+        self.alive = True
+        self.pid, self.exitcode = None, -9
+        # Jamais prêt : le superviseur se réveille sur son intervalle
+        self.sentinel, self._write_end = os.pipe()
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        return None
+
+
+def _start_fake(manager: SessionManager, session_id: str) -> AnimationSession:
+    """Session démarrée (moteur simulé) enregistrée dans le manager"""
+    session = manager.create_session(session_id, FastFKAnimator, "Walking.glb", shared=False)
+    session.ring = FrameRing(memoryview(bytearray(FrameRing.required_size(16, 3))), 16, 3)
+    session.region = SimpleNamespace(size=session.ring.buffer.nbytes)
+    session.frame_size = 16
+    session.interpolator = PoseInterpolator(16)
+    session.engine, session.parent_conn = _FakeEngine(), _RecordingConn()
+    session.started, session.status = True, "running"
+    session.ready.set()
+    return session
+
+
+@pytest.fixture
+def running(manager):
+    return _start_fake(manager, "s")
+
+
+def test_fps_set_through_the_api_drives_the_stream_rate(manager, running):
+    websocket = object()
+    running.connections.add(websocket)
+    running.simulation_fps = 30.0
+
+    asyncio.run(manager.dispatch_action("s", "set_fps", 90))
+
+    assert ("set_fps", 90.0, False) in running.parent_conn.sent
+    assert (running.target_fps, running.stream_fps) == (90.0, 90.0)
+    # Moteur plafonné à 30 fps : les clients reçoivent des poses interpolées à 90 fps
+    assert running._stream_groups() == {90.0: [websocket]}
+
+
+def test_restart_replays_the_requested_fps_not_the_degraded_one(manager, running, monkeypatch):
+    asyncio.run(manager.dispatch_action("s", "set_fps", 60))
+    # Dernier battement du moteur mort : fps abaissé par la contre-pression
+    running.ring.beat(2.5, 1.0, 15.0)
+    running.engine.terminate()
+
+    conn = _RecordingConn()
+    monkeypatch.setattr(AnimationSession, "_create_engine", lambda self, standby=False: (_FakeEngine(), conn))
+
+    async def handshake(self, engine, conn):
+        return {"frame_size": 16}
+
+    monkeypatch.setattr(AnimationSession, "_handshake", handshake)
+    monkeypatch.setattr(AnimationSession, "_attach_engine", lambda self, conn, data: None)
+
+    asyncio.run(running.restart())
+
+    assert ("set_fps", 60.0, False) in conn.sent
+    assert ("set_fps", 15.0, False) not in conn.sent
+    assert ("seek", 2.5, False) in conn.sent
+
+
+def test_a_slow_restart_does_not_stall_supervision(manager, monkeypatch):
+    slow, fast = _start_fake(manager, "slow"), _start_fake(manager, "fast")
+    slow.engine.terminate()
+    monkeypatch.setattr(session_manager, "SUPERVISOR_INTERVAL", 0.01)
+    restarts = []
+    handshake = asyncio.Event()
+
+    async def restart(self):
+        restarts.append(self.session_id)
+        if self is slow:
+            await handshake.wait()  # Poignée de main qui n'en finit pas
+        self.engine = _FakeEngine()
+
+    monkeypatch.setattr(AnimationSession, "restart", restart)
+
+    async def scenario():
+        supervisor = asyncio.create_task(manager.supervise_loop())
+        await asyncio.sleep(0.1)
+        # Le moteur "fast" meurt pendant le redémarrage de "slow"
+        fast.engine.terminate()
+        await asyncio.sleep(0.1)
+        restarted = list(restarts)
+        handshake.set()
+        await asyncio.sleep(0.05)
+        supervisor.cancel()
+        await supervisor
+        return restarted
+
+    assert asyncio.run(scenario()) == ["slow", "fast"]
+    assert not manager.recoveries
+
+
+# --- Migration à chaud (vrais processus moteur) ---
+
+
+def test_migration_moves_the_engine_without_frame_gaps(spawn_start_method, manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(session_manager, "CAPTURE_DIR", str(tmp_path))
+    # Deux groupes d'un coeur (le même coeur : seul le groupe attribué compte ici)
+    manager.placement = PlacementPolicy("pinned", 1, [0, 0])
+    session = manager.create_session("s", FastFKAnimator, _write_glb(tmp_path / "arm.glb"), shared=False)
+    assert session.placement.slot == 0
+
+    async def scenario():
+        await session.start()
+        session.start_recording("migration")
+        await asyncio.sleep(0.3)
+        old_pid = session.engine.pid
+        pid = await manager.migrate_session("s")
+        await asyncio.sleep(0.3)
+        info = session.stop_recording()
+        await session.stop()
+        return old_pid, pid, info
+
+    old_pid, pid, info = asyncio.run(scenario())
+
+    assert pid != old_pid
+    # Nouveau moteur sur l'autre groupe, l'ancien groupe est libéré
+    assert session.placement.slot == 1
+    assert manager.placement.load == [0, 1]
+    reader = CaptureReader(info["path"])
+    try:
+        frame_ids = list(reader.frame_ids)
+    finally:
+        reader.close()
+    assert len(frame_ids) > 10
+    # Les frames diffusées avant et après la passation se suivent sans trou ni retour en arrière
+    assert frame_ids == list(range(frame_ids[0], frame_ids[0] + len(frame_ids)))
+
+
+# --- Suppression pendant le démarrage ---
+
+
+def test_deleting_a_session_during_start_terminates_its_engine(spawn_start_method, manager, tmp_path, monkeypatch):
+    handshakes = []
+
+    async def handshake(self, engine, conn):
+        engine.start()
+        handshakes.append(engine)
+        await asyncio.Event().wait()  # Chargement interminable
+
+    monkeypatch.setattr(AnimationSession, "_handshake", handshake)
+
+    async def scenario():
+        session = await manager.launch("s", FastFKAnimator, _write_glb(tmp_path / "arm.glb"), shared=False)
+        while not handshakes:
+            await asyncio.sleep(0.01)
+        await manager.delete_session("s")
+        return session
+
+    session = asyncio.run(scenario())
+
+    assert not handshakes[0].is_alive()
+    assert session.engine is not handshakes[0] and session.engine.pid is None
+    assert session.status == "stopped"
+    assert not manager.launches
+
+
+def test_deleting_a_view_keeps_the_shared_engine_starting(manager, monkeypatch):
+    handshakes = []
+
+    async def start_engine(self):
+        handshakes.append(self)
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(AnimationSession, "_start_engine", start_engine)
+
+    async def scenario():
+        first = await manager.launch("a", FastFKAnimator, "Walking.glb", shared=True)
+        second = await manager.launch("b", FastFKAnimator, "Walking.glb", shared=True)
+        assert first is second
+        await asyncio.sleep(0)
+        await manager.delete_session("a")
+        await second.wait_ready()
+        return second
+
+    session = asyncio.run(scenario())
+
+    assert session.status == "running"
+    assert session.session_ids == {"b"}
+    # Le démarrage de "a" a continué pour "b" : un seul lancement du moteur
+    assert len(handshakes) == 1
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from core import shm_arena
+from core.shm_arena import BOOT_ID, MIN_CLASS_SIZE, ShmArena, segment_name
+
+
+@pytest.fixture
+def arena():
+    arena = ShmArena(64 * 1024, max_class_size=16 * 1024)
+    regions = []
+    yield arena, regions
+    for region in regions:
+        region.release()
+    arena.close()
+
+
+def _allocate(arena, regions, size):
+    region = arena.allocate(size)
+    regions.append(region)
+    return region
+
+
+def test_blocks_are_power_of_two_classes(arena):
+    arena, regions = arena
+    small = _allocate(arena, regions, 100)
+    medium = _allocate(arena, regions, MIN_CLASS_SIZE + 1)
+
+    assert small.name == medium.name == arena.shm.name
+    assert (small.offset, medium.offset) == (0, MIN_CLASS_SIZE)
+    assert arena.stats()["used"] == MIN_CLASS_SIZE + 2 * MIN_CLASS_SIZE
+    assert len(small.buf) == 100
+
+
+def test_freed_block_is_reused_and_zeroed(arena):
+    arena, regions = arena
+    first = arena.allocate(1000)
+    first.buf[:4] = b"ring"
+    offset = first.offset
+    first.release()
+
+    second = _allocate(arena, regions, 2000)
+    assert second.offset == offset
+    assert bytes(second.buf[:4]) == bytes(4)
+    assert arena.stats()["reserved"] == MIN_CLASS_SIZE
+
+
+def test_large_or_overflowing_requests_get_a_dedicated_segment(arena):
+    arena, regions = arena
+    large = _allocate(arena, regions, 32 * 1024)
+    assert large.arena is None
+    assert large.name.startswith(segment_name(""))
+
+    for _ in range(4):
+        _allocate(arena, regions, 16 * 1024)
+    overflow = _allocate(arena, regions, 16 * 1024)
+    assert overflow.arena is None
+    assert arena.stats()["dedicated_segments"] == 2
+
+
+# --- Nettoyage des segments orphelins ---
+
+
+def test_sweep_keeps_only_segments_of_live_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(shm_arena, "SHM_DIR", str(tmp_path))
+    monkeypatch.setattr(shm_arena, "_pid_alive", lambda pid: pid == 4242)
+    pid = os.getpid()
+    names = {
+        "current": f"moma_{pid}_{BOOT_ID}_arena",
+        # Même pid, exécution précédente (conteneur redémarré : le serveur est toujours le pid 1)
+        "previous_run": f"moma_{pid}_0badb007_arena",
+        "legacy": f"moma_{pid}_arena",
+        "other_server": "moma_4242_cafe0123_arena",
+        "dead_server": "moma_999999_cafe0123_clock",
+        "foreign": "psm_1234",
+    }
+    for name in names.values():
+        (tmp_path / name).touch()
+
+    removed = ShmArena.sweep_orphans()
+
+    assert sorted(removed) == sorted([names["previous_run"], names["legacy"], names["dead_server"]])
+    assert sorted(os.listdir(tmp_path)) == sorted([names["current"], names["other_server"], names["foreign"]])
@@ -0,0 +1,104 @@
+import multiprocessing
+
+import pytest
+
+from core import engine as engine_module
+from core.engine import AnimationEngine
+from core.tick_clock import CLOCK_ORIGIN_NS, CLOCK_SIZE, TickClock
+
+ORIGIN_NS = 10**12
+
+
+def _clock(fps: float) -> TickClock:
+    buffer = memoryview(bytearray(CLOCK_SIZE))
+    TickClock.format(buffer, fps)
+    clock = TickClock(buffer)
+    clock.words[CLOCK_ORIGIN_NS] = ORIGIN_NS
+    return clock
+
+
+def test_ticks_are_counted_from_the_origin():
+    clock = _clock(60)
+    period = clock.period_ns
+
+    assert period == 16_666_667
+    assert clock.tick_at(ORIGIN_NS) == 0
+    assert clock.tick_at(ORIGIN_NS + period - 1) == 0
+    assert clock.tick_at(ORIGIN_NS + 10 * period) == 10
+    assert clock.tick_time(10) == ORIGIN_NS + 10 * period
+    # Sur une frontière, le tick suivant est le prochain, pas celui en cours
+    assert clock.next_tick(clock.tick_time(10)) == 11
+    assert clock.next_tick(clock.tick_time(10) - 1) == 10
+
+
+@pytest.mark.parametrize(
+    "clock_fps, engine_fps, ticks",
+    [
+        (60, 60, 1),
+        (60, 30, 2),
+        (60, 20, 3),
+        (60, 25, 2),  # 2,4 ticks : arrondi à 2 (le moteur tourne alors à 30 fps)
+        (60, 45, 1),  # 1,33 tick
+        (60, 90, 1),  # Plus rapide que l'horloge : une frame par tick au plus
+        (120, 50, 2),  # 2,4 ticks
+        (50, 30, 2),  # 1,67 tick
+    ],
+)
+def test_ticks_per_frame_rounds_non_integer_ratios(clock_fps, engine_fps, ticks):
+    assert _clock(clock_fps).ticks_per_frame(engine_fps) == ticks
+
+
+class _Animator:
+    def __init__(self):
+        self.current_time = 0.0
+
+    def seek(self, time_s: float):
+        self.current_time = time_s
+
+
+def _engine(clock: TickClock, fps: float) -> AnimationEngine:
+    engine = AnimationEngine(_Animator, "", None, None, multiprocessing.Event(), fps=fps)
+    engine.animator = _Animator()
+    engine.clock = clock
+    return engine
+
+
+def test_sync_group_sessions_show_the_same_time_on_shared_ticks(monkeypatch):
+    clock = _clock(60)
+    now = [0]
+    monkeypatch.setattr(engine_module.time, "monotonic_ns", lambda: now[0])
+    # Fps différents, et non multiples l'un de l'autre : 2 et 3 ticks par frame
+    engines = [_engine(clock, 30), _engine(clock, 20)]
+    start_tick = 100
+    for engine in engines:
+        engine._sync_start(engine.animator, {"tick": start_tick, "time": 1.5, "speed": 2.0})
+
+    times = {}
+    for engine in engines:
+        step = clock.ticks_per_frame(engine.engine_fps)
+        for tick in range(start_tick, start_tick + 13, step):
+            # Réveil légèrement en avance : compte pour le tick visé
+            now[0] = clock.tick_time(tick) - clock.period_ns // 10
+            assert not engine._waiting_sync()
+            engine.animator.current_time += engine._clock_dt() * engine.playback_speed_value
+            times.setdefault(tick, []).append(engine.animator.current_time)
+
+    # Départ commun exactement à 'time', puis même temps d'animation à chaque tick partagé
+    assert times[start_tick] == [1.5, 1.5]
+    for tick in (start_tick + 6, start_tick + 12):
+        expected = 1.5 + (tick - start_tick) * clock.period_ns / 1e9 * 2.0
+        assert times[tick] == pytest.approx([expected, expected], abs=1e-12)
+
+
+def test_engine_waits_for_the_group_start_tick(monkeypatch):
+    clock = _clock(60)
+    now = [clock.tick_time(40)]
+    monkeypatch.setattr(engine_module.time, "monotonic_ns", lambda: now[0])
+    monkeypatch.setattr(engine_module.time, "sleep", lambda seconds: None)
+    engine = _engine(clock, 30)
+    engine._sync_start(engine.animator, {"tick": 42, "time": 0.0})
+
+    assert engine._waiting_sync()
+    now[0] = clock.tick_time(42)
+    assert not engine._waiting_sync()
+    assert engine.last_tick == 42 and engine.sync_tick is None
@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from core.tracing import FIELD_FRAME_ID, FrameTracer
+
+US = 1000
+
+
+def _record(tracer: FrameTracer, frame_id: int, ahead_us: int = 0, compute: int = 0):
+    """Frame aux étapes espacées de 10 µs (avance 'ahead_us' entre publication et présentation)"""
+    base = (frame_id * 1000 + 1) * US
+    publish = base + 10 * US
+    ready = publish + ahead_us * US
+    tracer.record(frame_id, compute if compute else base, publish, ready, ready + 10 * US, ready + 20 * US, ready + 30 * US, 2)
+
+
+def test_rows_stay_oldest_first_after_wrapping():
+    tracer = FrameTracer(capacity=4)
+    for frame_id in range(1, 4):
+        _record(tracer, frame_id)
+    assert list(tracer.rows()[:, FIELD_FRAME_ID]) == [1, 2, 3]
+
+    for frame_id in range(4, 11):
+        _record(tracer, frame_id)
+    assert list(tracer.rows()[:, FIELD_FRAME_ID]) == [7, 8, 9, 10]
+
+    _record(tracer, 11)  # Écrase pile le début du tableau
+    assert list(tracer.rows()[:, FIELD_FRAME_ID]) == [8, 9, 10, 11]
+
+
+def test_summary_skips_missing_and_inverted_stages():
+    tracer = FrameTracer(capacity=8)
+    _record(tracer, 1)
+    _record(tracer, 2, ahead_us=50)
+    _record(tracer, 3, compute=-1)  # Instant de calcul absent (frame d'un ancien moteur)
+    # Réveil horodaté avant 'ready' : étape ignorée, les suivantes restent mesurées
+    tracer.record(4, 1 * US, 11 * US, 11 * US, 6 * US, 21 * US, 31 * US, 1)
+
+    summary = tracer.summary()
+
+    assert (summary["frames"], summary["capacity"]) == (4, 8)
+    stages = summary["stages"]
+    assert stages["compute"]["p50_us"] == pytest.approx(10.0)
+    # Seule la frame 2 a été calculée d'avance
+    assert stages["ahead"] == {"p50_us": pytest.approx(50.0), "p99_us": pytest.approx(50.0)}
+    assert stages["wakeup"]["p99_us"] == pytest.approx(10.0)
+    assert set(stages) == {"compute", "ahead", "wakeup", "slice", "send"}
+
+
+def test_empty_tracer_has_no_stages():
+    assert FrameTracer().summary() == {"frames": 0, "capacity": 4096, "stages": {}}
+
+
+def test_chrome_trace_is_json_with_paired_async_events():
+    tracer = FrameTracer(capacity=4)
+    for frame_id in range(1, 7):
+        _record(tracer, frame_id, ahead_us=40 if frame_id % 2 else 0)
+
+    trace = json.loads(json.dumps(tracer.chrome_trace("s1", engine_pid=4242)))
+    events = trace["traceEvents"]
+
+    begins = {e["id"]: e for e in events if e["ph"] == "b"}
+    ends = {e["id"]: e for e in events if e["ph"] == "e"}
+    assert set(begins) == set(ends) == {3, 5}
+    assert all(ends[i]["ts"] - begins[i]["ts"] == pytest.approx(40.0) for i in begins)
+
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == 4 * 4  # compute, wakeup, slice, send pour chacune des 4 frames retenues
+    assert {e["pid"] for e in complete if e["name"] == "compute"} == {4242}
+    assert {e["pid"] for e in complete if e["name"] != "compute"} == {os.getpid()}
+    assert all(e["dur"] >= 0 for e in complete)
+    assert {e["name"] for e in events if e["ph"] == "M"} == {"process_name", "thread_name"}
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import socket
+
+import numpy as np
+
+from core.udp_transport import FRAGMENT_HEADER, HELLO_MAGIC, REORDER_WINDOW, FrameReassembler, UdpTransport
+
+DATAGRAM_SIZE = 256
+
+
+def _frame(frame_id: int, size: int = 1000) -> bytes:
+    return np.random.default_rng(frame_id).bytes(size)
+
+
+async def _send_over_loopback(frames: dict[int, bytes]) -> list[bytes]:
+    """Envoie les frames par une vraie socket UdpTransport et retourne les datagrammes reçus par le client"""
+    transport = UdpTransport(0, DATAGRAM_SIZE)
+    assert await transport.start()
+    port = transport.sock.getsockname()[1]
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(("127.0.0.1", 0))
+    client.settimeout(2.0)
+    try:
+        peer = transport.register("session")
+        client.sendto(HELLO_MAGIC + peer.token.encode(), ("127.0.0.1", port))
+        for _ in range(100):
+            if peer.addr is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert peer.addr == client.getsockname()
+
+        for frame_id, frame in frames.items():
+            transport.send_frame({peer}, frame_id, memoryview(frame))
+        expected = sum(-(-len(frame) // transport.chunk_size) for frame in frames.values())
+        return [client.recv(DATAGRAM_SIZE) for _ in range(expected)]
+    finally:
+        client.close()
+        transport.stop()
+
+
+def _feed(reassembler: FrameReassembler, datagrams: list[bytes]) -> list[tuple[int, bytes]]:
+    return [frame for frame in map(reassembler.feed, datagrams) if frame is not None]
+
+
+def test_loopback_round_trip():
+    frames = {frame_id: _frame(frame_id) for frame_id in range(1, 6)}
+    datagrams = asyncio.run(_send_over_loopback(frames))
+
+    assert all(len(datagram) <= DATAGRAM_SIZE for datagram in datagrams)
+    assert _feed(FrameReassembler(), datagrams) == list(frames.items())
+
+
+def test_lost_fragment_drops_only_its_frame():
+    frames = {frame_id: _frame(frame_id) for frame_id in range(1, 4)}
+    datagrams = asyncio.run(_send_over_loopback(frames))
+    # Deuxième fragment de la frame 2 perdu
+    lost = next(i for i, d in enumerate(datagrams) if FRAGMENT_HEADER.unpack_from(d)[1:4:2] == (2, 1))
+    del datagrams[lost]
+
+    reassembler = FrameReassembler()
+    assert _feed(reassembler, datagrams) == [(1, frames[1]), (3, frames[3])]
+    assert reassembler.incomplete == 1
+
+
+def test_reordered_and_duplicated_fragments():
+    frames = {7: _frame(7, 2000)}
+    datagrams = asyncio.run(_send_over_loopback(frames))
+    shuffled = datagrams + datagrams[:3]
+    random.Random(0).shuffle(shuffled)
+
+    reassembler = FrameReassembler()
+    assert _feed(reassembler, shuffled) == [(7, frames[7])]
+    # Un doublon arrivé après la livraison n'est pas relivré
+    assert reassembler.feed(datagrams[0]) is None
+
+
+def test_late_fragment_of_older_frame_is_ignored():
+    frames = {1: _frame(1), 2: _frame(2)}
+    datagrams = asyncio.run(_send_over_loopback(frames))
+    first = [d for d in datagrams if FRAGMENT_HEADER.unpack_from(d)[1] == 1]
+    second = [d for d in datagrams if FRAGMENT_HEADER.unpack_from(d)[1] == 2]
+
+    # Frame 2 complète avant la fin de la frame 1 : les fragments en retard de la frame 1 sont jetés
+    assert _feed(FrameReassembler(), first[:2] + second + first[2:]) == [(2, frames[2])]
+
+
+def test_frame_ids_restarting_open_a_new_stream():
+    old = {frame_id: _frame(frame_id) for frame_id in (REORDER_WINDOW + 100, REORDER_WINDOW + 101)}
+    new = {1: _frame(1), 2: _frame(2)}
+    reassembler = FrameReassembler()
+    _feed(reassembler, asyncio.run(_send_over_loopback(old)))
+
+    assert _feed(reassembler, asyncio.run(_send_over_loopback(new))) == list(new.items())
+    assert reassembler.restarts == 1
+
+
+def test_busy_port_leaves_transport_disabled():
+    async def scenario():
+        first = UdpTransport(0)
+        assert await first.start()
+        second = UdpTransport(first.sock.getsockname()[1])
+        try:
+            assert not await second.start()
+            assert second.sock is None
+        finally:
+            first.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from websockets.frames import Frame, Opcode
+
+from animators.fast_fk_animator import FastFKAnimator
+from core import session_manager, ws_broadcast
+from core.session_manager import AnimationSession
+from core.ws_broadcast import MAX_PENDING_BYTES, RawWebSocketWriter, encode_binary_frame, raw_writer
+
+
+@pytest.mark.parametrize("length", [0, 125, 126, 65535, 65536, 200_000])
+def test_frames_match_the_websockets_codec(length):
+    payload = bytes(range(256)) * (length // 256) + bytes(length % 256)
+
+    frame = encode_binary_frame(memoryview(payload))
+
+    assert frame == Frame(Opcode.BINARY, payload).serialize(mask=False)
+
+
+class _Transport:
+    def __init__(self, pending: int = 0):
+        self.pending = pending
+        self.written = []
+
+    def is_closing(self) -> bool:
+        return False
+
+    def get_write_buffer_size(self) -> int:
+        return self.pending
+
+    def write(self, data: bytes):
+        self.written.append(data)
+
+
+class _Protocol:
+    """Protocole uvicorn simulé : transport asyncio + état de la connexion"""
+
+    def __init__(self, transport: _Transport):
+        self.transport = transport
+        self.state = SimpleNamespace(name="OPEN")
+
+    async def send(self, message):
+        pass
+
+
+class _WebSocket:
+    def __init__(self, send=None):
+        self._send = send
+        self.sent = []
+
+    async def send_bytes(self, data):
+        self.sent.append(bytes(data))
+
+
+def _session() -> AnimationSession:
+    return AnimationSession("s", FastFKAnimator, "Walking.glb")
+
+
+def test_frames_go_straight_to_the_transport(monkeypatch):
+    monkeypatch.setattr(session_manager, "WS_FAST_BROADCAST", True)
+    transport = _Transport()
+    client = _WebSocket(_Protocol(transport).send)
+
+    asyncio.run(_session()._send_frames([client], memoryview(b"pose")))
+
+    assert transport.written == [encode_binary_frame(b"pose")]
+    assert client.sent == []
+
+
+def test_unknown_server_falls_back_to_send_bytes(monkeypatch):
+    monkeypatch.setattr(session_manager, "WS_FAST_BROADCAST", True)
+    client = _WebSocket()  # Pas de chaîne 'send' menant à un transport
+
+    asyncio.run(_session()._send_frames([client], memoryview(b"pose")))
+
+    assert raw_writer(client) is None
+    assert client.sent == [b"pose"]
+    assert ws_broadcast.stats()["fallback"] >= 1
+
+
+def test_slow_client_skips_frames_and_counts_them(monkeypatch):
+    monkeypatch.setattr(RawWebSocketWriter, "total_dropped", 0)
+    transport = _Transport(pending=MAX_PENDING_BYTES + 1)
+    client = _WebSocket(_Protocol(transport).send)
+    writer = raw_writer(client)
+
+    assert writer.write(encode_binary_frame(b"pose"))
+    assert writer.write(encode_binary_frame(b"pose"))
+
+    assert transport.written == []
+    assert writer.dropped == 2
+    stats = ws_broadcast.stats()
+    assert stats["dropped_frames"] == 2
+    assert stats["lagging_connections"] >= 1